@@ -8,11 +8,11 @@ logger = setup_logger(__name__)
 analytics_api = Blueprint('analytics_api', __name__)
 
 @analytics_api.route('/api/analytics/request-metrics', methods=['GET'])
-def get_request_metrics():
+async def get_request_metrics():
     """Get request-related analytics."""
     try:
         time_range = request.args.get('timeRange', '1h')
-        metrics = analytics_service.get_request_metrics(time_range)
+        metrics = await analytics_service.get_request_metrics(time_range)
         return jsonify({
             'status': 'success',
             'data': metrics
@@ -25,11 +25,11 @@ def get_request_metrics():
         }), 500
 
 @analytics_api.route('/api/analytics/performance-metrics', methods=['GET'])
-def get_performance_metrics():
+async def get_performance_metrics():
     """Get performance-related analytics."""
     try:
         time_range = request.args.get('timeRange', '1h')
-        metrics = analytics_service.get_performance_metrics(time_range)
+        metrics = await analytics_service.get_performance_metrics(time_range)
         return jsonify({
             'status': 'success',
             'data': metrics
@@ -0,0 +1,32 @@
+# server/src/api/cache_routes.py
+from flask import Blueprint, jsonify
+from ..services.cache_service import cache_service
+from ..core.exceptions import CacheError
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+cache_api = Blueprint('cache_api', __name__)
+
+@cache_api.route('/api/cache/stats', methods=['GET'])
+async def get_cache_stats():
+    """Get hit rates, sizes and eviction counts for every cache namespace."""
+    try:
+        return jsonify(cache_service.get_all_stats())
+    except Exception as e:
+        logger.error(f"Error getting cache stats: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@cache_api.route('/api/cache/<namespace>/purge', methods=['POST'])
+async def purge_cache(namespace):
+    """Remove every entry from one cache namespace."""
+    try:
+        cache = cache_service.namespace(namespace)
+        if not await cache.clear():
+            return jsonify({'error': f"Failed to purge cache namespace '{namespace}'"}), 500
+        logger.info(f"Purged cache namespace '{namespace}'")
+        return jsonify({'status': 'success', 'namespace': namespace})
+    except CacheError as e:
+        return jsonify(e.to_dict()), e.status_code
+    except Exception as e:
+        logger.error(f"Error purging cache namespace {namespace}: {str(e)}")
+        return jsonify({'error': str(e)}), 500
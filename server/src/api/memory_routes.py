@@ -1,15 +1,44 @@
 # server/src/api/memory_routes.py
-from flask import Blueprint, jsonify, request
-from ..data.memory_manager import MemoryManager
+from typing import Any, Dict, Iterator, Optional
+from flask import Blueprint, Response, jsonify, request
+import json
+from ..config.settings import config
+from ..core.constants import MemoryTypes
+from ..data.memory_manager import ACTIVITY_RANGES, MemoryManager, MemorySweeper, decode_cursor
 from ..data.search_index import SearchIndex
 from .validators import validate_request
+from ..core.exceptions import MemoryError
+from ..utils.async_utils import iterate_sync
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 memory_api = Blueprint('memory_api', __name__)
 
-memory_manager = MemoryManager()
 search_index = SearchIndex('memories.db')
+memory_manager = MemoryManager(
+    'memories.db',
+    search_index=search_index,
+    ttl_seconds=config.memory.ttl_seconds
+)
+memory_sweeper = MemorySweeper(
+    memory_manager,
+    max_entries=config.memory.max_entries,
+    vacuum_threshold=config.memory.vacuum_threshold,
+    interval=config.memory.sweep_interval
+)
+
+def _read_ndjson(stream) -> Iterator[Dict[str, Any]]:
+    """Yield one object per non-blank line, reading the body as it arrives."""
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON on line {number}: {str(e)}")
+        if not isinstance(item, dict):
+            raise ValueError(f"Line {number} is not a JSON object")
+        yield item
 
 @memory_api.route('/api/memories/search', methods=['GET'])
 async def search_memories():
@@ -37,6 +66,102 @@ async def search_memories():
             'message': str(e)
         }), 500
 
+@memory_api.route('/api/memories/bulk', methods=['POST'])
+async def bulk_store_memories():
+    """Store newline-delimited JSON memories in one transaction."""
+    try:
+        stored = await memory_manager.store_many(_read_ndjson(request.stream))
+        return jsonify({
+            'status': 'success',
+            'stored': stored
+        }), 201
+
+    except ValueError as ve:
+        logger.error(f"Bulk store rejected: {str(ve)}")
+        return jsonify({'status': 'error', 'message': str(ve)}), 400
+    except MemoryError as e:
+        logger.error(f"Bulk store failed: {e.message}")
+        return jsonify({'status': 'error', 'message': e.message, 'details': e.details}), e.status_code
+
+def _memory_line(memory: Dict[str, Any]) -> str:
+    """Format an undecoded memory as one JSON line.
+
+    Content and metadata are stored as JSON text and spliced in as-is,
+    so streaming never parses and re-serializes them.
+    """
+    fields = {k: v for k, v in memory.items() if k not in ('content', 'metadata')}
+    # Reopen the object by dropping its closing brace
+    head = json.dumps(fields)[:-1]
+    return f'{head}, "content": {memory["content"]}, "metadata": {memory["metadata"] or "null"}}}\n'
+
+def _stream_memories(
+    memory_type: Optional[MemoryTypes],
+    min_importance: int,
+    cursor: Optional[str],
+    limit: Optional[int]
+) -> Iterator[str]:
+    """Yield JSON lines for memories, newest first."""
+    memories = memory_manager.iter_memories(
+        memory_type=memory_type,
+        min_importance=min_importance,
+        cursor=cursor,
+        batch_size=min(limit or 500, 500),
+        decode=False
+    )
+    try:
+        for count, memory in enumerate(iterate_sync(memories), start=1):
+            yield _memory_line(memory)
+            if limit and count >= limit:
+                break
+    except Exception as e:
+        # Headers are already sent; end with an error line instead
+        logger.error(f"Memory stream failed: {str(e)}")
+        yield json.dumps({'status': 'error', 'message': str(e)}) + "\n"
+
+@memory_api.route('/api/memories/stream', methods=['GET'])
+async def stream_memories():
+    """Stream memories newest first as JSON lines.
+
+    Every line has a ``cursor``; pass the last one received back as
+    ``cursor`` to resume after it.
+    """
+    try:
+        memory_type = request.args.get('type')
+        memory_type = MemoryTypes(memory_type) if memory_type else None
+        min_importance = int(request.args.get('min_importance', 0))
+        limit = request.args.get('limit')
+        limit = int(limit) if limit else None
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be at least 1")
+        cursor = request.args.get('cursor') or None
+        if cursor:
+            # Reject a bad cursor before the stream starts
+            decode_cursor(cursor)
+
+    except ValueError as ve:
+        return jsonify({'status': 'error', 'message': str(ve)}), 400
+    except MemoryError as e:
+        return jsonify({'status': 'error', 'message': e.message, 'details': e.details}), e.status_code
+
+    return Response(
+        _stream_memories(memory_type, min_importance, cursor, limit),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@memory_api.route('/api/memory/vacuum', methods=['POST'])
+async def enable_incremental_vacuum():
+    """Convert an older memory database to incremental auto-vacuum.
+
+    Runs a one-off full VACUUM, during which memory writes wait.
+    """
+    try:
+        converted = await memory_manager.enable_incremental_vacuum()
+        return jsonify({'status': 'success', 'converted': converted})
+    except Exception as e:
+        logger.error(f"Failed to enable incremental vacuum: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 @memory_api.route('/api/memory/stats', methods=['GET'])  # Corrected route path
 async def get_memory_stats():
     """Get memory statistics and visualization data."""
@@ -45,8 +170,7 @@ async def get_memory_stats():
         
         # Validate time range
         def validate_time_range(time_range):
-            valid_ranges = ['7d', 'last24hours', '30d']
-            if time_range not in valid_ranges:
+            if time_range not in ACTIVITY_RANGES:
                 raise ValueError(f"Invalid time range: {time_range}")
             return time_range
 
@@ -1,15 +1,20 @@
 # server/src/api/routes.py
 # from flask import Blueprint, request, jsonify
 from datetime import datetime
-from ..core.constants import ModelStatus, MemoryTypes
-from ..core.exceptions import LLMBaseException, ModelError, MemoryError
+from typing import Dict, Any, Iterator, Optional
+import json
+import time
+from ..core.constants import ModelStatus, MemoryTypes, ErrorCodes
+from ..core.exceptions import LLMBaseException, ModelError, MemoryError, SchedulerError
 from ..llm.engine import LLMEngine
+from ..llm.model_pool import model_pool
 from ..data.memory_manager import MemoryManager
 # from ..api.schemas import MessageRequest, ModelSettings, Memory
 from ..api.validators import validate_request
 from ..utils.error_handler import handle_exceptions
 from ..utils.logger import setup_logger
-from flask import Blueprint, jsonify
+from ..utils.async_utils import iterate_sync
+from flask import Blueprint, jsonify, Response
 from .schemas import (
     ChatRequest,
     ChatResponse,
@@ -23,40 +28,90 @@ logger = setup_logger(__name__)
 api = Blueprint('api', __name__)
 
 # Initialize managers (these should be properly initialized with your config)
-llm_engine = None
 memory_manager = None
 
 @api.route('/api/model/start', methods=['POST'])
 @validate_request(ModelStartRequest, ModelStatusResponse)
 async def start_model(validated_data):
-    """Start and initialize the model."""
-    global llm_engine
+    """Load a model into the pool and make it the default.
+
+    Loading happens in the background and returns 202 right away; poll
+    /api/model/status or listen for model_load_progress events. Pass
+    ``wait`` to block until the model is ready.
+    """
     try:
-        if not llm_engine:
-            llm_engine = LLMEngine(validated_data.model_path)
-        
-        if validated_data.settings:
-            llm_engine.update_settings(validated_data.settings.dict())
-        
-        await llm_engine.initialize()
-        return llm_engine.get_status()
+        engine_kwargs = validated_data.dict(include={
+            'n_ctx', 'n_batch', 'n_threads', 'n_threads_batch', 'use_mmap', 'use_mlock', 'system_prompts',
+            'semantic_cache_threshold', 'embedding_model_path'
+        })
+        settings = validated_data.settings
+        if settings:
+            engine_kwargs.update(settings.dict(include={'draft_model_path', 'n_draft'}))
+        batching = validated_data.batching
+        if batching:
+            engine_kwargs.update(
+                batching=True,
+                max_batch_size=batching.max_batch_size,
+                max_batch_wait=batching.max_wait_ms / 1000
+            )
+
+        if validated_data.wait:
+            engine = await model_pool.load(
+                validated_data.model_path,
+                name=validated_data.name,
+                **engine_kwargs
+            )
+        else:
+            engine = model_pool.start(
+                validated_data.model_path,
+                name=validated_data.name,
+                **engine_kwargs
+            )
+
+        if settings:
+            engine.update_settings(settings.dict(exclude={'draft_model_path', 'n_draft'}))
+
+        # New engines warm their system prompts while loading; a model
+        # that was already pooled only needs the ones it has not seen
+        if engine.is_ready:
+            for system_prompt in validated_data.system_prompts or []:
+                if system_prompt not in engine.system_prompts:
+                    await engine.cache_prefix(system_prompt)
+
+        return engine.get_status(), 200 if engine.is_ready else 202
     except Exception as e:
         logger.error(f"Failed to start model: {str(e)}")
         return {"error": str(e)}, 500
 
+def _ready_engine(model: Optional[str]) -> LLMEngine:
+    """Get a pooled engine that can take requests right now."""
+    engine = model_pool.get(model)
+    if not engine.is_ready:
+        raise ModelError(
+            message="Model not ready",
+            code=ErrorCodes.MODEL_NOT_READY,
+            details={"load_progress": engine.load_progress},
+            status_code=503
+        )
+    return engine
+
+def _generation_args(chat: ChatRequest) -> Dict[str, Any]:
+    """Extract sampling and scheduling arguments from a chat request."""
+    args = {'priority': chat.priority, 'timeout': chat.timeout}
+    if chat.settings:
+        args['max_tokens'] = chat.settings.max_tokens
+        args['temperature'] = chat.settings.temperature
+    return args
+
 @api.route('/api/chat/send', methods=['POST'])
 @validate_request(ChatRequest, ChatResponse)
 async def send_message(validated_data):
     """Handle chat message sending."""
-    global llm_engine
     try:
-        if not llm_engine:
-            raise ValueError('Model not initialized')
-
-        settings = validated_data.settings.dict() if validated_data.settings else {}
-        response = await llm_engine.generate_response(
+        engine = _ready_engine(validated_data.model)
+        response = await engine.generate_response(
             prompt=validated_data.message,
-            **settings
+            **_generation_args(validated_data)
         )
         
         return response
@@ -65,6 +120,41 @@ async def send_message(validated_data):
         logger.error(f"Error generating response: {str(e)}")
         raise
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format a single server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _stream_chat_events(engine: LLMEngine, prompt: str, args: Dict[str, Any]) -> Iterator[str]:
+    """Yield SSE events for a streamed chat response."""
+    start_time = time.time()
+    try:
+        for text in iterate_sync(engine.stream_chunks(prompt, **args)):
+            yield _sse_event('token', {'text': text})
+        yield _sse_event('done', {'generation_time': time.time() - start_time})
+    except LLMBaseException as e:
+        logger.error(f"Error streaming response: {str(e)}")
+        yield _sse_event('error', e.to_dict())
+
+@api.route('/api/chat/stream', methods=['POST'])
+@validate_request(ChatRequest)
+async def stream_message(validated_data):
+    """Stream a chat response as server-sent events."""
+    engine = _ready_engine(validated_data.model)
+
+    # Reject up front so a full queue is reported as 429, not a 200 stream
+    if engine.queue_full:
+        raise SchedulerError(
+            message="Request queue is full",
+            code=ErrorCodes.QUEUE_FULL,
+            status_code=429
+        )
+
+    return Response(
+        _stream_chat_events(engine, validated_data.message, _generation_args(validated_data)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 # @api.route('/api/model/start', methods=['POST'])
 # @validate_request(ModelStartRequest, ModelStatusResponse)
 # async def start_model():
@@ -123,14 +213,11 @@ async def send_message(validated_data):
 @api.route('/api/model/settings', methods=['POST'])
 @validate_request(ModelSettings, ModelStatusResponse)
 async def update_settings(validated_data):
-    """Update model settings."""
-    global llm_engine
+    """Update settings of the default model."""
     try:
-        if not llm_engine:
-            raise ValueError('Model not initialized')
-            
-        llm_engine.update_settings(validated_data.dict())
-        return llm_engine.get_status()
+        engine = model_pool.get()
+        engine.update_settings(validated_data.dict())
+        return engine.get_status()
     
     except Exception as e:
         logger.error(f"Error updating settings: {str(e)}")
@@ -139,18 +226,9 @@ async def update_settings(validated_data):
 @api.route('/api/model/status', methods=['GET'])
 @validate_request(response_model=ModelStatusResponse)
 async def get_status():
-    """Get current model status."""
-    global llm_engine
+    """Get status of the default model and every pooled model."""
     try:
-        if not llm_engine:
-            return {
-                'status': ModelStatus.STOPPED,
-                'ready': False,
-                'model_path': None,
-                'settings': None
-            }
-            
-        return llm_engine.get_status()
+        return model_pool.get_status()
     
     except Exception as e:
         logger.error(f"Error getting status: {str(e)}")
@@ -2,20 +2,32 @@
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+from ..core.constants import RequestPriority
 
 class ModelSettings(BaseModel):
     """Model settings validation schema."""
     temperature: float = Field(0.7, ge=0.0, le=1.0)
     max_tokens: int = Field(512, ge=1, le=2048)
     top_p: float = Field(0.9, ge=0.0, le=1.0)
+    top_k: int = Field(40, ge=0)  # 0 keeps the whole vocabulary
     frequency_penalty: float = Field(0.0, ge=-2.0, le=2.0)
     presence_penalty: float = Field(0.0, ge=-2.0, le=2.0)
+    repeat_penalty: float = Field(1.1, ge=0.0, le=2.0)
     stop_sequences: List[str] = Field(default_factory=list)
 
+class ModelStartSettings(ModelSettings):
+    """Model settings accepted when a model is started."""
+    # Speculative decoding: a small model with the same vocabulary drafts tokens
+    draft_model_path: Optional[str] = Field(None, min_length=1)
+    n_draft: int = Field(4, ge=1, le=16)
+
 class ChatRequest(BaseModel):
     """Chat message request validation schema."""
     message: str = Field(..., min_length=1)
     settings: Optional[ModelSettings] = None
+    priority: RequestPriority = RequestPriority.NORMAL
+    timeout: Optional[float] = Field(None, gt=0)  # Max seconds to wait in the queue
+    model: Optional[str] = None  # Pooled model name; defaults to the last started
 
     @field_validator('message')
     def message_not_empty(cls, v):
@@ -29,10 +41,29 @@ class ChatResponse(BaseModel):
     tokens_used: int
     finish_reason: Optional[str]
 
+class BatchingSettings(BaseModel):
+    """Continuous batching settings validation schema."""
+    max_batch_size: int = Field(4, ge=1, le=64)
+    max_wait_ms: float = Field(10.0, ge=0.0, le=1000.0)
+
 class ModelStartRequest(BaseModel):
     """Model start request validation schema."""
     model_path: str = Field(..., min_length=1)
-    settings: Optional[ModelSettings] = None
+    name: Optional[str] = Field(None, min_length=1)  # Pool name; defaults to the file name
+    settings: Optional[ModelStartSettings] = None
+    batching: Optional[BatchingSettings] = None
+    system_prompts: Optional[List[str]] = None
+    # llama.cpp runtime overrides; unset values come from ModelConfig
+    n_ctx: Optional[int] = Field(None, ge=128, le=131072)
+    n_batch: Optional[int] = Field(None, ge=1, le=8192)
+    n_threads: Optional[int] = Field(None, ge=1, le=512)
+    n_threads_batch: Optional[int] = Field(None, ge=1, le=512)
+    use_mmap: Optional[bool] = None
+    use_mlock: Optional[bool] = None
+    # Semantic response cache: reuse answers to similar prompts at temperature 0
+    semantic_cache_threshold: Optional[float] = Field(None, gt=0.0, le=1.0)
+    embedding_model_path: Optional[str] = Field(None, min_length=1)
+    wait: bool = False  # Block until loaded instead of loading in the background
 
 class ModelStatusResponse(BaseModel):
     """Model status response validation schema."""
@@ -40,8 +71,11 @@ class ModelStatusResponse(BaseModel):
     model_path: Optional[str]
     settings: Optional[ModelSettings]
     ready: bool
-    uptime: Optional[float]
-    memory_usage: Optional[float]
+    uptime: Optional[float] = None
+    memory_usage: Optional[Dict[str, float]] = None
+    default_model: Optional[str] = None
+    models: Optional[Dict[str, Dict[str, Any]]] = None  # Per-model status keyed by pool name
+    pool: Optional[Dict[str, Any]] = None
 
 class ErrorResponse(BaseModel):
     """Error response validation schema."""
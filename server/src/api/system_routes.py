@@ -1,20 +1,15 @@
 # server/src/api/system_routes.py
 from flask import Blueprint, jsonify, request
-from ..llm.engine import LLMEngine
+from ..llm.model_pool import model_pool
 from .validators import validate_request
 from ..utils.logger import setup_logger
-from ..core.constants import ModelStatus
 
 logger = setup_logger(__name__)
 system_api = Blueprint('system_api', __name__)
 
-# Global LLM engine instance
-llm_engine = None
-
 @system_api.route('/api/model/start', methods=['POST'])
 async def start_model():
-    """Start and initialize the LLM model."""
-    global llm_engine
+    """Start loading a model in the background and make it the default."""
     try:
         data = request.get_json()
         model_path = data.get('model_path')
@@ -25,21 +20,19 @@ async def start_model():
                 'message': 'No model path provided'
             }), 400
 
-        if llm_engine and llm_engine.status == ModelStatus.READY:
+        engine = model_pool.start(model_path, name=data.get('name'))
+        if engine.is_ready:
             return jsonify({
                 'status': 'success',
                 'message': 'Model already running',
-                'model_info': llm_engine.get_status()
+                'model_info': engine.get_status()
             })
-
-        llm_engine = LLMEngine(model_path)
-        await llm_engine.initialize()
         
         return jsonify({
             'status': 'success',
-            'message': 'Model started successfully',
-            'model_info': llm_engine.get_status()
-        })
+            'message': 'Model loading started',
+            'model_info': engine.get_status()
+        }), 202
         
     except Exception as e:
         logger.error(f"Failed to start model: {str(e)}")
@@ -50,19 +43,20 @@ async def start_model():
 
 @system_api.route('/api/model/stop', methods=['POST'])
 async def stop_model():
-    """Stop the LLM model."""
-    global llm_engine
+    """Unload one pooled model, or all of them when no name is given."""
     try:
-        if not llm_engine:
+        data = request.get_json(silent=True) or {}
+        unloaded = model_pool.unload(data.get('name'))
+        if not unloaded:
             return jsonify({
                 'status': 'success',
                 'message': 'Model already stopped'
             })
 
-        llm_engine = None
         return jsonify({
             'status': 'success',
-            'message': 'Model stopped successfully'
+            'message': 'Model stopped successfully',
+            'unloaded': unloaded
         })
         
     except Exception as e:
@@ -74,18 +68,9 @@ async def stop_model():
 
 @system_api.route('/api/model/status', methods=['GET'])
 async def get_model_status():
-    """Get current model status."""
-    global llm_engine
+    """Get status of the default model and every pooled model."""
     try:
-        if not llm_engine:
-            return jsonify({
-                'status': ModelStatus.STOPPED,
-                'ready': False,
-                'model_path': None,
-                'settings': None
-            })
-            
-        return jsonify(llm_engine.get_status())
+        return jsonify(model_pool.get_status())
         
     except Exception as e:
         logger.error(f"Failed to get model status: {str(e)}")
@@ -100,7 +85,7 @@ async def health_check():
     try:
         status = {
             'status': 'healthy',
-            'model_status': llm_engine.status if llm_engine else ModelStatus.STOPPED,
+            'model_status': model_pool.get_status()['status'],
             'api_version': '1.0.0'
         }
         
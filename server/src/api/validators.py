@@ -4,6 +4,7 @@ from flask import request, jsonify
 from pydantic import ValidationError
 from typing import Type, Optional
 from .schemas import ErrorResponse
+from ..core.exceptions import LLMBaseException, SchedulerError
 from datetime import datetime
 
 def validate_request(request_model: Optional[Type] = None, response_model: Optional[Type] = None):
@@ -45,6 +46,24 @@ def validate_request(request_model: Optional[Type] = None, response_model: Optio
                 )
                 return jsonify(error_response.dict()), 400
 
+            except SchedulerError as e:
+                error_response = ErrorResponse(
+                    error=e.message,
+                    code=e.code,
+                    details=e.details,
+                    timestamp=datetime.now()
+                )
+                return jsonify(error_response.dict()), e.status_code, {'Retry-After': '1'}
+
+            except LLMBaseException as e:
+                error_response = ErrorResponse(
+                    error=e.message,
+                    code=e.code,
+                    details=e.details,
+                    timestamp=datetime.now()
+                )
+                return jsonify(error_response.dict()), e.status_code
+
             except Exception as e:
                 error_response = ErrorResponse(
                     error=str(e),
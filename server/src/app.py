@@ -5,13 +5,14 @@ from flask_cors import CORS
 from src.api.routes import api
 from src.api.middleware import init_middleware
 from src.services.websocket_server import socketio, websocket_manager
-from src.llm.engine import LLMEngine
+from src.llm.model_pool import model_pool
 from src.utils.logger import setup_logger
 from src.utils.error_handler import setup_error_handlers
 from src.api.analytics_routes import analytics_api
 from src.api.system_routes import system_api
-from src.api.memory_routes import memory_api
+from src.api.memory_routes import memory_api, memory_sweeper
 from src.api.metrics_routes import metrics_api
+from src.api.cache_routes import cache_api
 
 logger = setup_logger(__name__)
 
@@ -36,13 +37,15 @@ def create_app():
     app.register_blueprint(system_api)
     app.register_blueprint(memory_api)
     app.register_blueprint(metrics_api)
+    app.register_blueprint(cache_api)
+
+    # Expire, evict and vacuum stored memories in the background
+    memory_sweeper.start()
     
-    # Initialize LLM engine
-    llm_engine = None  # Initialize when needed
-    
-    # Initialize WebSocket
+    # Initialize WebSocket; models are loaded into the pool on demand
     socketio.init_app(app, cors_allowed_origins="*")
-    websocket_manager.set_engine(llm_engine)
+    websocket_manager.set_model_pool(model_pool)
+    model_pool.set_progress_callback(websocket_manager.broadcast_load_progress)
     websocket_manager.setup_events()
     logger.debug("WebSocket server initialized")
     
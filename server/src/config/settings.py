@@ -3,14 +3,19 @@ from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, List
 import os
 from pathlib import Path
+import psutil
 
 from ..core.exceptions import ConfigurationError
 from ..core.constants import ErrorCodes
 
+def physical_cores() -> int:
+    """Number of physical CPU cores, ignoring SMT siblings."""
+    return psutil.cpu_count(logical=False) or os.cpu_count() or 1
+
 @dataclass
 class ModelConfig:
     """LLM model configuration."""
-    model_path: str
+    model_path: Optional[str] = None
     max_tokens: int = 512
     temperature: float = 0.7
     top_p: float = 0.9
@@ -19,15 +24,52 @@ class ModelConfig:
     stop_sequences: List[str] = field(default_factory=list)
     cache_size: Optional[int] = 1000
 
+    # llama.cpp runtime; n_ctx is per sequence when batching
+    n_ctx: int = 2048
+    n_batch: int = 512
+    n_threads: int = field(default_factory=physical_cores)        # Decode
+    n_threads_batch: int = field(default_factory=physical_cores)  # Prompt evaluation
+    use_mmap: bool = True
+    use_mlock: bool = False
+
+    @classmethod
+    def from_env(cls) -> 'ModelConfig':
+        """Create model configuration from environment variables."""
+        defaults = cls()
+        return cls(
+            model_path=os.getenv("MODEL_PATH"),
+            n_ctx=int(os.getenv("MODEL_N_CTX", defaults.n_ctx)),
+            n_batch=int(os.getenv("MODEL_N_BATCH", defaults.n_batch)),
+            n_threads=int(os.getenv("MODEL_N_THREADS", defaults.n_threads)),
+            n_threads_batch=int(os.getenv("MODEL_N_THREADS_BATCH", defaults.n_threads_batch)),
+            use_mmap=os.getenv("MODEL_USE_MMAP", str(defaults.use_mmap)).lower() == "true",
+            use_mlock=os.getenv("MODEL_USE_MLOCK", str(defaults.use_mlock)).lower() == "true"
+        )
+
 @dataclass
 class MemoryConfig:
     """Memory system configuration."""
     db_path: str = "memory.db"
-    max_entries: int = 10000
-    ttl_seconds: int = 86400  # 24 hours
-    vacuum_threshold: int = 1000
+    # Retention is opt-in: by default memories never expire and are never evicted
+    max_entries: Optional[int] = None  # Least important, oldest memories are evicted beyond this
+    ttl_seconds: Optional[int] = None  # Lifetime of memories stored without an expiry
+    vacuum_threshold: int = 1000  # Free pages that trigger an incremental vacuum
+    sweep_interval: float = 60.0  # Seconds between maintenance sweeps
     index_fields: List[str] = field(default_factory=lambda: ["type", "timestamp"])
 
+    @classmethod
+    def from_env(cls) -> 'MemoryConfig':
+        """Create memory configuration from environment variables."""
+        defaults = cls()
+        max_entries = os.getenv("MEMORY_MAX_ENTRIES")
+        ttl_seconds = os.getenv("MEMORY_TTL_SECONDS")
+        return cls(
+            max_entries=int(max_entries) if max_entries else defaults.max_entries,
+            ttl_seconds=int(ttl_seconds) if ttl_seconds else defaults.ttl_seconds,
+            vacuum_threshold=int(os.getenv("MEMORY_VACUUM_THRESHOLD", defaults.vacuum_threshold)),
+            sweep_interval=float(os.getenv("MEMORY_SWEEP_INTERVAL", defaults.sweep_interval))
+        )
+
 @dataclass
 class LogConfig:
     """Logging configuration."""
@@ -58,7 +100,9 @@ class SystemConfig:
             host=os.getenv("HOST", "0.0.0.0"),
             port=int(os.getenv("PORT", "5000")),
             worker_threads=int(os.getenv("WORKER_THREADS", "4")),
-            models_dir=os.getenv("MODELS_DIR", str(Path("models").absolute()))
+            models_dir=os.getenv("MODELS_DIR", str(Path("models").absolute())),
+            model=ModelConfig.from_env(),
+            memory=MemoryConfig.from_env()
         )
 
     def validate(self) -> None:
@@ -70,6 +114,14 @@ class SystemConfig:
                 details={"path": self.models_dir}
             )
         
+        for knob in ("n_ctx", "n_batch", "n_threads", "n_threads_batch"):
+            if getattr(self.model, knob) < 1:
+                raise ConfigurationError(
+                    message=f"Model {knob} must be at least 1",
+                    code=ErrorCodes.CONFIG_INVALID,
+                    details={knob: getattr(self.model, knob)}
+                )
+
         if self.worker_threads < 1:
             raise ConfigurationError(
                 message="Worker threads must be at least 1",
@@ -6,6 +6,7 @@ class ErrorCodes(str, Enum):
     # Model related errors
     MODEL_LOAD_FAILED = "MODEL_LOAD_FAILED"
     MODEL_NOT_FOUND = "MODEL_NOT_FOUND"
+    MODEL_NOT_READY = "MODEL_NOT_READY"
     MODEL_RESPONSE_FAILED = "MODEL_RESPONSE_FAILED"
     
     # Token related errors
@@ -22,6 +23,10 @@ class ErrorCodes(str, Enum):
     DB_READ_FAILED = "DB_READ_FAILED"
     DB_WRITE_FAILED = "DB_WRITE_FAILED"
     
+    # Cache related errors
+    CACHE_NAMESPACE_UNKNOWN = "CACHE_NAMESPACE_UNKNOWN"
+    CACHE_DECODE_FAILED = "CACHE_DECODE_FAILED"
+    
     # Configuration related errors
     CONFIG_INVALID = "CONFIG_INVALID"
     CONFIG_MISSING = "CONFIG_MISSING"
@@ -30,6 +35,10 @@ class ErrorCodes(str, Enum):
     API_ERROR = "API_ERROR"
     API_REQUEST_FAILED = "API_REQUEST_FAILED"
     API_RESPONSE_INVALID = "API_RESPONSE_INVALID"
+    
+    # Scheduling related errors
+    QUEUE_FULL = "QUEUE_FULL"
+    DEADLINE_EXCEEDED = "DEADLINE_EXCEEDED"
 
 class ModelStatus(str, Enum):
     """Status codes for model state."""
@@ -39,6 +48,12 @@ class ModelStatus(str, Enum):
     PROCESSING = "PROCESSING"
     STOPPED = "STOPPED"
 
+class RequestPriority(str, Enum):
+    """Scheduling priority for inference requests."""
+    HIGH = "HIGH"
+    NORMAL = "NORMAL"
+    LOW = "LOW"
+
 class MessageTypes(str, Enum):
     """Types of messages in the system."""
     USER = "USER"
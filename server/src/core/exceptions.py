@@ -4,16 +4,21 @@ from datetime import datetime
 
 class LLMBaseException(Exception):
     """Base exception for all LLM-related errors."""
+    status_code = 500
+
     def __init__(
         self, 
         message: str,
         code: str = None,
-        details: Dict[str, Any] = None
+        details: Dict[str, Any] = None,
+        status_code: Optional[int] = None
     ):
         super().__init__(message)
         self.message = message
         self.code = code
         self.details = details or {}
+        if status_code is not None:
+            self.status_code = status_code
         self.timestamp = datetime.utcnow()
         
     def to_dict(self) -> Dict[str, Any]:
@@ -48,4 +53,12 @@ class ConfigurationError(LLMBaseException):
 
 class APIError(LLMBaseException):
     """Errors related to API operations."""
-    pass
\ No newline at end of file
+    pass
+
+class CacheError(LLMBaseException):
+    """Errors related to cache operations."""
+    pass
+
+class SchedulerError(LLMBaseException):
+    """Errors related to request admission and scheduling."""
+    status_code = 503
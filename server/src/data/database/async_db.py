@@ -0,0 +1,204 @@
+# src/data/database/async_db.py
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+import asyncio
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+from ...utils.logger import setup_logger
+from .pool import ConnectionPool, get_pool
+
+logger = setup_logger(__name__)
+
+_COMMIT = 'commit'
+_ROLLBACK = 'rollback'
+
+@dataclass
+class ExecuteResult:
+    """Outcome of a write statement."""
+    rowcount: int
+    lastrowid: Optional[int]
+
+class _Statements(ABC):
+    """Statement helpers shared by the database and its transactions.
+
+    Subclasses decide where ``_read`` and ``_write`` run ``fn(conn)``.
+    """
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> ExecuteResult:
+        def run(conn: sqlite3.Connection) -> ExecuteResult:
+            cursor = conn.execute(sql, params)
+            return ExecuteResult(cursor.rowcount, cursor.lastrowid)
+        return await self._write(run)
+
+    async def executemany(self, sql: str, rows: Iterable[Sequence[Any]]) -> int:
+        return await self._write(lambda conn: conn.executemany(sql, rows).rowcount)
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        return await self._read(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[tuple]:
+        return await self._read(lambda conn: conn.execute(sql, params).fetchone())
+
+    @abstractmethod
+    async def _read(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        ...
+
+    @abstractmethod
+    async def _write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        ...
+
+class Transaction(_Statements):
+    """Statements pinned to the writer thread inside one transaction.
+
+    Created by ``AsyncDatabase.transaction()``. Everything inside the
+    ``async with`` block must go through this object: the writer thread
+    is reserved for it until the block exits, so a write through the
+    database itself would wait forever.
+    """
+
+    def __init__(self, db: 'AsyncDatabase'):
+        self._db = db
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._done: Optional[Future] = None
+
+    async def __aenter__(self) -> 'Transaction':
+        self._done = self._db._writer.submit(self._serve)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._jobs.put(_ROLLBACK if exc_type is not None else _COMMIT)
+        await asyncio.wrap_future(self._done)
+
+    async def run(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run ``fn(conn)`` on the transaction's connection."""
+        future: Future = Future()
+        self._jobs.put((fn, future))
+        return await asyncio.wrap_future(future)
+
+    _read = run
+    _write = run
+
+    def _serve(self) -> None:
+        """Run queued statements on the writer thread until commit or rollback."""
+        with self._db.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    job = self._jobs.get()
+                    if job == _COMMIT:
+                        conn.commit()
+                        return
+                    if job == _ROLLBACK:
+                        conn.rollback()
+                        return
+                    fn, future = job
+                    if future.set_running_or_notify_cancel():
+                        try:
+                            future.set_result(fn(conn))
+                        except BaseException as e:
+                            future.set_exception(e)
+            except BaseException:
+                conn.rollback()
+                raise
+
+class AsyncDatabase(_Statements):
+    """Awaitable SQLite access on dedicated database threads.
+
+    Reads run on a small pool of reader threads, each with its own pooled
+    connection, so under WAL they proceed alongside writes. Writes run on a
+    single writer thread, since SQLite admits one writer at a time, each in
+    its own transaction. Results come back through thread-safe futures,
+    which suits Flask's per-request event loops.
+    """
+
+    def __init__(self, pool: ConnectionPool, readers: int = 4):
+        self.pool = pool
+        name = os.path.basename(pool.db_path) or 'db'
+        self._read_prefix = f"db-read-{name}"
+        self._write_prefix = f"db-write-{name}"
+        # A :memory: database has a single connection, so extra readers would only queue on it
+        self._readers = ThreadPoolExecutor(
+            max_workers=1 if pool.in_memory else readers,
+            thread_name_prefix=self._read_prefix
+        )
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self._write_prefix)
+
+    def transaction(self) -> Transaction:
+        """Group statements into one transaction on the writer thread.
+
+        Commits when the ``async with`` block exits normally and rolls back
+        if it raises.
+        """
+        return Transaction(self)
+
+    async def read(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run ``fn(conn)`` on a reader thread."""
+        return await self._read(fn)
+
+    async def write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run ``fn(conn)`` in its own transaction on the writer thread."""
+        return await self._write(fn)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Open connections by role: reader threads, the writer, and other callers."""
+        roles = {'reader': 0, 'writer': 0, 'other': 0}
+        for thread in self.pool.get_stats()['threads']:
+            if thread.startswith(self._read_prefix):
+                roles['reader'] += 1
+            elif thread.startswith(self._write_prefix):
+                roles['writer'] += 1
+            else:
+                roles['other'] += 1
+        return roles
+
+    def close(self) -> None:
+        """Finish queued work and stop the database threads."""
+        self._readers.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
+
+    async def _read(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        return await asyncio.wrap_future(self._readers.submit(self._run_read, fn))
+
+    async def _write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        return await asyncio.wrap_future(self._writer.submit(self._run_write, fn))
+
+    def _run_read(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self.pool.connection() as conn:
+            return fn(conn)
+
+    def _run_write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self.pool.transaction() as conn:
+            return fn(conn)
+
+_databases: Dict[str, AsyncDatabase] = {}
+_databases_lock = threading.Lock()
+
+def get_database(db_path: str) -> AsyncDatabase:
+    """Get the shared async database for a file; ``:memory:`` is never shared."""
+    db_path = str(db_path)
+    if db_path == ':memory:':
+        return AsyncDatabase(get_pool(db_path))
+
+    key = os.path.abspath(db_path)
+    with _databases_lock:
+        db = _databases.get(key)
+        if db is None:
+            db = _databases[key] = AsyncDatabase(get_pool(db_path))
+        return db
+
+def close_all() -> None:
+    """Stop every shared database's threads; runs at interpreter exit."""
+    with _databases_lock:
+        databases = list(_databases.values())
+        _databases.clear()
+    for db in databases:
+        db.close()
+
+# Registered after the pool module's hook, so it runs first and drains
+# queued work before the connections close
+atexit.register(close_all)
@@ -17,7 +17,7 @@ class DatabaseOperations:
     async def store_memory(self, memory: Dict[str, Any]) -> None:
         """Store a memory entry."""
         try:
-            with sqlite3.connect(self.db_manager.db_path) as conn:
+            with self.db_manager.pool.transaction() as conn:
                 conn.execute(
                     """
                     INSERT OR REPLACE INTO memories 
@@ -45,7 +45,7 @@ class DatabaseOperations:
     async def get_memory(self, key: str) -> Optional[Dict[str, Any]]:
         """Retrieve a memory by key."""
         try:
-            with sqlite3.connect(self.db_manager.db_path) as conn:
+            with self.db_manager.pool.connection() as conn:
                 cursor = conn.execute(
                     """
                     SELECT * FROM memories 
@@ -77,7 +77,7 @@ class DatabaseOperations:
     async def save_token_stats(self, stats: Dict[str, Any]) -> None:
         """Save token usage statistics."""
         try:
-            with sqlite3.connect(self.db_manager.db_path) as conn:
+            with self.db_manager.pool.transaction() as conn:
                 conn.execute(
                     """
                     INSERT INTO token_stats 
@@ -0,0 +1,190 @@
+# src/data/database/pool.py
+from typing import Dict, Iterator, Optional
+from contextlib import contextmanager
+import atexit
+import os
+import sqlite3
+import threading
+import weakref
+from ...core.exceptions import DatabaseError
+from ...core.constants import ErrorCodes
+from ...utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Applied once when the pool creates its database file. These only take
+# effect on an empty file; existing files keep theirs until a full VACUUM
+FILE_PRAGMAS = {
+    'auto_vacuum': 'INCREMENTAL'  # Freed pages can be returned without a VACUUM
+}
+
+# Applied to every new connection, in order
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',       # Readers no longer block on a writer
+    'synchronous': 'NORMAL',     # Durable at checkpoints; safe with WAL
+    'cache_size': -64000,        # Page cache in KiB (negative) per connection
+    'temp_store': 'MEMORY',
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,        # Milliseconds to wait on a locked database
+    'foreign_keys': 'ON'
+}
+
+class _ThreadConnection:
+    """A thread's connection, held in thread-local storage."""
+    __slots__ = ('conn', '__weakref__')
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+class ConnectionPool:
+    """Reusable SQLite connections to one database.
+
+    Each thread gets its own long-lived connection, opened on first use
+    with the pool's pragmas and a statement cache, so repeated queries
+    skip both connection setup and SQL compilation. The connection is
+    closed when its thread exits. ``:memory:``
+    databases exist per connection, so they get a single shared
+    connection guarded by a lock instead.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pragmas: Optional[Dict[str, object]] = None,
+        cached_statements: int = 256
+    ):
+        self.db_path = str(db_path)
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.cached_statements = cached_statements
+        self.in_memory = self.db_path == ':memory:'
+        self._local = threading.local()
+        self._connections: Dict[sqlite3.Connection, str] = {}  # -> opening thread's name
+        self._lock = threading.RLock()
+        self._shared: Optional[sqlite3.Connection] = None
+        self._closed = False
+        if not self.in_memory and not os.path.exists(self.db_path):
+            self._create_file()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow this thread's connection; nothing is committed on exit."""
+        if self.in_memory:
+            with self._lock:
+                if self._shared is None:
+                    self._shared = self._connect()
+                yield self._shared
+            return
+
+        held = getattr(self._local, 'held', None)
+        if held is None:
+            held = self._local.held = _ThreadConnection(self._connect())
+            # Thread-local storage is dropped when the thread exits
+            release = weakref.finalize(held, self._release, held.conn)
+            release.atexit = False  # close_all handles shutdown, in order
+        yield held.conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection and commit on success, roll back on error."""
+        with self.connection() as conn:
+            with conn:
+                yield conn
+
+    def get_stats(self) -> Dict[str, object]:
+        """Open connections, in total and per owning thread."""
+        with self._lock:
+            threads = list(self._connections.values())
+        return {'connections': len(threads), 'threads': threads}
+
+    def close(self) -> None:
+        """Close every connection the pool has opened."""
+        with self._lock:
+            self._closed = True
+            connections, self._connections = list(self._connections), {}
+            self._shared = None
+            self._local = threading.local()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to close connection to {self.db_path}: {str(e)}")
+        logger.debug(f"Closed {len(connections)} connections to {self.db_path}")
+
+    def _create_file(self) -> None:
+        """Create the database file with the settings of a new file."""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                for name, value in FILE_PRAGMAS.items():
+                    conn.execute(f"PRAGMA {name} = {value}")
+                # Writes the header, so the settings outlive this connection
+                conn.execute("PRAGMA user_version = 0")
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to set up new database {self.db_path}: {str(e)}")
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        """Close the connection of a thread that has exited."""
+        with self._lock:
+            if self._connections.pop(conn, None) is None:
+                return  # Already closed by close()
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to close connection to {self.db_path}: {str(e)}")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._closed:
+            raise DatabaseError(
+                message="Connection pool is closed",
+                code=ErrorCodes.DB_INIT_FAILED,
+                details={"path": self.db_path}
+            )
+        try:
+            conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,  # Closed from the shutdown thread
+                cached_statements=self.cached_statements
+            )
+            for name, value in self.pragmas.items():
+                conn.execute(f"PRAGMA {name} = {value}")
+        except sqlite3.Error as e:
+            raise DatabaseError(
+                message="Failed to open database connection",
+                code=ErrorCodes.DB_INIT_FAILED,
+                details={"path": self.db_path, "error": str(e)}
+            )
+        with self._lock:
+            self._connections[conn] = threading.current_thread().name
+        return conn
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """Get the shared pool for a database file.
+
+    Every ``:memory:`` request gets a fresh pool, since each one is a
+    separate database.
+    """
+    db_path = str(db_path)
+    if db_path == ':memory:':
+        return ConnectionPool(db_path)
+
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path)
+        return pool
+
+def close_all() -> None:
+    """Close every shared pool; runs at interpreter exit."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+atexit.register(close_all)
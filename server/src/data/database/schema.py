@@ -5,6 +5,7 @@ from typing import Optional
 from ...core.exceptions import DatabaseError
 from ...core.constants import ErrorCodes
 from ...utils.logger import setup_logger
+from .pool import get_pool
 
 logger = setup_logger(__name__)
 
@@ -12,12 +13,13 @@ class DatabaseManager:
     def __init__(self, db_path: str):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.pool = get_pool(db_path)
         self._init_db()
 
     def _init_db(self):
         """Initialize database schema."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.transaction() as conn:
                 # Memory Table
                 conn.execute("""
                     CREATE TABLE IF NOT EXISTS memories (
@@ -1,79 +1,387 @@
 # server/src/data/memory_manager.py
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, Iterable, List, Optional, Tuple, Union
+from collections import OrderedDict
+from itertools import islice
+import asyncio
 import sqlite3
+import threading
 import json
-from datetime import datetime
+from datetime import datetime, time, timedelta
 from ..core.exceptions import MemoryError
-from ..core.constants import MemoryTypes
+from ..core.constants import ErrorCodes, MemoryTypes
 from ..utils.logger import setup_logger
+from .database.async_db import get_database
+from .search_index import SearchIndex
 
 logger = setup_logger(__name__)
 
+# Stored in PRAGMA user_version; 1 moved timestamps to INTEGER epoch ms,
+# 2 added id to the time-ordered indexes for keyset pagination, 3 added
+# the stats rollups
+SCHEMA_VERSION = 3
+
+MEMORIES_TABLE = """
+    CREATE TABLE {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        type TEXT NOT NULL,
+        content TEXT NOT NULL,
+        metadata TEXT,
+        created_at INTEGER NOT NULL,
+        expires_at INTEGER,
+        importance INTEGER DEFAULT 0
+    )
+"""
+
+# Shaped after retrieve() and retrieve_page(), which filter on expiry and
+# importance and return the newest rows first. Each index is ordered by
+# (created_at, id) so LIMIT stops the scan early and a page cursor is a
+# seek, and carries expires_at and importance so rows are filtered in the
+# index and only returned rows touch the table.
+TIME_ORDERED_INDEXES = ['idx_memories_time', 'idx_memories_type_time', 'idx_memories_important']
+
+MEMORY_INDEXES = [
+    # Any type
+    "CREATE INDEX IF NOT EXISTS idx_memories_time ON memories(created_at, id, expires_at, importance)",
+    # One type: seek to it, then scan in time order
+    """CREATE INDEX IF NOT EXISTS idx_memories_type_time
+       ON memories(type, created_at, id, expires_at, importance)""",
+    # Any type with min_importance; skips the default-importance majority
+    """CREATE INDEX IF NOT EXISTS idx_memories_important
+       ON memories(created_at, id, expires_at, importance) WHERE importance > 0""",
+    # Maintenance: expired rows, then the least important and oldest
+    """CREATE INDEX IF NOT EXISTS idx_memories_expiry
+       ON memories(expires_at) WHERE expires_at IS NOT NULL""",
+    "CREATE INDEX IF NOT EXISTS idx_memories_eviction ON memories(importance, created_at)"
+]
+
+HOUR_MS = 3600 * 1000
+
+# Rollups behind the stats methods, kept current by triggers so every
+# write path (single, bulk, sweeps) maintains them and the dashboard
+# never scans memories.
+ROLLUP_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS memory_type_counts (
+        type TEXT PRIMARY KEY,
+        count INTEGER NOT NULL
+    )""",
+    # Memories stored per hour since the epoch. Activity is history, so
+    # deletes leave it alone.
+    """CREATE TABLE IF NOT EXISTS memory_activity (
+        hour INTEGER PRIMARY KEY,
+        count INTEGER NOT NULL
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS memories_rollup_insert AFTER INSERT ON memories
+       BEGIN
+           INSERT INTO memory_type_counts (type, count) VALUES (NEW.type, 1)
+               ON CONFLICT (type) DO UPDATE SET count = count + 1;
+           INSERT INTO memory_activity (hour, count) VALUES (NEW.created_at / 3600000, 1)
+               ON CONFLICT (hour) DO UPDATE SET count = count + 1;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS memories_rollup_delete AFTER DELETE ON memories
+       BEGIN
+           UPDATE memory_type_counts SET count = count - 1 WHERE type = OLD.type;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS memories_rollup_update AFTER UPDATE OF type ON memories
+       WHEN OLD.type IS NOT NEW.type
+       BEGIN
+           UPDATE memory_type_counts SET count = count - 1 WHERE type = OLD.type;
+           INSERT INTO memory_type_counts (type, count) VALUES (NEW.type, 1)
+               ON CONFLICT (type) DO UPDATE SET count = count + 1;
+       END"""
+]
+
+# Activity ranges in days; a single day is bucketed by hour, longer
+# ranges by day, and 'all' starts at the first recorded hour
+ACTIVITY_RANGES = {'1d': 1, 'last24hours': 1, '7d': 7, '30d': 30, 'all': None}
+
+def to_epoch_ms(value: Union[str, datetime, int, float, None]) -> Optional[int]:
+    """Convert an ISO-8601 string, datetime or epoch ms to epoch ms.
+
+    Naive times are local, matching ``datetime.now()``.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    raise ValueError(f"Invalid timestamp: {value!r}")
+
+def from_epoch_ms(value: Optional[int]) -> Optional[str]:
+    """Format epoch ms as a local ISO-8601 string."""
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value / 1000).isoformat()
+
+def encode_cursor(created_at: int, memory_id: int) -> str:
+    """Page cursor for resuming after a memory in newest-first order."""
+    return f"{created_at}:{memory_id}"
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """Parse a cursor from ``encode_cursor`` into ``(created_at, id)``."""
+    try:
+        created_at, memory_id = cursor.split(':')
+        return int(created_at), int(memory_id)
+    except (AttributeError, ValueError):
+        raise MemoryError(
+            message="Invalid page cursor",
+            code=ErrorCodes.MEMORY_RETRIEVE_FAILED,
+            details={"cursor": cursor},
+            status_code=400
+        )
+
 class MemoryManager:
-    def __init__(self, db_path: str = "memories.db"):
-        """Initialize memory manager with database path."""
+    def __init__(
+        self,
+        db_path: str = "memories.db",
+        search_index: Optional[SearchIndex] = None,
+        ttl_seconds: Optional[int] = None
+    ):
+        """Initialize memory manager with database path.
+
+        A search index on the same database is kept in step with bulk
+        stores and deletes, in the same transaction. ``ttl_seconds`` is
+        the lifetime of memories stored without an explicit expiry; by
+        default they never expire.
+        """
         self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.db = get_database(db_path)
+        self.pool = self.db.pool
+        if search_index is not None and search_index.db is not self.db:
+            raise MemoryError(
+                message="Search index must share the memory database",
+                code=ErrorCodes.MEMORY_STORE_FAILED,
+                details={"db_path": db_path, "index_path": search_index.db_path}
+            )
+        self.search_index = search_index
         self._init_db()
         
     def _init_db(self):
-        """Initialize SQLite database."""
+        """Initialize SQLite database, migrating older schemas."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    CREATE TABLE IF NOT EXISTS memories (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        type TEXT NOT NULL,
-                        content TEXT NOT NULL,
-                        metadata TEXT,
-                        created_at TEXT NOT NULL,
-                        expires_at TEXT,
-                        importance INTEGER DEFAULT 0
-                    )
-                """)
-                conn.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_type_time 
-                    ON memories(type, created_at)
-                """)
-        except sqlite3.Error as e:
+            with self.pool.transaction() as conn:
+                # Serialize with other processes opening the same file
+                conn.execute("BEGIN IMMEDIATE")
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memories'"
+                ).fetchone()
+
+                if not exists:
+                    conn.execute(MEMORIES_TABLE.format(name='memories'))
+                elif version < 1:
+                    self._migrate_epoch_timestamps(conn)
+                elif version < 2:
+                    # Rebuilt below with their new columns
+                    for name in TIME_ORDERED_INDEXES:
+                        conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+                conn.execute("DROP INDEX IF EXISTS idx_type_time")
+                for statement in MEMORY_INDEXES:
+                    conn.execute(statement)
+                for statement in ROLLUP_SCHEMA:
+                    conn.execute(statement)
+                if version < 3:
+                    self._backfill_rollups(conn)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        except (sqlite3.Error, ValueError) as e:
             logger.error(f"Database initialization failed: {e}")
             raise MemoryError(message="Failed to initialize database", details={"error": str(e)})
 
+    def _backfill_rollups(self, conn: sqlite3.Connection):
+        """Seed the rollups from existing memories; the triggers take over after."""
+        conn.execute("DELETE FROM memory_type_counts")
+        conn.execute("DELETE FROM memory_activity")
+        conn.execute("""
+            INSERT INTO memory_type_counts (type, count)
+            SELECT type, COUNT(*) FROM memories GROUP BY type
+        """)
+        conn.execute("""
+            INSERT INTO memory_activity (hour, count)
+            SELECT created_at / 3600000, COUNT(*) FROM memories GROUP BY 1
+        """)
+
+    def _migrate_epoch_timestamps(self, conn: sqlite3.Connection):
+        """Rewrite ISO-8601 TEXT timestamps as INTEGER epoch milliseconds.
+
+        SQLite cannot change a column's type in place, so rows are copied
+        into a new table with their ids, which the search index refers to.
+        """
+        conn.create_function("epoch_ms", 1, to_epoch_ms, deterministic=True)
+        conn.execute(MEMORIES_TABLE.format(name='memories_v1'))
+        conn.execute("""
+            INSERT INTO memories_v1
+            (id, type, content, metadata, created_at, expires_at, importance)
+            SELECT id, type, content, metadata,
+                   epoch_ms(created_at), epoch_ms(expires_at), importance
+            FROM memories
+        """)
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'memories'").fetchone()
+        conn.execute("DROP TABLE memories")
+        conn.execute("ALTER TABLE memories_v1 RENAME TO memories")
+        if row:
+            # Keep ids of deleted memories from being reused
+            conn.execute(
+                "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'memories'",
+                (row[0],)
+            )
+        logger.info("Migrated memory timestamps to epoch milliseconds")
+
     async def store(
         self,
         content: Any,
         memory_type: MemoryTypes,
         metadata: Optional[Dict] = None,
-        expires_at: Optional[str] = None,
+        expires_at: Union[str, datetime, int, None] = None,
         importance: int = 0
     ) -> int:
-        """Store a new memory."""
+        """Store a new memory.
+
+        ``expires_at`` may be an ISO-8601 string, a datetime or epoch ms,
+        and defaults to ``ttl_seconds`` from now.
+        """
         try:
-            now = datetime.now().isoformat()
+            now = to_epoch_ms(datetime.now())
+            if expires_at is None:
+                expires_at = self._default_expiry(now)
             
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute(
-                    """
-                    INSERT INTO memories 
-                    (type, content, metadata, created_at, expires_at, importance)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        memory_type.value,
-                        json.dumps(content),
-                        json.dumps(metadata or {}),
-                        now,
-                        expires_at,
-                        importance
-                    )
+            result = await self.db.execute(
+                """
+                INSERT INTO memories 
+                (type, content, metadata, created_at, expires_at, importance)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    memory_type.value,
+                    json.dumps(content),
+                    json.dumps(metadata or {}),
+                    now,
+                    to_epoch_ms(expires_at),
+                    importance
                 )
-                memory_id = cursor.lastrowid
-                logger.debug(f"Stored memory {memory_id} of type {memory_type.value}")
-                return memory_id
+            )
+            memory_id = result.lastrowid
+            logger.debug(f"Stored memory {memory_id} of type {memory_type.value}")
+            return memory_id
                 
         except Exception as e:
             logger.error(f"Failed to store memory: {e}")
             raise MemoryError(message="Failed to store memory", details={"error": str(e)})
 
+    async def store_many(self, items: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+        """Store memories in bulk, all in one transaction.
+
+        Each item has ``content`` and ``type``, and optionally ``metadata``,
+        ``expires_at`` and ``importance``. A missing ``expires_at`` means
+        ``ttl_seconds`` from now; an explicit null never expires. Items are consumed in batches of
+        ``batch_size``, so a streamed source is never held in memory at
+        once. Ids are assigned up front under the transaction's write lock,
+        which lets the memory rows and their search index rows go in with
+        one ``executemany`` each. Nothing is stored if any item is invalid
+        or reading ``items`` raises; errors from ``items`` propagate as-is.
+        """
+        now = to_epoch_ms(datetime.now())
+        items = iter(items)
+        count = 0
+
+        try:
+            async with self.db.transaction() as tx:
+                next_id = await tx.run(self._next_id)
+                while True:
+                    batch = list(islice(items, batch_size))
+                    if not batch:
+                        break
+                    rows = [
+                        self._memory_row(next_id + offset, item, now, count + offset)
+                        for offset, item in enumerate(batch)
+                    ]
+                    await tx.run(lambda conn: self._insert_rows(conn, rows, batch))
+                    next_id += len(rows)
+                    count += len(rows)
+
+                if self.search_index is not None and count:
+                    await tx.run(self.search_index.update_metadata)
+
+            logger.debug(f"Stored {count} memories in bulk")
+            return count
+
+        except sqlite3.Error as e:
+            logger.error(f"Failed to store memories in bulk: {e}")
+            raise MemoryError(message="Failed to store memories", details={"error": str(e)})
+
+    def _next_id(self, conn: sqlite3.Connection) -> int:
+        """Next AUTOINCREMENT id; only stable while holding the write lock."""
+        row = conn.execute(
+            """
+            SELECT MAX(
+                COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'memories'), 0),
+                COALESCE((SELECT MAX(id) FROM memories), 0)
+            )
+            """
+        ).fetchone()
+        return row[0] + 1
+
+    def _memory_row(self, memory_id: int, item: Dict[str, Any], now: int, position: int) -> tuple:
+        """Validate one bulk item and build its row."""
+        try:
+            content = item['content']
+            memory_type = MemoryTypes(item['type'])
+            metadata = item.get('metadata') or {}
+            importance = int(item.get('importance', 0))
+            if 'expires_at' in item:
+                expires_at = to_epoch_ms(item['expires_at'])
+            else:
+                expires_at = self._default_expiry(now)
+            if not isinstance(metadata, dict):
+                raise ValueError("metadata must be an object")
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            raise MemoryError(
+                message=f"Invalid memory at item {position}",
+                code=ErrorCodes.MEMORY_STORE_FAILED,
+                details={"item": position, "error": str(e)},
+                status_code=400
+            )
+        return (
+            memory_id,
+            memory_type.value,
+            json.dumps(content),
+            json.dumps(metadata),
+            now,
+            expires_at,
+            importance
+        )
+
+    def _default_expiry(self, now: int) -> Optional[int]:
+        if not self.ttl_seconds:
+            return None
+        return now + self.ttl_seconds * 1000
+
+    def _insert_rows(self, conn: sqlite3.Connection, rows: List[tuple], items: List[Dict[str, Any]]) -> None:
+        """Insert a batch of memory rows and their search index rows."""
+        conn.executemany(
+            """
+            INSERT INTO memories
+            (id, type, content, metadata, created_at, expires_at, importance)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows
+        )
+        if self.search_index is not None:
+            # Text is indexed as-is, anything else as its JSON
+            self.search_index.add_documents(conn, (
+                (
+                    row[0],
+                    item['content'] if isinstance(item['content'], str) else row[2],
+                    item.get('metadata') or {}
+                )
+                for row, item in zip(rows, items)
+            ))
+
     async def retrieve(
         self,
         memory_type: Optional[MemoryTypes] = None,
@@ -82,55 +390,130 @@ class MemoryManager:
     ) -> List[Dict[str, Any]]:
         """Retrieve memories of given type."""
         try:
-            query = """
-                SELECT * FROM memories 
-                WHERE (expires_at IS NULL OR expires_at > ?)
-            """
-            params = [datetime.now().isoformat()]
+            query, params = self._retrieve_query(memory_type, limit, min_importance)
+            rows = await self.db.fetchall(query, params)
 
-            if memory_type:
-                query += " AND type = ?"
-                params.append(memory_type.value)
-
-            if min_importance > 0:
-                query += " AND importance >= ?"
-                params.append(min_importance)
-
-            query += " ORDER BY created_at DESC LIMIT ?"
-            params.append(limit)
+            memories = [self._memory_dict(row) for row in rows]
 
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute(query, params)
-                rows = cursor.fetchall()
-
-                memories = [{
-                    'id': row[0],
-                    'type': row[1],
-                    'content': json.loads(row[2]),
-                    'metadata': json.loads(row[3]),
-                    'created_at': row[4],
-                    'expires_at': row[5],
-                    'importance': row[6]
-                } for row in rows]
-
-                logger.debug(f"Retrieved {len(memories)} memories")
-                return memories
+            logger.debug(f"Retrieved {len(memories)} memories")
+            return memories
 
         except Exception as e:
             logger.error(f"Failed to retrieve memories: {e}")
             raise MemoryError(message="Failed to retrieve memories", details={"error": str(e)})
 
+    async def retrieve_page(
+        self,
+        memory_type: Optional[MemoryTypes] = None,
+        limit: int = 50,
+        min_importance: int = 0,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Retrieve one page of memories, newest first.
+
+        Pass the returned ``next_cursor`` back to get the following page;
+        it is None after the last one. Pages seek past the cursor's
+        ``(created_at, id)`` instead of skipping an offset, so deep pages
+        cost the same as the first.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        try:
+            query, params = self._retrieve_query(memory_type, limit, min_importance, after)
+            rows = await self.db.fetchall(query, params)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to retrieve memory page: {e}")
+            raise MemoryError(
+                message="Failed to retrieve memories",
+                code=ErrorCodes.MEMORY_RETRIEVE_FAILED,
+                details={"error": str(e)}
+            )
+
+        next_cursor = encode_cursor(rows[-1][4], rows[-1][0]) if len(rows) == limit else None
+        return {
+            'memories': [self._memory_dict(row) for row in rows],
+            'next_cursor': next_cursor
+        }
+
+    async def iter_memories(
+        self,
+        memory_type: Optional[MemoryTypes] = None,
+        min_importance: int = 0,
+        cursor: Optional[str] = None,
+        batch_size: int = 200,
+        decode: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield memories newest first, reading ``batch_size`` rows at a time.
+
+        Only one batch is held in memory. Each memory carries the
+        ``cursor`` that resumes after it. With ``decode=False``,
+        ``content`` and ``metadata`` stay as their stored JSON text, for
+        callers that write them straight back out.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        while True:
+            query, params = self._retrieve_query(memory_type, batch_size, min_importance, after)
+            rows = await self.db.fetchall(query, params)
+            for row in rows:
+                memory = self._memory_dict(row, decode)
+                memory['cursor'] = encode_cursor(row[4], row[0])
+                yield memory
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1][4], rows[-1][0])
+
+    @staticmethod
+    def _memory_dict(row: tuple, decode: bool = True) -> Dict[str, Any]:
+        return {
+            'id': row[0],
+            'type': row[1],
+            'content': json.loads(row[2]) if decode else row[2],
+            'metadata': json.loads(row[3]) if decode else row[3],
+            'created_at': from_epoch_ms(row[4]),
+            'expires_at': from_epoch_ms(row[5]),
+            'importance': row[6]
+        }
+
+    def _retrieve_query(
+        self,
+        memory_type: Optional[MemoryTypes],
+        limit: int,
+        min_importance: int,
+        after: Optional[Tuple[int, int]] = None
+    ) -> Tuple[str, List[Any]]:
+        """Build the retrieve() statement; see MEMORY_INDEXES.
+
+        ``after`` is a ``(created_at, id)`` keyset position to continue from.
+        """
+        query = """
+            SELECT * FROM memories 
+            WHERE (expires_at IS NULL OR expires_at > ?)
+        """
+        params: List[Any] = [to_epoch_ms(datetime.now())]
+
+        if memory_type:
+            query += " AND type = ?"
+            params.append(memory_type.value)
+
+        if min_importance > 0:
+            # Implied by the bound, but spelled out so the planner can
+            # match the partial index, which it cannot prove from a parameter
+            query += " AND importance >= ? AND importance > 0"
+            params.append(min_importance)
+
+        if after is not None:
+            query += " AND (created_at, id) < (?, ?)"
+            params.extend(after)
+
+        query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return query, params
+
     async def delete(self, memory_id: int) -> bool:
         """Delete a specific memory."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute(
-                    "DELETE FROM memories WHERE id = ?",
-                    (memory_id,)
-                )
-                success = cursor.rowcount > 0
-                logger.debug(f"Deleted memory {memory_id}: {success}")
-                return success
+            success = await self.db.write(lambda conn: self._delete_ids(conn, [memory_id])) > 0
+            logger.debug(f"Deleted memory {memory_id}: {success}")
+            return success
                 
         except Exception as e:
             logger.error(f"Failed to delete memory: {e}")
@@ -139,23 +522,280 @@ class MemoryManager:
     async def clear(self, memory_type: Optional[MemoryTypes] = None) -> int:
         """Clear memories of given type or all if type not specified."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                if memory_type:
-                    cursor = conn.execute(
-                        "DELETE FROM memories WHERE type = ?",
-                        (memory_type.value,)
-                    )
-                else:
-                    cursor = conn.execute("DELETE FROM memories")
-                    
-                count = cursor.rowcount
-                logger.debug(f"Cleared {count} memories")
-                return count
+            if memory_type:
+                count = await self.db.write(lambda conn: self._delete_selected(
+                    conn, "SELECT id FROM memories WHERE type = ?", (memory_type.value,)
+                ))
+            else:
+                count = await self.db.write(self._delete_all)
+                
+            logger.debug(f"Cleared {count} memories")
+            return count
                 
         except Exception as e:
             logger.error(f"Failed to clear memories: {e}")
             raise MemoryError(message="Failed to clear memories", details={"error": str(e)})
 
+    async def delete_expired(self, batch_size: int = 500) -> int:
+        """Delete expired memories and their search rows.
+
+        Works in batches of ``batch_size``, each in its own short
+        transaction, so stores queue behind one batch rather than the
+        whole sweep.
+        """
+        total = 0
+        while True:
+            now = to_epoch_ms(datetime.now())
+            deleted = await self.db.write(lambda conn: self._delete_selected(
+                conn, "SELECT id FROM memories WHERE expires_at <= ? LIMIT ?", (now, batch_size)
+            ))
+            total += deleted
+            if deleted < batch_size:
+                break
+        if total:
+            logger.debug(f"Deleted {total} expired memories")
+        return total
+
+    async def evict(self, max_entries: int, batch_size: int = 500) -> int:
+        """Delete memories beyond ``max_entries``, in batches.
+
+        The least important go first and, among equals, the oldest.
+        """
+        row = await self.db.fetchone("SELECT COALESCE(SUM(count), 0) FROM memory_type_counts")
+        excess = row[0] - max_entries
+        total = 0
+        while excess > 0:
+            limit = min(batch_size, excess)
+            deleted = await self.db.write(lambda conn: self._delete_selected(
+                conn, "SELECT id FROM memories ORDER BY importance, created_at, id LIMIT ?", (limit,)
+            ))
+            if not deleted:
+                break
+            total += deleted
+            excess -= deleted
+        if total:
+            logger.debug(f"Evicted {total} memories over the {max_entries} limit")
+        return total
+
+    async def enable_incremental_vacuum(self) -> bool:
+        """Switch an older file to incremental auto-vacuum so vacuum() can shrink it.
+
+        New files are created that way. Older ones need a one-off full
+        VACUUM, which rewrites the file and holds up every write until it
+        finishes, so this is an explicit maintenance step. Returns whether
+        the file was converted.
+        """
+        def run(conn: sqlite3.Connection) -> bool:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                return False
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            return True
+
+        converted = await self.db.write(run)
+        if converted:
+            logger.info(f"Enabled incremental auto-vacuum for {self.db_path}")
+        return converted
+
+    async def vacuum(self, threshold: int) -> int:
+        """Return free pages to the filesystem once ``threshold`` accumulate.
+
+        Returns the number of pages released; always 0 for files created
+        before incremental auto-vacuum, see ``enable_incremental_vacuum``.
+        """
+        def run(conn: sqlite3.Connection) -> int:
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if free < threshold:
+                return 0
+            # execute() steps a pragma only once; a script runs it to completion
+            conn.executescript("PRAGMA incremental_vacuum;")
+            return free - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+        released = await self.db.write(run)
+        if released:
+            logger.debug(f"Released {released} free pages from {self.db_path}")
+        return released
+
+    def _delete_selected(self, conn: sqlite3.Connection, query: str, params: tuple) -> int:
+        """Delete the memories whose ids ``query`` selects."""
+        return self._delete_ids(conn, [row[0] for row in conn.execute(query, params)])
+
+    def _delete_ids(self, conn: sqlite3.Connection, memory_ids: List[int]) -> int:
+        """Delete memories and their search rows by id."""
+        if not memory_ids:
+            return 0
+        deleted = conn.executemany(
+            "DELETE FROM memories WHERE id = ?",
+            ((memory_id,) for memory_id in memory_ids)
+        ).rowcount
+        if self.search_index is not None:
+            self.search_index.remove_documents(conn, memory_ids)
+        return deleted
+
+    def _delete_all(self, conn: sqlite3.Connection) -> int:
+        deleted = conn.execute("DELETE FROM memories").rowcount
+        if self.search_index is not None:
+            conn.execute("DELETE FROM memory_index")
+        return deleted
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get memory totals from the rollups.
+
+        ``memory_usage`` is the size of the database's live pages in MB.
+        """
+        def read(conn: sqlite3.Connection) -> Tuple[int, int]:
+            total = conn.execute("SELECT COALESCE(SUM(count), 0) FROM memory_type_counts").fetchone()[0]
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            pages = conn.execute("PRAGMA page_count").fetchone()[0]
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            return total, (pages - free) * page_size
+
+        try:
+            total, used = await self.db.read(read)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get memory stats: {e}")
+            raise MemoryError(
+                message="Failed to get memory stats",
+                code=ErrorCodes.MEMORY_RETRIEVE_FAILED,
+                details={"error": str(e)}
+            )
+
+        return {
+            'total_memories': total,
+            'active_connections': sum(self.db.get_stats().values()),
+            'memory_usage': used / 1024 / 1024  # MB
+        }
+
+    async def get_activity_data(self, time_range: str = '7d') -> List[Dict[str, Any]]:
+        """Get memories stored per bucket over a range, oldest bucket first.
+
+        Empty buckets are included so charts have an even time axis.
+        """
+        if time_range not in ACTIVITY_RANGES:
+            raise MemoryError(
+                message=f"Invalid time range: {time_range}",
+                code=ErrorCodes.MEMORY_RETRIEVE_FAILED,
+                details={"time_ranges": list(ACTIVITY_RANGES)},
+                status_code=400
+            )
+        days = ACTIVITY_RANGES[time_range]
+        now = datetime.now()
+        now_hour = to_epoch_ms(now) // HOUR_MS
+
+        if days == 1:
+            first_hour = now_hour - 23
+        elif days is not None:
+            first_day = now.date() - timedelta(days=days - 1)
+            first_hour = to_epoch_ms(datetime.combine(first_day, time())) // HOUR_MS
+        else:
+            first_hour = None
+
+        try:
+            rows = await self.db.fetchall(
+                "SELECT hour, count FROM memory_activity WHERE hour >= ? ORDER BY hour",
+                (first_hour if first_hour is not None else 0,)
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get memory activity: {e}")
+            raise MemoryError(
+                message="Failed to get memory activity",
+                code=ErrorCodes.MEMORY_RETRIEVE_FAILED,
+                details={"error": str(e)}
+            )
+
+        if first_hour is None:
+            first_hour = rows[0][0] if rows else now_hour
+
+        def label(hour: int) -> str:
+            start = datetime.fromtimestamp(hour * 3600)
+            return start.strftime('%Y-%m-%dT%H:00') if days == 1 else start.date().isoformat()
+
+        buckets: Dict[str, int] = OrderedDict()
+        if days == 1:
+            for hour in range(first_hour, now_hour + 1):
+                buckets[label(hour)] = 0
+        else:
+            day = datetime.fromtimestamp(first_hour * 3600).date()
+            while day <= now.date():
+                buckets[day.isoformat()] = 0
+                day += timedelta(days=1)
+
+        for hour, count in rows:
+            key = label(hour)
+            if key in buckets:
+                buckets[key] += count
+        return [{'time': key, 'memories': count} for key, count in buckets.items()]
+
+    async def get_type_distribution(self) -> List[Dict[str, Any]]:
+        """Get stored memories per type, most common first."""
+        try:
+            rows = await self.db.fetchall(
+                "SELECT type, count FROM memory_type_counts WHERE count > 0 ORDER BY count DESC, type"
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get memory type distribution: {e}")
+            raise MemoryError(
+                message="Failed to get memory type distribution",
+                code=ErrorCodes.MEMORY_RETRIEVE_FAILED,
+                details={"error": str(e)}
+            )
+        return [{'name': memory_type, 'value': count} for memory_type, count in rows]
+
+    async def get_connection_stats(self) -> List[Dict[str, Any]]:
+        """Get open connections to the memory database by role."""
+        return [{'type': role, 'count': count} for role, count in self.db.get_stats().items()]
+
+class MemorySweeper:
+    """Periodically expire, evict and vacuum memories in the background.
+
+    Memories are only evicted when ``max_entries`` is set.
+    """
+
+    def __init__(
+        self,
+        manager: MemoryManager,
+        max_entries: Optional[int] = None,
+        vacuum_threshold: int = 1000,
+        interval: float = 60.0,
+        batch_size: int = 500
+    ):
+        self.manager = manager
+        self.max_entries = max_entries
+        self.vacuum_threshold = vacuum_threshold
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memory-sweeper", daemon=True)
+
+    def start(self) -> None:
+        """Start sweeping."""
+        if not self._thread.is_alive():
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sweeping after the current pass."""
+        self._stopped.set()
+
+    def sweep(self) -> Dict[str, int]:
+        """Run one maintenance pass and report what it removed."""
+        return asyncio.run(self._sweep())
+
+    async def _sweep(self) -> Dict[str, int]:
+        # Expired rows go first so they never count against max_entries
+        expired = await self.manager.delete_expired(self.batch_size)
+        evicted = 0
+        if self.max_entries:
+            evicted = await self.manager.evict(self.max_entries, self.batch_size)
+        released = await self.manager.vacuum(self.vacuum_threshold)
+        return {'expired': expired, 'evicted': evicted, 'released_pages': released}
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Memory sweep failed: {str(e)}")
+
 # # src/data/memory_manager.py
 # from typing import Dict, Any, Optional, List
 # from datetime import datetime
@@ -1,34 +1,55 @@
 # server/src/data/search_index.py
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 import sqlite3
 import json
 from datetime import datetime
 from ..utils.logger import setup_logger
+from .database.async_db import get_database
 
 logger = setup_logger(__name__)
 
+# Bumped whenever the layout of memory_index changes; stored in index_version
+# (user_version belongs to the memories schema sharing this file)
+INDEX_VERSION = 1
+
+MEMORY_INDEX_TABLE = """
+    CREATE VIRTUAL TABLE {name}
+    USING fts5(
+        memory_id,
+        content,
+        metadata,
+        tokenize='porter'
+    )
+"""
+
 class SearchIndex:
     """Search index for memory storage."""
     
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self.db = get_database(db_path)
+        self.pool = self.db.pool
         self._init_index()
         
     def _init_index(self):
-        """Initialize search index tables."""
+        """Initialize search index tables, migrating older layouts."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.transaction() as conn:
+                # Serialize with other processes opening the same file
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("CREATE TABLE IF NOT EXISTS index_version (version INTEGER NOT NULL)")
+                row = conn.execute("SELECT version FROM index_version").fetchone()
+                version = row[0] if row else 0
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'memory_index'"
+                ).fetchone()
+
                 # Create full-text search table
-                conn.execute("""
-                    CREATE VIRTUAL TABLE IF NOT EXISTS memory_index 
-                    USING fts5(
-                        memory_id,
-                        content,
-                        metadata,
-                        tokenize='porter'
-                    )
-                """)
-                
+                if not exists:
+                    conn.execute(MEMORY_INDEX_TABLE.format(name='memory_index'))
+                elif version < 1:
+                    self._migrate_rowids(conn)
+
                 # Create index metadata table
                 conn.execute("""
                     CREATE TABLE IF NOT EXISTS index_metadata (
@@ -37,37 +58,76 @@ class SearchIndex:
                         avg_length REAL
                     )
                 """)
-                
+
+                conn.execute("DELETE FROM index_version")
+                conn.execute("INSERT INTO index_version (version) VALUES (?)", (INDEX_VERSION,))
                 logger.info("Search index initialized successfully")
                 
         except sqlite3.Error as e:
             logger.error(f"Failed to initialize search index: {str(e)}")
             raise
+
+    def _migrate_rowids(self, conn: sqlite3.Connection):
+        """Rebuild a legacy index so each row's rowid is its memory id.
+
+        Rows used to get automatic rowids, and a memory indexed twice got
+        two rows; only its latest row is kept.
+        """
+        conn.execute(MEMORY_INDEX_TABLE.format(name='memory_index_v1'))
+        conn.execute("""
+            INSERT INTO memory_index_v1 (rowid, memory_id, content, metadata)
+            SELECT CAST(memory_id AS INTEGER), memory_id, content, metadata
+            FROM memory_index
+            WHERE rowid IN (SELECT MAX(rowid) FROM memory_index GROUP BY CAST(memory_id AS INTEGER))
+        """)
+        conn.execute("DROP TABLE memory_index")
+        conn.execute("ALTER TABLE memory_index_v1 RENAME TO memory_index")
+        logger.info("Migrated search index rows to memory id rowids")
             
     async def index_memory(self, memory_id: int, content: str, metadata: Dict[str, Any]):
         """Index a memory entry."""
+        def index(conn: sqlite3.Connection):
+            self.add_documents(conn, [(memory_id, content, metadata)])
+            self.update_metadata(conn)
+
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
-                    """
-                    INSERT INTO memory_index (memory_id, content, metadata)
-                    VALUES (?, ?, ?)
-                    """,
-                    (
-                        str(memory_id),
-                        content,
-                        json.dumps(metadata)
-                    )
-                )
-                
-                # Update metadata
-                self._update_metadata(conn)
-                logger.debug(f"Indexed memory {memory_id}")
+            await self.db.write(index)
+            logger.debug(f"Indexed memory {memory_id}")
                 
         except sqlite3.Error as e:
             logger.error(f"Failed to index memory: {str(e)}")
             raise
 
+    def add_documents(
+        self,
+        conn: sqlite3.Connection,
+        documents: Iterable[Tuple[int, str, Dict[str, Any]]]
+    ) -> None:
+        """Insert ``(memory_id, content, metadata)`` rows on an open connection.
+
+        Lets callers index memories in the same transaction that stores
+        them. The caller refreshes index metadata once with
+        ``update_metadata``. Rows are keyed by memory id, so reindexing a
+        memory replaces its row and removal is a rowid lookup.
+        """
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO memory_index (rowid, memory_id, content, metadata)
+            VALUES (?, ?, ?, ?)
+            """,
+            (
+                (memory_id, str(memory_id), content, json.dumps(metadata))
+                for memory_id, content, metadata in documents
+            )
+        )
+
+    def remove_documents(self, conn: sqlite3.Connection, memory_ids: Iterable[int]) -> None:
+        """Delete the rows of the given memories on an open connection."""
+        conn.executemany(
+            "DELETE FROM memory_index WHERE rowid = ?",
+            ((memory_id,) for memory_id in memory_ids)
+        )
+
     async def search(
         self,
         query: str,
@@ -76,49 +136,48 @@ class SearchIndex:
     ) -> List[Dict[str, Any]]:
         """Search indexed memories."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                base_query = """
-                    SELECT 
-                        memory_id,
-                        content,
-                        metadata,
-                        rank
-                    FROM memory_index
-                    WHERE memory_index MATCH ?
-                """
-                
-                params = [query]
-                
-                if metadata_filters:
-                    filter_conditions = []
-                    for key, value in metadata_filters.items():
-                        filter_conditions.append(f'json_extract(metadata, "$.{key}") = ?')
-                        params.append(value)
-                    
-                    if filter_conditions:
-                        base_query += " AND " + " AND ".join(filter_conditions)
-                
-                base_query += f" ORDER BY rank LIMIT {limit}"
-                
-                cursor = conn.execute(base_query, params)
-                results = []
-                
-                for row in cursor:
-                    results.append({
-                        'memory_id': int(row[0]),
-                        'content': row[1],
-                        'metadata': json.loads(row[2]),
-                        'relevance': row[3]
-                    })
-                
-                logger.debug(f"Search query '{query}' returned {len(results)} results")
-                return results
+            base_query = """
+                SELECT 
+                    memory_id,
+                    content,
+                    metadata,
+                    rank
+                FROM memory_index
+                WHERE memory_index MATCH ?
+            """
+            
+            params = [query]
+            
+            if metadata_filters:
+                filter_conditions = []
+                for key, value in metadata_filters.items():
+                    filter_conditions.append(f'json_extract(metadata, "$.{key}") = ?')
+                    params.append(value)
                 
+                if filter_conditions:
+                    base_query += " AND " + " AND ".join(filter_conditions)
+            
+            base_query += f" ORDER BY rank LIMIT {limit}"
+            
+            rows = await self.db.fetchall(base_query, params)
+            results = []
+            
+            for row in rows:
+                results.append({
+                    'memory_id': int(row[0]),
+                    'content': row[1],
+                    'metadata': json.loads(row[2]),
+                    'relevance': row[3]
+                })
+            
+            logger.debug(f"Search query '{query}' returned {len(results)} results")
+            return results
+            
         except sqlite3.Error as e:
             logger.error(f"Search failed: {str(e)}")
             raise
 
-    def _update_metadata(self, conn: sqlite3.Connection):
+    def update_metadata(self, conn: sqlite3.Connection):
         """Update index metadata."""
         try:
             # Get current stats
@@ -146,23 +205,21 @@ class SearchIndex:
     async def get_stats(self) -> Dict[str, Any]:
         """Get index statistics."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute(
-                    "SELECT last_update, total_documents, avg_length FROM index_metadata"
-                )
-                row = cursor.fetchone()
-                
-                if row:
-                    return {
-                        'last_update': row[0],
-                        'total_documents': row[1],
-                        'avg_length': row[2]
-                    }
+            row = await self.db.fetchone(
+                "SELECT last_update, total_documents, avg_length FROM index_metadata"
+            )
+            
+            if row:
                 return {
-                    'last_update': None,
-                    'total_documents': 0,
-                    'avg_length': 0
+                    'last_update': row[0],
+                    'total_documents': row[1],
+                    'avg_length': row[2]
                 }
+            return {
+                'last_update': None,
+                'total_documents': 0,
+                'avg_length': 0
+            }
                 
         except sqlite3.Error as e:
             logger.error(f"Failed to get stats: {str(e)}")
@@ -1,11 +1,19 @@
 # src/data/token_processor.py
-from typing import List, AsyncGenerator, Dict, Any
-from ..core.exceptions import TokenizationError
+from typing import List, AsyncGenerator, Dict, Any, Optional
+import time
+from ..core.exceptions import LLMBaseException, TokenizationError
 from ..core.constants import ErrorCodes
 
 class TokenProcessor:
-    def __init__(self, batch_size: int = 32):
+    def __init__(
+        self,
+        batch_size: int = 32,
+        max_delay: Optional[float] = None,
+        strip_tokens: bool = True
+    ):
         self.batch_size = batch_size
+        self.max_delay = max_delay          # Flush a partial batch after this many seconds
+        self.strip_tokens = strip_tokens    # Streamed text must keep its whitespace
         self._metrics = {
             'processed': 0,
             'dropped': 0,
@@ -21,6 +29,7 @@ class TokenProcessor:
         try:
             batch = []
             token_count = 0
+            batch_started = time.monotonic()
 
             async for token in tokens:
                 token_count += 1
@@ -31,9 +40,11 @@ class TokenProcessor:
                         details={"limit": max_tokens, "received": token_count}
                     )
 
+                if not batch:
+                    batch_started = time.monotonic()
                 batch.append(token)
                 
-                if len(batch) >= self.batch_size:
+                if len(batch) >= self.batch_size or self._batch_expired(batch_started):
                     processed_batch = self._process_batch(batch)
                     yield processed_batch
                     batch = []
@@ -44,7 +55,8 @@ class TokenProcessor:
                 yield processed_batch
 
         except Exception as e:
-            if not isinstance(e, TokenizationError):
+            # Errors from the token source (e.g. ModelError) pass through as-is
+            if not isinstance(e, LLMBaseException):
                 raise TokenizationError(
                     message="Token processing failed",
                     code=ErrorCodes.TOKEN_PROCESS_FAILED,
@@ -52,11 +64,20 @@ class TokenProcessor:
                 )
             raise
 
+    def _batch_expired(self, batch_started: float) -> bool:
+        """Check whether a partial batch has waited longer than max_delay."""
+        if self.max_delay is None:
+            return False
+        return time.monotonic() - batch_started >= self.max_delay
+
     def _process_batch(self, batch: List[str]) -> List[str]:
         """Process a batch of tokens."""
         try:
             # Basic processing - can be expanded later
-            processed = [t.strip() for t in batch if t.strip()]
+            if self.strip_tokens:
+                processed = [t.strip() for t in batch if t.strip()]
+            else:
+                processed = [t for t in batch if t]
             
             # Update metrics
             self._metrics['processed'] += len(processed)
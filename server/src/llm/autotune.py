@@ -0,0 +1,183 @@
+# server/src/llm/autotune.py
+"""Find the fastest llama.cpp runtime settings for a model on this machine.
+
+    python -m src.llm.autotune models/model.gguf --threads 4 8 16
+
+Each combination of context size, batch size and thread count loads the
+model once and measures prompt-evaluation and decode tokens/sec on a fixed
+prompt set. The winning settings are written to a JSON profile that
+``LLMEngine.initialize()`` applies automatically to the same model on the
+same CPU.
+"""
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+import argparse
+import asyncio
+import json
+import os
+import platform
+import psutil
+from ..config.settings import physical_cores
+from ..utils.logger import setup_logger
+from .state_store import model_hash
+
+logger = setup_logger(__name__)
+
+PROFILE_DIR = os.path.join(".cache", "autotune")
+
+# Larger contexts are preferred while decode stays within this fraction
+# of the fastest measured rate
+CONTEXT_TOLERANCE = 0.05
+
+PROMPTS = [
+    "Explain the difference between a process and a thread in a few sentences.",
+    "Write a short Python function that checks whether a string is a palindrome.",
+    "Summarize the main causes of the French Revolution for a high school student.",
+    "List three practical tips for keeping a small team's code review process fast."
+]
+
+def cpu_signature() -> Dict[str, Any]:
+    """Describe the CPU a profile was measured on."""
+    return {
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'physical_cores': physical_cores(),
+        'logical_cores': psutil.cpu_count(logical=True)
+    }
+
+def profile_path(model_path: str, profile_dir: str = PROFILE_DIR) -> str:
+    """Location of the tuning profile for a model file."""
+    return os.path.join(profile_dir, f"{model_hash(model_path)}.json")
+
+def load_profile(model_path: str, profile_dir: str = PROFILE_DIR) -> Dict[str, Any]:
+    """Load tuned runtime settings for a model, or {} if none apply.
+
+    Profiles measured on a different CPU are ignored.
+    """
+    try:
+        path = profile_path(model_path, profile_dir)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            profile = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable autotune profile: {str(e)}")
+        return {}
+
+    if profile.get('cpu') != cpu_signature():
+        logger.info(f"Ignoring autotune profile {path} measured on a different CPU")
+        return {}
+    return profile.get('runtime', {})
+
+def select_best(results: List[Dict[str, Any]], tolerance: float = CONTEXT_TOLERANCE) -> Dict[str, Any]:
+    """Pick runtime settings from sweep results.
+
+    Decode threads come from the fastest decode run and prompt-evaluation
+    threads and batch size from the fastest prompt run. The context size is
+    the largest one whose best decode rate is within ``tolerance`` of the
+    overall best.
+    """
+    best_decode = max(results, key=lambda r: r['decode_tokens_per_sec'])
+    best_prompt = max(results, key=lambda r: r['prompt_tokens_per_sec'])
+
+    decode_by_ctx: Dict[int, float] = {}
+    for r in results:
+        decode_by_ctx[r['n_ctx']] = max(decode_by_ctx.get(r['n_ctx'], 0.0), r['decode_tokens_per_sec'])
+    floor = best_decode['decode_tokens_per_sec'] * (1 - tolerance)
+    n_ctx = max(ctx for ctx, rate in decode_by_ctx.items() if rate >= floor)
+
+    return {
+        'n_ctx': n_ctx,
+        'n_batch': best_prompt['n_batch'],
+        'n_threads': best_decode['n_threads'],
+        'n_threads_batch': best_prompt['n_threads']
+    }
+
+async def sweep(
+    model_path: str,
+    threads: List[int],
+    batch_sizes: List[int],
+    contexts: List[int],
+    decode_tokens: int = 32
+) -> List[Dict[str, Any]]:
+    """Measure throughput for every runtime combination."""
+    from .engine import LLMEngine
+
+    results = []
+    for n_ctx in contexts:
+        for n_batch in batch_sizes:
+            for n_threads in threads:
+                engine = LLMEngine(
+                    model_path,
+                    n_ctx=n_ctx,
+                    n_batch=n_batch,
+                    n_threads=n_threads,
+                    n_threads_batch=n_threads,
+                    prefix_cache_bytes=0,
+                    state_dir=None,
+                    use_profile=False
+                )
+                try:
+                    await engine.initialize()
+                    rates = await engine.measure_throughput(PROMPTS, decode_tokens)
+                finally:
+                    engine.shutdown()
+
+                result = {'n_ctx': n_ctx, 'n_batch': n_batch, 'n_threads': n_threads, **rates}
+                results.append(result)
+                print(
+                    f"n_ctx={n_ctx:<6} n_batch={n_batch:<5} n_threads={n_threads:<3} "
+                    f"prompt {rates['prompt_tokens_per_sec']:8.1f} tok/s  "
+                    f"decode {rates['decode_tokens_per_sec']:7.1f} tok/s"
+                )
+    return results
+
+def autotune(
+    model_path: str,
+    threads: List[int],
+    batch_sizes: List[int],
+    contexts: List[int],
+    decode_tokens: int = 32,
+    output: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run the sweep and write the resulting profile."""
+    results = asyncio.run(sweep(model_path, threads, batch_sizes, contexts, decode_tokens))
+    profile = {
+        'model_path': os.path.abspath(model_path),
+        'model_hash': model_hash(model_path),
+        'cpu': cpu_signature(),
+        'created_at': datetime.now().isoformat(),
+        'runtime': select_best(results),
+        'results': results
+    }
+
+    path = output or profile_path(model_path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(profile, f, indent=2)
+    print(f"Best runtime settings: {profile['runtime']}")
+    print(f"Profile written to {path}")
+    return profile
+
+def _default_threads() -> List[int]:
+    physical = physical_cores()
+    logical = psutil.cpu_count(logical=True) or physical
+    return sorted({max(1, physical // 2), physical, logical})
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune llama.cpp runtime settings for this machine")
+    parser.add_argument("model_path")
+    parser.add_argument("--threads", type=int, nargs="+", default=_default_threads())
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[128, 256, 512])
+    parser.add_argument("--contexts", type=int, nargs="+", default=[2048])
+    parser.add_argument("--decode-tokens", type=int, default=32)
+    parser.add_argument("--output", help="Profile path (defaults to the location initialize() reads)")
+    args = parser.parse_args()
+    autotune(
+        args.model_path,
+        args.threads,
+        args.batch_sizes,
+        args.contexts,
+        args.decode_tokens,
+        args.output
+    )
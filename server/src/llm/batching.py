@@ -0,0 +1,422 @@
+# server/src/llm/batching.py
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+import argparse
+import asyncio
+import inspect
+import queue
+import threading
+import time
+import numpy as np
+import llama_cpp
+from llama_cpp import Llama
+from ..core.exceptions import ModelError
+from ..core.constants import ErrorCodes, RequestPriority
+from ..utils.logger import setup_logger
+from .executor import InferenceExecutor
+from .scheduler import RequestQueue
+from .sampling import sample, token_distribution
+
+logger = setup_logger(__name__)
+
+@dataclass
+class BatchRequest:
+    """A completion request waiting for, or decoding in, a batch slot."""
+    prompt: str
+    params: Dict[str, Any]
+    future: Future = field(default_factory=Future)
+    deadline: Optional[float] = None
+    enqueued_at: float = 0.0
+    on_text: Optional[Callable[[str], None]] = None
+    cancelled: bool = False    # Set when a streaming consumer goes away
+
+@dataclass
+class _Sequence:
+    """Decode state of one request while it occupies a batch slot."""
+    request: BatchRequest
+    seq_id: int
+    prompt_tokens: List[int]
+    max_tokens: int
+    n_prefilled: int = 0
+    generated: List[int] = field(default_factory=list)
+    text: str = ""
+    finish_reason: Optional[str] = None
+    batch_index: int = -1      # Index of this sequence's logits in the current batch
+
+    @property
+    def n_past(self) -> int:
+        return self.n_prefilled + len(self.generated)
+
+class ContinuousBatcher:
+    """Continuous batching over llama.cpp's multi-sequence decode API.
+
+    Concurrent requests share one ``llama_decode`` call per step: each active
+    sequence contributes its next token (or a chunk of its prompt) under its
+    own sequence id, and the logits are split back out per request. New
+    requests join between steps as soon as a slot frees up, so a long answer
+    does not hold back short ones. The decode loop runs as a job on the
+    engine's InferenceExecutor, which keeps owning the model.
+
+    The context is split into ``max_batch_size`` equal slots; a request's
+    prompt plus completion must fit in one slot.
+    """
+
+    def __init__(
+        self,
+        model: Llama,
+        executor: InferenceExecutor,
+        max_batch_size: int = 4,
+        max_wait: float = 0.01,
+        max_queue_size: int = 16,
+        job_wrapper: Optional[Callable[..., Any]] = None
+    ):
+        if not hasattr(llama_cpp, 'llama_decode'):
+            raise ModelError(
+                message="Batching requires a llama-cpp-python build with the batch decode API",
+                code=ErrorCodes.MODEL_LOAD_FAILED
+            )
+
+        self.model = model
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.slot_size = model.n_ctx() // max_batch_size
+        self._pending = RequestQueue(max_size=max_queue_size)
+        self._wrap = job_wrapper or (lambda fn, *args: fn(*args))
+        self._lock = threading.Lock()
+        self._loop_scheduled = False
+        self._rng = np.random.default_rng()
+        self._metrics = {
+            'steps': 0,
+            'tokens_decoded': 0,
+            'batch_occupancy': 0,
+            'completed': 0
+        }
+
+    def submit(
+        self,
+        prompt: str,
+        params: Dict[str, Any],
+        priority: RequestPriority = RequestPriority.NORMAL,
+        timeout: Optional[float] = None,
+        on_text: Optional[Callable[[str], None]] = None
+    ) -> Future:
+        """Queue a completion and return a future for its result.
+
+        ``params`` takes the same sampling keys as ``create_completion``.
+        ``on_text`` is called on the inference thread with each new piece
+        of text.
+        """
+        return self._enqueue(prompt, params, priority, timeout, on_text).future
+
+    def _enqueue(
+        self,
+        prompt: str,
+        params: Dict[str, Any],
+        priority: RequestPriority = RequestPriority.NORMAL,
+        timeout: Optional[float] = None,
+        on_text: Optional[Callable[[str], None]] = None
+    ) -> BatchRequest:
+        """Admit a request to the pending queue and make sure the loop is running."""
+        now = time.monotonic()
+        request = BatchRequest(
+            prompt=prompt,
+            params=params,
+            deadline=now + timeout if timeout else None,
+            enqueued_at=now,
+            on_text=on_text
+        )
+        with self._lock:
+            self._pending.put(request, priority=priority)
+            if not self._loop_scheduled:
+                self._loop_scheduled = True
+                self.executor.submit(self._wrap, self._run_loop, priority=RequestPriority.HIGH, force=True)
+        return request
+
+    async def run(self, prompt: str, params: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        """Run a batched completion and await its result."""
+        return await asyncio.wrap_future(self.submit(prompt, params, **kwargs))
+
+    async def stream(self, prompt: str, params: Dict[str, Any], **kwargs) -> AsyncGenerator[Dict[str, Any], None]:
+        """Run a batched completion, yielding chunks shaped like create_completion(stream=True)."""
+        loop = asyncio.get_running_loop()
+        pieces: asyncio.Queue = asyncio.Queue()
+
+        def on_text(text: str) -> None:
+            try:
+                loop.call_soon_threadsafe(pieces.put_nowait, text)
+            except RuntimeError:
+                pass  # Consumer has gone away
+
+        def on_done(future: Future) -> None:
+            try:
+                loop.call_soon_threadsafe(pieces.put_nowait, None)
+            except RuntimeError:
+                pass
+
+        request = self._enqueue(prompt, params, on_text=on_text, **kwargs)
+        future = request.future
+        future.add_done_callback(on_done)
+
+        try:
+            while True:
+                text = await pieces.get()
+                if text is None:
+                    break
+                yield {'choices': [{'text': text, 'finish_reason': None}]}
+        finally:
+            # Frees the slot at the next step if the consumer stopped early
+            request.cancelled = True
+
+        # Raises if the request failed
+        result = future.result()
+        yield {'choices': [{'text': '', 'finish_reason': result['choices'][0]['finish_reason']}]}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get batching throughput metrics."""
+        steps = self._metrics['steps']
+        return {
+            **self._metrics,
+            'pending': len(self._pending),
+            'average_batch_size': self._metrics['batch_occupancy'] / steps if steps else 0
+        }
+
+    # --- Decode loop (inference thread only) ---
+
+    def _run_loop(self) -> None:
+        """Decode until no request is active or pending."""
+        ctx = model_context(self.model)
+        n_batch = self.model.n_batch
+        batch = batch_init(n_batch, self.max_batch_size)
+        active: List[_Sequence] = []
+        free_slots = list(range(self.max_batch_size))
+
+        try:
+            while True:
+                # Wait briefly for a batch to form when idle; never stall active sequences
+                self._admit(active, free_slots, wait=0 if active else self.max_wait)
+                if not active:
+                    with self._lock:
+                        if len(self._pending) == 0:
+                            self._loop_scheduled = False
+                            return
+                    continue
+
+                self._step(ctx, batch, n_batch, active)
+
+                for seq in [s for s in active if s.finish_reason]:
+                    active.remove(seq)
+                    free_slots.append(seq.seq_id)
+                    llama_cpp.llama_kv_cache_seq_rm(ctx, seq.seq_id, -1, -1)
+                    self._complete(seq)
+
+        except Exception as e:
+            logger.error(f"Batch decode loop failed: {str(e)}")
+            for seq in active:
+                if not seq.request.future.done():
+                    seq.request.future.set_exception(e)
+            with self._lock:
+                self._loop_scheduled = False
+                if len(self._pending) > 0:
+                    self._loop_scheduled = True
+                    self.executor.submit(self._wrap, self._run_loop, priority=RequestPriority.HIGH, force=True)
+        finally:
+            llama_cpp.llama_batch_free(batch)
+            # Leave a clean KV cache for the sequential completion path
+            llama_cpp.llama_kv_cache_seq_rm(ctx, -1, -1, -1)
+            self.model.reset()
+
+    def _admit(self, active: List[_Sequence], free_slots: List[int], wait: float) -> None:
+        """Move pending requests into free slots."""
+        wait_until = time.monotonic() + wait
+        while free_slots:
+            try:
+                request = self._pending.get(timeout=max(0.0, wait_until - time.monotonic()))
+            except queue.Empty:
+                return
+            if not request.future.set_running_or_notify_cancel():
+                continue
+
+            prompt_tokens = self.model.tokenize(request.prompt.encode('utf-8'))
+            max_tokens = min(request.params.get('max_tokens', 16), self.slot_size - len(prompt_tokens))
+            if max_tokens <= 0:
+                request.future.set_exception(ModelError(
+                    message="Prompt too long for a batch slot",
+                    code=ErrorCodes.TOKEN_LIMIT_EXCEEDED,
+                    details={"prompt_tokens": len(prompt_tokens), "slot_size": self.slot_size}
+                ))
+                continue
+
+            active.append(_Sequence(
+                request=request,
+                seq_id=free_slots.pop(0),
+                prompt_tokens=prompt_tokens,
+                max_tokens=max_tokens
+            ))
+
+    def _step(self, ctx, batch, n_batch: int, active: List[_Sequence]) -> None:
+        """Run one shared decode step and sample the next token of each ready sequence."""
+        batch.n_tokens = 0
+        sampling: List[_Sequence] = []
+
+        # Decoding sequences first: one token each keeps them moving
+        for seq in active:
+            seq.batch_index = -1
+            if seq.n_prefilled == len(seq.prompt_tokens) and seq.generated:
+                seq.batch_index = batch_add(batch, seq.generated[-1], seq.n_past - 1, seq.seq_id, True)
+                sampling.append(seq)
+
+        # Then prompt chunks, as many as fit in this batch
+        for seq in active:
+            remaining = len(seq.prompt_tokens) - seq.n_prefilled
+            if remaining == 0 or batch.n_tokens >= n_batch:
+                continue
+            take = min(remaining, n_batch - batch.n_tokens)
+            for offset in range(take):
+                pos = seq.n_prefilled + offset
+                last = offset == take - 1 and pos == len(seq.prompt_tokens) - 1
+                index = batch_add(batch, seq.prompt_tokens[pos], pos, seq.seq_id, last)
+                if last:
+                    seq.batch_index = index
+            seq.n_prefilled += take
+            if seq.n_prefilled == len(seq.prompt_tokens):
+                sampling.append(seq)
+
+        decode_batch(ctx, batch)
+
+        self._metrics['steps'] += 1
+        self._metrics['batch_occupancy'] += len(active)
+
+        n_vocab = self.model.n_vocab()
+        for seq in sampling:
+            logits = np.ctypeslib.as_array(
+                llama_cpp.llama_get_logits_ith(ctx, seq.batch_index),
+                shape=(n_vocab,)
+            )
+            self._accept(seq, self._sample(logits, seq))
+
+    def _accept(self, seq: _Sequence, token: int) -> None:
+        """Append a sampled token, emit new text and check stop conditions."""
+        self._metrics['tokens_decoded'] += 1
+        if token == self.model.token_eos():
+            seq.finish_reason = 'stop'
+            return
+
+        seq.generated.append(token)
+        text = self.model.detokenize(seq.generated).decode('utf-8', errors='ignore')
+
+        for stop in seq.request.params.get('stop') or []:
+            index = text.find(stop)
+            if index != -1:
+                text = text[:index]
+                seq.finish_reason = 'stop'
+                break
+
+        if len(text) > len(seq.text):
+            self._emit(seq, text[len(seq.text):])
+            seq.text = text
+
+        if not seq.finish_reason and len(seq.generated) >= seq.max_tokens:
+            seq.finish_reason = 'length'
+        if not seq.finish_reason and seq.request.cancelled:
+            seq.finish_reason = 'cancelled'
+
+    def _sample(self, logits: np.ndarray, seq: _Sequence) -> int:
+        """Sample a token the way ``create_completion`` would."""
+        history = seq.prompt_tokens + seq.generated
+        return sample(token_distribution(logits, seq.request.params, history), self._rng)
+
+    def _emit(self, seq: _Sequence, text: str) -> None:
+        """Hand new text to a streaming consumer."""
+        if seq.request.on_text:
+            try:
+                seq.request.on_text(text)
+            except Exception as e:
+                logger.error(f"Stream callback failed: {str(e)}")
+
+    def _complete(self, seq: _Sequence) -> None:
+        """Resolve a finished sequence with a create_completion-shaped result."""
+        self._metrics['completed'] += 1
+        prompt_tokens = len(seq.prompt_tokens)
+        completion_tokens = len(seq.generated)
+        seq.request.future.set_result({
+            'choices': [{'text': seq.text, 'finish_reason': seq.finish_reason}],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            }
+        })
+
+def model_context(model: Llama):
+    """Return the raw llama_context pointer of a model."""
+    ctx = getattr(model, 'ctx', None)
+    if ctx is None:
+        ctx = model._ctx.ctx
+    return ctx
+
+def batch_init(n_tokens: int, n_seq_max: int = 1):
+    """Allocate a llama_batch, covering both the old and new C signatures."""
+    if len(inspect.signature(llama_cpp.llama_batch_init).parameters) >= 3:
+        return llama_cpp.llama_batch_init(n_tokens, 0, n_seq_max)
+    return llama_cpp.llama_batch_init(n_tokens, 0)
+
+def batch_add(batch, token: int, pos: int, seq_id: int, logits: bool) -> int:
+    """Append one token to a llama_batch and return its index."""
+    i = batch.n_tokens
+    batch.token[i] = token
+    batch.pos[i] = pos
+    if hasattr(batch, 'n_seq_id'):
+        batch.n_seq_id[i] = 1
+        batch.seq_id[i][0] = seq_id
+    else:
+        batch.seq_id[i] = seq_id
+    batch.logits[i] = 1 if logits else 0
+    batch.n_tokens += 1
+    return i
+
+def decode_batch(ctx, batch) -> None:
+    """Run llama_decode, raising ModelError on failure."""
+    return_code = llama_cpp.llama_decode(ctx, batch)
+    if return_code != 0:
+        raise ModelError(
+            message="llama_decode failed",
+            code=ErrorCodes.MODEL_RESPONSE_FAILED,
+            details={"return_code": return_code}
+        )
+
+def benchmark(model_path: str, concurrency: List[int], max_tokens: int, batch_size: int) -> None:
+    """Measure aggregate decode throughput at increasing concurrency."""
+    from .engine import LLMEngine
+
+    async def run_level(engine: 'LLMEngine', n: int) -> float:
+        prompts = [f"Write a short note about topic number {i}." for i in range(n)]
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            engine.generate_response(p, max_tokens=max_tokens, temperature=0.0, use_cache=False)
+            for p in prompts
+        ])
+        elapsed = time.perf_counter() - start
+        return sum(r['tokens_used'] for r in results) / elapsed
+
+    async def main() -> None:
+        for batching in (False, True):
+            engine = LLMEngine(model_path, batching=batching, max_batch_size=batch_size)
+            await engine.initialize()
+            for n in concurrency:
+                rate = await run_level(engine, n)
+                mode = "batched" if batching else "sequential"
+                print(f"{mode:>10}  concurrency={n:<3} {rate:8.1f} tokens/sec")
+            engine.shutdown()
+
+    asyncio.run(main())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark continuous batching throughput")
+    parser.add_argument("model_path")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--max-tokens", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+    benchmark(args.model_path, args.concurrency, args.max_tokens, args.batch_size)
@@ -1,36 +1,149 @@
 # server/src/llm/engine.py
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncGenerator, Iterator, Callable, List
 import time
 from llama_cpp import Llama
 import psutil
 import os
-from ..core.exceptions import ModelError
-from ..core.constants import ModelStatus, ErrorCodes
+from ..core.exceptions import ModelError, SchedulerError
+from ..core.constants import ModelStatus, ErrorCodes, RequestPriority
 from ..utils.logger import setup_logger
+from ..utils.async_utils import SingleFlight
 from ..services.cache_service import cache_service
+from ..config.settings import config
+from ..services.analytics import analytics_service, PerformanceSampler
+from ..data.token_processor import TokenProcessor
+from .executor import InferenceExecutor
+from .batching import ContinuousBatcher
+from .prefix_cache import PrefixCache
+from .state_store import StateStore, model_hash
+from .autotune import load_profile
+from .speculative import SpeculativeDecoder
+from .semantic_cache import SemanticCache
 
 logger = setup_logger(__name__)
 
+# LLM responses get their own namespace so other workloads cannot evict them
+response_cache = cache_service.namespace('llm')
+
 class LLMEngine:
     """Real LLM Engine using llama.cpp."""
+
+    # Streaming flushes a chunk every few tokens or after a short delay,
+    # whichever comes first, so clients see text almost immediately.
+    STREAM_BATCH_SIZE = 4
+    STREAM_MAX_DELAY = 0.1
+
+    # Admission control: requests beyond MAX_QUEUE_SIZE are rejected (429),
+    # and queued requests older than REQUEST_TIMEOUT seconds are dropped (503)
+    MAX_QUEUE_SIZE = 16
+    REQUEST_TIMEOUT = 120.0
+
+    # Memory budget for saved llama.cpp states reused across prompts that
+    # share a prefix (system prompt, earlier conversation turns); 0 disables
+    PREFIX_CACHE_BYTES = 1 << 30
+
+    # Prefix states saved by cache_prefix() are persisted here and reloaded
+    # on initialize(), so restarts do not re-evaluate hot system prompts
+    STATE_DIR = os.path.join(".cache", "kv_states")
+
+    # Evaluated once after loading so the weights are paged in before the
+    # first real request; system prompts, when given, are used instead
+    WARMUP_PROMPT = "Hello"
     
-    def __init__(self, model_path: str):
+    def __init__(
+        self,
+        model_path: str,
+        max_queue_size: int = MAX_QUEUE_SIZE,
+        request_timeout: float = REQUEST_TIMEOUT,
+        batching: bool = False,
+        max_batch_size: int = 4,
+        max_batch_wait: float = 0.01,
+        prefix_cache_bytes: int = PREFIX_CACHE_BYTES,
+        state_dir: Optional[str] = STATE_DIR,
+        n_ctx: Optional[int] = None,
+        n_batch: Optional[int] = None,
+        n_threads: Optional[int] = None,
+        n_threads_batch: Optional[int] = None,
+        use_mmap: Optional[bool] = None,
+        use_mlock: Optional[bool] = None,
+        warmup: bool = True,
+        use_profile: bool = True,
+        draft_model_path: Optional[str] = None,
+        n_draft: int = 4,
+        semantic_cache_threshold: Optional[float] = None,
+        embedding_model_path: Optional[str] = None,
+        system_prompts: Optional[List[str]] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
         self.model_path = model_path
         self.model: Optional[Llama] = None
+        self.model_id: Optional[str] = None  # Content hash of the model file, set on initialize
         self.status = ModelStatus.INITIALIZING
+        self.request_timeout = request_timeout
+        self.batching = batching
+        self.max_batch_size = max_batch_size
+        self.max_batch_wait = max_batch_wait
+        self.max_queue_size = max_queue_size
+        self._batcher: Optional[ContinuousBatcher] = None
+        self._prefix_cache = PrefixCache(prefix_cache_bytes) if prefix_cache_bytes > 0 else None
+        self.state_dir = state_dir
+        self._state_store: Optional[StateStore] = None
+        # Runtime knobs left unset come from the autotune profile, if one
+        # was measured for this model and CPU, then from the configuration
+        self._runtime_overrides = {
+            key: value for key, value in {
+                'n_ctx': n_ctx,  # Per sequence; batching allocates one slot per entry
+                'n_batch': n_batch,
+                'n_threads': n_threads,
+                'n_threads_batch': n_threads_batch,
+                'use_mmap': use_mmap,
+                'use_mlock': use_mlock
+            }.items() if value is not None
+        }
+        self.use_profile = use_profile
+        self.runtime = self._resolve_runtime({})
+        self.draft_model_path = draft_model_path
+        self.n_draft = n_draft
+        self.draft_model: Optional[Llama] = None
+        self._speculative: Optional[SpeculativeDecoder] = None
+        self._inflight = SingleFlight()
+        # Deterministic requests may reuse the response to a near-identical
+        # earlier prompt; embeddings come from embedding_model_path, or from
+        # a second context on the generation model's (shared, mmapped) weights
+        self.semantic_cache_threshold = semantic_cache_threshold
+        self.embedding_model_path = embedding_model_path
+        self.embedder: Optional[Llama] = None
+        self._semantic_cache: Optional[SemanticCache] = None
+        self.warmup = warmup
+        self.system_prompts = list(system_prompts or [])
+        self._on_progress = on_progress
+        self.load_progress: Dict[str, Any] = {'stage': 'pending', 'progress': 0.0}
         self._start_time = time.time()
+        # All llama.cpp calls run on this thread, never on the event loop
+        self._executor = InferenceExecutor(
+            name=f"inference-{os.path.basename(model_path)}",
+            max_queue_size=max_queue_size
+        )
+        self._sampler = PerformanceSampler(analytics_service, lambda: self.queue_depth)
         self.settings = {
             'temperature': 0.7,
             'max_tokens': 512,
             'top_p': 0.9,
+            'top_k': 40,
             'frequency_penalty': 0.0,
             'presence_penalty': 0.0,
+            'repeat_penalty': 1.1,
             'stop_sequences': []
         }
         logger.info(f"Initializing LLM Engine with model: {model_path}")
 
     async def initialize(self) -> None:
-        """Initialize the LLM model."""
+        """Initialize the LLM model.
+
+        Loading reports progress through ``load_progress`` and the
+        ``on_progress`` callback in stages: loading, restoring, warmup and
+        ready. The status stays INITIALIZING until warmup has finished.
+        """
         try:
             if not os.path.exists(self.model_path):
                 raise ModelError(
@@ -39,19 +152,95 @@ class LLMEngine:
                     details={"path": self.model_path}
                 )
 
-            self.model = Llama(
+            self.status = ModelStatus.INITIALIZING
+            self._report_progress('loading', 0.0)
+            self.model_id = model_hash(self.model_path)
+            if self.use_profile:
+                self.runtime = self._resolve_runtime(load_profile(self.model_path))
+            runtime = self.runtime
+            self.model = await self._executor.run(
+                Llama,
+                priority=RequestPriority.HIGH,
                 model_path=self.model_path,
-                n_ctx=2048,              # Context window
-                n_parts=-1,              # Auto-detect number of parts
-                n_gpu_layers=0,          # CPU only by default
-                n_threads=os.cpu_count() # Use all CPU cores
+                n_ctx=runtime['n_ctx'] * (self.max_batch_size if self.batching else 1),
+                n_batch=runtime['n_batch'],
+                n_parts=-1,                                 # Auto-detect number of parts
+                n_gpu_layers=0,                             # CPU only by default
+                n_threads=runtime['n_threads'],             # Decode threads
+                n_threads_batch=runtime['n_threads_batch'], # Prompt evaluation threads
+                use_mmap=runtime['use_mmap'],               # Map weights instead of reading them
+                use_mlock=runtime['use_mlock']              # Pin weights in RAM, never swapped out
             )
+
+            if self.batching:
+                self._batcher = ContinuousBatcher(
+                    self.model,
+                    self._executor,
+                    max_batch_size=self.max_batch_size,
+                    max_wait=self.max_batch_wait,
+                    max_queue_size=self.max_queue_size,
+                    job_wrapper=self._run_job
+                )
+                if self.draft_model_path:
+                    logger.warning("Speculative decoding is not supported with batching; ignoring draft model")
+            elif self.draft_model_path:
+                self._report_progress('loading_draft', 0.5)
+                self.draft_model = await self._executor.run(
+                    Llama,
+                    priority=RequestPriority.HIGH,
+                    model_path=self.draft_model_path,
+                    n_ctx=runtime['n_ctx'],
+                    n_batch=runtime['n_batch'],
+                    n_gpu_layers=0,
+                    n_threads=runtime['n_threads'],
+                    n_threads_batch=runtime['n_threads_batch'],
+                    use_mmap=runtime['use_mmap'],
+                    use_mlock=runtime['use_mlock']
+                )
+                self._speculative = SpeculativeDecoder(self.model, self.draft_model, self.n_draft)
+
+            if self.semantic_cache_threshold is not None:
+                self._report_progress('loading_embedder', 0.55)
+                self.embedder = await self._executor.run(
+                    Llama,
+                    priority=RequestPriority.HIGH,
+                    model_path=self.embedding_model_path or self.model_path,
+                    embedding=True,
+                    n_ctx=runtime['n_ctx'],
+                    n_batch=runtime['n_batch'],
+                    n_gpu_layers=0,
+                    n_threads=runtime['n_threads'],
+                    n_threads_batch=runtime['n_threads_batch'],
+                    use_mmap=runtime['use_mmap'],
+                    use_mlock=runtime['use_mlock']
+                )
+                self._semantic_cache = SemanticCache(self.embedder.n_embd(), self.semantic_cache_threshold)
+
+            # The batcher and the speculative decoder manage the KV cache
+            # themselves; only plain sequential completions reuse prefix states
+            if self._batcher is not None or self._speculative is not None:
+                self._prefix_cache = None
+            elif self._prefix_cache is not None:
+                self.model.set_cache(self._prefix_cache)
+                if self.state_dir:
+                    self._report_progress('restoring', 0.6)
+                    await self._executor.run(
+                        self._restore_prefixes,
+                        priority=RequestPriority.HIGH
+                    )
+
+            if self.warmup:
+                self._report_progress('warmup', 0.7)
+                await self._warmup()
             
             self.status = ModelStatus.READY
+            self._sampler.start()
+            self._report_progress('ready', 1.0)
             logger.info("Model initialized successfully")
             
         except Exception as e:
             self.status = ModelStatus.ERROR
+            self._report_progress('error', self.load_progress['progress'], error=str(e))
             logger.error(f"Failed to initialize model: {str(e)}")
             raise ModelError(
                 message="Failed to initialize model",
@@ -59,73 +248,474 @@ class LLMEngine:
                 details={"error": str(e)}
             )
 
+    def _resolve_runtime(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge configured defaults, a tuning profile and explicit overrides."""
+        defaults = config.model
+        runtime = {
+            'n_ctx': defaults.n_ctx,
+            'n_batch': defaults.n_batch,
+            'n_threads': defaults.n_threads,
+            'n_threads_batch': defaults.n_threads_batch,
+            'use_mmap': defaults.use_mmap,
+            'use_mlock': defaults.use_mlock
+        }
+        runtime.update({key: value for key, value in profile.items() if key in runtime})
+        runtime.update(self._runtime_overrides)
+        return runtime
+
+    async def _warmup(self) -> None:
+        """Run a first forward pass so no real request hits cold page faults."""
+        start_time = time.time()
+        if self._batcher is not None:
+            # Go through the decode loop, which leaves the KV cache clean
+            await self._batcher.run(
+                self.WARMUP_PROMPT,
+                self._completion_args(1, 0.0),
+                priority=RequestPriority.HIGH
+            )
+        elif self.system_prompts and self._prefix_cache is not None:
+            # Evaluating the system prompts warms the weights and leaves
+            # their states ready for reuse
+            for prompt in self.system_prompts:
+                await self._executor.run(self._snapshot_prefix, prompt, priority=RequestPriority.HIGH)
+        else:
+            await self._executor.run(self._evaluate, self.model, self.WARMUP_PROMPT, priority=RequestPriority.HIGH)
+            if self.draft_model is not None:
+                await self._executor.run(self._evaluate, self.draft_model, self.WARMUP_PROMPT, priority=RequestPriority.HIGH)
+        if self.embedder is not None:
+            await self._executor.run(self._evaluate, self.embedder, self.WARMUP_PROMPT, priority=RequestPriority.HIGH)
+        logger.info(f"Model warmup finished in {time.time() - start_time:.2f}s")
+
+    @staticmethod
+    def _evaluate(model: Llama, prompt: str) -> None:
+        """Evaluate a prompt without sampling, then discard it."""
+        model.eval(model.tokenize(prompt.encode('utf-8')))
+        model.reset()
+
+    def _report_progress(self, stage: str, progress: float, **extra: Any) -> None:
+        """Record load progress and notify the progress callback."""
+        self.load_progress = {'stage': stage, 'progress': progress, **extra}
+        if self._on_progress is not None:
+            try:
+                self._on_progress({
+                    'model_path': self.model_path,
+                    'status': self.status,
+                    **self.load_progress
+                })
+            except Exception as e:
+                logger.warning(f"Load progress callback failed: {str(e)}")
+
     async def generate_response(
         self,
         prompt: str,
         max_tokens: int = 512,
         temperature: float = 0.7,
-        use_cache: bool = True
+        use_cache: bool = True,
+        priority: RequestPriority = RequestPriority.NORMAL,
+        timeout: Optional[float] = None
     ) -> Dict[str, Any]:
         """Generate a response using the LLM."""
         try:
-            if not self.model or self.status != ModelStatus.READY:
+            if not self.is_ready:
                 raise ModelError(
                     message="Model not ready",
                     code=ErrorCodes.MODEL_NOT_READY
                 )
 
             # Check cache if enabled
+            cache_key = self._response_key(prompt, max_tokens, temperature)
             if use_cache:
-                cache_key = f"llm_response:{prompt}:{max_tokens}:{temperature}"
-                cached_response = await cache_service.get(cache_key)
+                cached_response = await response_cache.get(cache_key)
                 if cached_response:
                     logger.debug(f"Cache hit for prompt: {prompt[:50]}...")
                     return cached_response
 
-            self.status = ModelStatus.PROCESSING
-            start_time = time.time()
-            logger.debug(f"Generating response for prompt: {prompt[:50]}...")
+            # Identical requests already in flight share one generation
+            return await self._inflight.run(
+                cache_key,
+                lambda: self._generate_response(prompt, max_tokens, temperature, use_cache, priority, timeout, cache_key)
+            )
+
+        except SchedulerError:
+            # Backpressure is not a model failure; let callers map it to 429/503
+            raise
+        except Exception as e:
+            logger.error(f"Error generating response: {str(e)}")
+            raise ModelError(
+                message="Failed to generate response",
+                code=ErrorCodes.MODEL_RESPONSE_FAILED,
+                details={"error": str(e)}
+            )
+
+    async def _generate_response(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        use_cache: bool,
+        priority: RequestPriority,
+        timeout: Optional[float],
+        cache_key: str
+    ) -> Dict[str, Any]:
+        """Consult the semantic cache, then generate and cache a response."""
+        # Only deterministic responses are safe to hand to a different prompt
+        embedding = None
+        if use_cache and self._semantic_cache is not None and temperature == 0:
+            scope = self._semantic_scope(max_tokens)
+            embedding = await self._embed(prompt, priority, timeout)
+            similar_key = self._semantic_cache.lookup(embedding, scope) if embedding else None
+            if similar_key:
+                cached_response = await response_cache.get(similar_key)
+                if cached_response:
+                    logger.debug(f"Semantic cache hit for prompt: {prompt[:50]}...")
+                    return cached_response
+                self._semantic_cache.remove(similar_key)
+
+        start_time = time.time()
+        logger.debug(f"Generating response for prompt: {prompt[:50]}...")
 
-            # Generate response
-            response = self.model.create_completion(
+        # Generate response on the inference thread
+        if self._batcher:
+            response = await self._batcher.run(
+                prompt,
+                self._completion_args(max_tokens, temperature),
+                priority=priority,
+                timeout=timeout or self.request_timeout
+            )
+        else:
+            response = await self._executor.run(
+                self._run_job,
+                self._completion_fn,
                 prompt,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                top_p=self.settings['top_p'],
-                frequency_penalty=self.settings['frequency_penalty'],
-                presence_penalty=self.settings['presence_penalty'],
-                stop=self.settings['stop_sequences'] or None,
-                echo=False
+                priority=priority,
+                timeout=timeout or self.request_timeout,
+                **self._completion_args(max_tokens, temperature)
             )
 
-            # Process response
-            result = {
-                "response": response['choices'][0]['text'].strip(),
-                "tokens_used": response['usage']['total_tokens'],
-                "finish_reason": response['choices'][0]['finish_reason'],
-                "generation_time": time.time() - start_time
-            }
+        # Process response
+        result = {
+            "response": response['choices'][0]['text'].strip(),
+            "tokens_used": response['usage']['total_tokens'],
+            "finish_reason": response['choices'][0]['finish_reason'],
+            "generation_time": time.time() - start_time
+        }
 
-            # Cache the response
-            if use_cache:
-                await cache_service.set(
-                    cache_key,
-                    result,
-                    expire=300  # Cache for 5 minutes
-                )
+        # Cache the response
+        if use_cache:
+            await response_cache.set(
+                cache_key,
+                result,
+                expire=300  # Cache for 5 minutes
+            )
+            if embedding:
+                self._semantic_cache.add(embedding, scope, cache_key)
 
-            self.status = ModelStatus.READY
-            return result
+        return result
+
+    async def _embed(
+        self,
+        prompt: str,
+        priority: RequestPriority,
+        timeout: Optional[float]
+    ) -> Optional[List[float]]:
+        """Embed a prompt for the semantic cache, or None if that fails.
+
+        A failed embedding only costs the semantic lookup, never the request.
+        """
+        try:
+            response = await self._executor.run(
+                self.embedder.create_embedding,
+                prompt,
+                priority=priority,
+                timeout=timeout or self.request_timeout
+            )
+            return response['data'][0]['embedding']
+        except SchedulerError:
+            raise
+        except Exception as e:
+            logger.warning(f"Skipping semantic cache, embedding failed: {str(e)}")
+            return None
+
+    def _response_key(self, prompt: str, max_tokens: int, temperature: float) -> str:
+        """Cache key covering the model file, the prompt and every sampling parameter."""
+        return response_cache.make_key(
+            'llm_response',
+            model=self.model_id,
+            prompt=prompt,
+            **self._completion_args(max_tokens, temperature)
+        )
+
+    def _semantic_scope(self, max_tokens: int) -> str:
+        """Generation settings a semantic cache hit must share with the request."""
+        return response_cache.make_key(
+            'llm_scope',
+            model=self.model_id,
+            **self._completion_args(max_tokens, 0.0)
+        )
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 512,
+        temperature: float = 0.7,
+        priority: RequestPriority = RequestPriority.NORMAL,
+        timeout: Optional[float] = None
+    ) -> AsyncGenerator[str, None]:
+        """Generate a response, yielding text pieces as the model produces them."""
+        if not self.is_ready:
+            raise ModelError(
+                message="Model not ready",
+                code=ErrorCodes.MODEL_NOT_READY
+            )
+
+        try:
+            logger.debug(f"Streaming response for prompt: {prompt[:50]}...")
+
+            # A client asking for a stream that is already being generated
+            # replays what has been produced so far, then follows along
+            stream = self._inflight.stream(
+                f"stream:{self._response_key(prompt, max_tokens, temperature)}",
+                lambda: self._stream_text(prompt, max_tokens, temperature, priority, timeout)
+            )
+            async for text in stream:
+                yield text
 
+        except SchedulerError:
+            raise
         except Exception as e:
-            self.status = ModelStatus.ERROR
-            logger.error(f"Error generating response: {str(e)}")
+            logger.error(f"Error streaming response: {str(e)}")
             raise ModelError(
                 message="Failed to generate response",
                 code=ErrorCodes.MODEL_RESPONSE_FAILED,
                 details={"error": str(e)}
             )
 
+    async def _stream_text(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        priority: RequestPriority,
+        timeout: Optional[float]
+    ) -> AsyncGenerator[str, None]:
+        """Run one streaming generation and yield its non-empty text pieces."""
+        if self._batcher:
+            stream = self._batcher.stream(
+                prompt,
+                self._completion_args(max_tokens, temperature),
+                priority=priority,
+                timeout=timeout or self.request_timeout
+            )
+        else:
+            stream = self._executor.stream(
+                self._stream_job,
+                self._completion_fn,
+                prompt,
+                priority=priority,
+                timeout=timeout or self.request_timeout,
+                stream=True,
+                **self._completion_args(max_tokens, temperature)
+            )
+
+        async for chunk in stream:
+            text = chunk['choices'][0]['text']
+            if text:
+                yield text
+
+    async def cache_prefix(self, prompt: str) -> int:
+        """Precompute and save the KV state for a shared prompt prefix.
+
+        Later prompts starting with ``prompt`` (typically a system prompt)
+        skip re-evaluating it. Returns the number of cached tokens.
+        """
+        if not self.is_ready:
+            raise ModelError(
+                message="Model not ready",
+                code=ErrorCodes.MODEL_NOT_READY
+            )
+        if prompt not in self.system_prompts:
+            self.system_prompts.append(prompt)
+        if self._prefix_cache is None:
+            return 0
+
+        return await self._executor.run(
+            self._run_job,
+            self._snapshot_prefix,
+            prompt,
+            priority=RequestPriority.HIGH
+        )
+
+    def _snapshot_prefix(self, prompt: str) -> int:
+        """Evaluate a prefix on the inference thread and persist its state."""
+        state = self._prefix_cache.snapshot(self.model, prompt)
+        if self._state_store is not None:
+            try:
+                self._state_store.save(prompt, state)
+            except OSError as e:
+                logger.warning(f"Failed to persist prompt state: {str(e)}")
+        return state.n_tokens
+
+    def _restore_prefixes(self) -> None:
+        """Load persisted prefix states for this model into the prefix cache."""
+        try:
+            self._state_store = StateStore(self.state_dir, self.model_path, self.model.n_ctx())
+        except OSError as e:
+            logger.warning(f"Prompt state persistence disabled: {str(e)}")
+            return
+
+        restored = 0
+        for state in self._state_store.load_all():
+            self._prefix_cache[state.input_ids[:state.n_tokens].tolist()] = state
+            restored += 1
+        if restored:
+            logger.info(f"Restored {restored} persisted prompt states")
+
+    async def measure_throughput(self, prompts: List[str], decode_tokens: int = 32) -> Dict[str, float]:
+        """Measure prompt-evaluation and decode speed in tokens/sec.
+
+        Decode speed is timed over single-token evaluations, so sampling
+        cost does not skew the comparison between runtime settings.
+        """
+        if not self.is_ready:
+            raise ModelError(
+                message="Model not ready",
+                code=ErrorCodes.MODEL_NOT_READY
+            )
+        if self._batcher is not None:
+            raise ModelError(
+                message="Throughput measurement needs a sequential engine",
+                code=ErrorCodes.MODEL_RESPONSE_FAILED
+            )
+
+        return await self._executor.run(
+            self._run_job,
+            self._measure_throughput,
+            prompts,
+            decode_tokens,
+            priority=RequestPriority.HIGH
+        )
+
+    def _measure_throughput(self, prompts: List[str], decode_tokens: int) -> Dict[str, float]:
+        prompt_tokens = decoded = 0
+        prompt_time = decode_time = 0.0
+        for prompt in prompts:
+            tokens = self.model.tokenize(prompt.encode('utf-8'))
+            self.model.reset()
+
+            start = time.perf_counter()
+            self.model.eval(tokens)
+            prompt_time += time.perf_counter() - start
+            prompt_tokens += len(tokens)
+
+            steps = min(decode_tokens, self.model.n_ctx() - len(tokens))
+            start = time.perf_counter()
+            for i in range(steps):
+                self.model.eval([tokens[i % len(tokens)]])
+            decode_time += time.perf_counter() - start
+            decoded += steps
+
+        self.model.reset()
+        return {
+            'prompt_tokens_per_sec': prompt_tokens / prompt_time if prompt_time else 0.0,
+            'decode_tokens_per_sec': decoded / decode_time if decode_time else 0.0
+        }
+
+    @property
+    def _completion_fn(self) -> Callable[..., Any]:
+        """Sequential completion entry point, speculative when a draft model is loaded."""
+        if self._speculative is not None:
+            return self._speculative.create_completion
+        return self.model.create_completion
+
+    def _completion_args(self, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        """Build create_completion keyword arguments from request and engine settings."""
+        return {
+            'max_tokens': max_tokens,
+            'temperature': temperature,
+            'top_p': self.settings['top_p'],
+            'top_k': self.settings['top_k'],
+            'frequency_penalty': self.settings['frequency_penalty'],
+            'presence_penalty': self.settings['presence_penalty'],
+            'repeat_penalty': self.settings['repeat_penalty'],
+            'stop': self.settings['stop_sequences'] or None,
+            'echo': False
+        }
+
+    def _run_job(self, fn, *args, **kwargs) -> Any:
+        """Run a model call on the inference thread, tracking status."""
+        if self.status == ModelStatus.INITIALIZING:
+            # Warmup calls must not mark a loading model as ready
+            return fn(*args, **kwargs)
+        self.status = ModelStatus.PROCESSING
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if self.status == ModelStatus.PROCESSING:
+                self.status = ModelStatus.READY
+
+    def _stream_job(self, fn, *args, **kwargs) -> Iterator[Any]:
+        """Iterate a streaming model call on the inference thread, tracking status."""
+        self.status = ModelStatus.PROCESSING
+        try:
+            yield from fn(*args, **kwargs)
+        finally:
+            if self.status == ModelStatus.PROCESSING:
+                self.status = ModelStatus.READY
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether the model is loaded and accepting requests."""
+        return self.model is not None and self.status in (ModelStatus.READY, ModelStatus.PROCESSING)
+
+    @property
+    def queue_full(self) -> bool:
+        """Whether new requests would currently be rejected."""
+        if self._batcher:
+            return self._batcher.get_metrics()['pending'] >= self.max_queue_size
+        return self._executor.is_full
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for the model."""
+        depth = self._executor.pending
+        if self._batcher:
+            depth += self._batcher.get_metrics()['pending']
+        return depth
+
+    async def stream_chunks(
+        self,
+        prompt: str,
+        max_tokens: int = 512,
+        temperature: float = 0.7,
+        priority: RequestPriority = RequestPriority.NORMAL,
+        timeout: Optional[float] = None
+    ) -> AsyncGenerator[str, None]:
+        """Stream the response as small text chunks batched by TokenProcessor."""
+        processor = TokenProcessor(
+            batch_size=self.STREAM_BATCH_SIZE,
+            max_delay=self.STREAM_MAX_DELAY,
+            strip_tokens=False
+        )
+        tokens = self.generate_stream(prompt, max_tokens, temperature, priority, timeout)
+        async for batch in processor.process_stream(tokens, max_tokens):
+            if batch:
+                yield ''.join(batch)
+
+    def shutdown(self) -> None:
+        """Stop the inference thread and release the model."""
+        self._executor.shutdown(wait=False)
+        self._sampler.stop()
+        if self._prefix_cache is not None:
+            self._prefix_cache.clear()
+        if self._semantic_cache is not None:
+            self._semantic_cache.clear()
+        self._speculative = None
+        self.draft_model = None
+        self.embedder = None
+        self.model = None
+        self.status = ModelStatus.STOPPED
+        logger.info(f"LLM Engine stopped: {self.model_path}")
+
     def update_settings(self, settings: Dict[str, Any]) -> None:
         """Update model settings."""
         self.settings.update(settings)
@@ -149,7 +739,15 @@ class LLMEngine:
                 },
                 "cpu_usage": process.cpu_percent(),
                 "thread_count": process.num_threads(),
-                "context_size": 2048 if self.model else 0,
+                "load_progress": self.load_progress,
+                "context_size": self.model.n_ctx() if self.model else 0,
+                "runtime": self.runtime,
+                "queue": self._executor.get_queue_stats(),
+                "batching": self._batcher.get_metrics() if self._batcher else None,
+                "prefix_cache": self._prefix_cache.get_stats() if self._prefix_cache else None,
+                "speculative": self._speculative.get_metrics() if self._speculative else None,
+                "semantic_cache": self._semantic_cache.get_stats() if self._semantic_cache else None,
+                "coalescing": self._inflight.get_stats(),
             }
         except Exception as e:
             logger.error(f"Error getting status: {str(e)}")
@@ -0,0 +1,171 @@
+# server/src/llm/executor.py
+from typing import Any, AsyncGenerator, Callable, Dict, Iterable, Optional
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from ..core.constants import RequestPriority
+from ..utils.logger import setup_logger
+from .scheduler import RequestQueue, ScheduledJob
+
+logger = setup_logger(__name__)
+
+_ITEM = 'item'
+_DONE = 'done'
+_ERROR = 'error'
+
+class InferenceExecutor:
+    """Dedicated worker thread that owns a llama.cpp model.
+
+    Every call into the model (loading, completion, token streaming) runs
+    on this one thread, so the event loop that submitted the job is free
+    to serve other requests while it awaits the result. Jobs wait in a
+    bounded RequestQueue ordered by priority, then arrival.
+    """
+
+    def __init__(self, name: str = "inference", max_queue_size: int = 16):
+        self.name = name
+        self._jobs = RequestQueue(max_size=max_queue_size)
+        self._closed = False
+        self._thread = threading.Thread(target=self._worker, name=name, daemon=True)
+        self._thread.start()
+        logger.debug(f"Inference executor '{name}' started")
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        priority: RequestPriority = RequestPriority.NORMAL,
+        timeout: Optional[float] = None,
+        force: bool = False,
+        **kwargs
+    ) -> Future:
+        """Queue a job for the worker thread and return its future.
+
+        ``timeout`` bounds how long the job may wait in the queue before it
+        is dropped with a DEADLINE_EXCEEDED error. ``force`` bypasses the
+        queue bound for internal jobs that were already admitted elsewhere.
+        """
+        if self._closed:
+            raise RuntimeError("Inference executor is shut down")
+        now = time.monotonic()
+        future: Future = Future()
+        job = ScheduledJob(
+            future=future,
+            fn=fn,
+            args=args,
+            kwargs=kwargs,
+            deadline=now + timeout if timeout else None,
+            enqueued_at=now
+        )
+        self._jobs.put(job, priority=priority, force=force)
+        return future
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        priority: RequestPriority = RequestPriority.NORMAL,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> Any:
+        """Run a job on the worker thread and await its result."""
+        future = self.submit(fn, *args, priority=priority, timeout=timeout, **kwargs)
+        return await asyncio.wrap_future(future)
+
+    async def stream(
+        self,
+        fn: Callable[..., Iterable[Any]],
+        *args,
+        priority: RequestPriority = RequestPriority.NORMAL,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> AsyncGenerator[Any, None]:
+        """Run a generator on the worker thread, yielding its items as they arrive."""
+        loop = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+
+        def put(kind: str, value: Any = None) -> None:
+            try:
+                loop.call_soon_threadsafe(items.put_nowait, (kind, value))
+            except RuntimeError:
+                # The consumer's event loop is gone; stop producing
+                cancelled.set()
+
+        def produce() -> None:
+            iterator = None
+            try:
+                iterator = iter(fn(*args, **kwargs))
+                for item in iterator:
+                    if cancelled.is_set():
+                        break
+                    put(_ITEM, item)
+            except Exception as e:
+                put(_ERROR, e)
+            else:
+                put(_DONE)
+            finally:
+                close = getattr(iterator, 'close', None)
+                if close:
+                    close()
+
+        def on_done(future: Future) -> None:
+            # The producer reports its own errors; an exception here means
+            # the job never ran (e.g. its deadline passed in the queue)
+            if not future.cancelled() and future.exception() is not None:
+                put(_ERROR, future.exception())
+
+        future = self.submit(produce, priority=priority, timeout=timeout)
+        future.add_done_callback(on_done)
+        try:
+            while True:
+                kind, value = await items.get()
+                if kind == _ITEM:
+                    yield value
+                elif kind == _ERROR:
+                    raise value
+                else:
+                    break
+        finally:
+            cancelled.set()
+            if not future.done():
+                logger.debug("Stream consumer stopped early; cancelling producer")
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs and let the worker drain the queue."""
+        if self._closed:
+            return
+        self._closed = True
+        # Lowest priority, so already admitted jobs still run
+        self._jobs.put(None, priority=RequestPriority.LOW, force=True)
+        if wait and threading.current_thread() is not self._thread:
+            self._thread.join()
+        logger.debug(f"Inference executor '{self.name}' stopped")
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs waiting for the worker."""
+        return len(self._jobs)
+
+    @property
+    def is_full(self) -> bool:
+        """Whether new jobs would currently be rejected."""
+        return len(self._jobs) >= self._jobs.max_size
+
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """Get queue depth and admission counters."""
+        return self._jobs.get_stats()
+
+    def _worker(self) -> None:
+        """Worker loop: run queued jobs one at a time."""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            try:
+                job.future.set_result(job.fn(*job.args, **job.kwargs))
+            except BaseException as e:
+                job.future.set_exception(e)
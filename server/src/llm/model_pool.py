@@ -0,0 +1,296 @@
+# server/src/llm/model_pool.py
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+import asyncio
+import os
+import threading
+import time
+import psutil
+from ..core.exceptions import ModelError
+from ..core.constants import ModelStatus, ErrorCodes
+from ..utils.logger import setup_logger
+from .engine import LLMEngine
+
+logger = setup_logger(__name__)
+
+@dataclass
+class PoolEntry:
+    """A loaded engine and its memory accounting."""
+    engine: LLMEngine
+    footprint_mb: float
+    loaded_at: float
+    last_used: float
+
+class ModelPool:
+    """Keeps several LLM engines loaded within a memory budget.
+
+    Engines are addressed by model name (the GGUF file name without its
+    extension unless one is given). Loading a model that would push the
+    pool past ``memory_budget_mb`` first evicts the least recently used
+    engines. Each engine is charged the RSS growth measured while it
+    loaded, or its file size if larger, since mmapped weights are paged in
+    lazily.
+
+    Loading runs on a background thread; concurrent requests for the same
+    model share one thread-safe future, since Flask gives every async view
+    its own event loop.
+    """
+
+    # Share of physical memory models may use when no budget is given
+    DEFAULT_BUDGET_FRACTION = 0.75
+
+    def __init__(self, memory_budget_mb: Optional[float] = None):
+        if memory_budget_mb is None:
+            total_mb = psutil.virtual_memory().total / 1024 / 1024
+            memory_budget_mb = total_mb * self.DEFAULT_BUDGET_FRACTION
+        self.memory_budget_mb = memory_budget_mb
+        self._engines: "OrderedDict[str, PoolEntry]" = OrderedDict()
+        self._loading: Dict[str, Future] = {}
+        self._default: Optional[str] = None
+        self._on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'loads': 0,
+            'reuses': 0,
+            'evictions': 0
+        }
+
+    @staticmethod
+    def model_name(model_path: str) -> str:
+        """Derive the default pool name for a model file."""
+        return os.path.splitext(os.path.basename(model_path))[0]
+
+    def set_progress_callback(self, callback: Optional[Callable[[Dict[str, Any]], None]]) -> None:
+        """Set the listener notified of model load progress."""
+        self._on_progress = callback
+
+    async def load(
+        self,
+        model_path: str,
+        name: Optional[str] = None,
+        **engine_kwargs: Any
+    ) -> LLMEngine:
+        """Return the engine for a model once it is loaded and warmed up.
+
+        Extra keyword arguments are passed to ``LLMEngine`` on first load.
+        """
+        engine, pending = self._begin_load(model_path, name, engine_kwargs)
+        if pending is None:
+            return engine
+        return await asyncio.wrap_future(pending)
+
+    def start(
+        self,
+        model_path: str,
+        name: Optional[str] = None,
+        **engine_kwargs: Any
+    ) -> LLMEngine:
+        """Start loading a model in the background and return immediately.
+
+        The engine is pooled right away with status INITIALIZING, so its
+        progress shows up in ``get_status`` while it loads.
+        """
+        engine, _ = self._begin_load(model_path, name, engine_kwargs)
+        return engine
+
+    def _begin_load(
+        self,
+        model_path: str,
+        name: Optional[str],
+        engine_kwargs: Dict[str, Any]
+    ) -> Tuple[LLMEngine, Optional[Future]]:
+        """Reuse a pooled engine or register a new one and start its loader."""
+        name = name or self.model_name(model_path)
+        with self._lock:
+            entry = self._engines.get(name)
+            if entry is not None and entry.engine.model_path == model_path:
+                self._touch(name)
+                self._default = name
+                self._stats['reuses'] += 1
+                return entry.engine, self._loading.get(name)
+
+            # Same name, different file: replace the old engine
+            stale = [(name, self._engines.pop(name))] if entry is not None else []
+            footprint = self._file_size_mb(model_path)
+            evicted = self._evict_for(footprint)
+
+            engine = LLMEngine(
+                model_path,
+                on_progress=lambda progress: self._report_progress(name, progress),
+                **engine_kwargs
+            )
+            now = time.time()
+            self._engines[name] = PoolEntry(engine, footprint, now, now)
+            self._default = name
+            pending = self._loading[name] = Future()
+
+        for old_name, old_entry in stale + evicted:
+            old_entry.engine.shutdown()
+            logger.info(f"Evicted model '{old_name}' to free {old_entry.footprint_mb:.0f} MB")
+
+        # Requests run on short-lived per-request event loops, so the load
+        # gets a thread and loop of its own that outlive the caller
+        threading.Thread(
+            target=self._load_worker,
+            args=(name, engine, pending),
+            name=f"model-loader-{name}",
+            daemon=True
+        ).start()
+        return engine, pending
+
+    def _load_worker(self, name: str, engine: LLMEngine, pending: Future) -> None:
+        """Initialize an engine on the loader thread and settle its future."""
+        rss_before = self._rss_mb()
+        try:
+            asyncio.run(engine.initialize())
+        except Exception as e:
+            with self._lock:
+                self._loading.pop(name, None)
+                entry = self._engines.get(name)
+                if entry is not None and entry.engine is engine:
+                    del self._engines[name]
+            engine.shutdown()
+            pending.set_exception(e)
+            return
+
+        with self._lock:
+            self._loading.pop(name, None)
+            entry = self._engines.get(name)
+            if entry is not None and entry.engine is engine:
+                entry.footprint_mb = max(entry.footprint_mb, self._rss_mb() - rss_before)
+                logger.info(f"Loaded model '{name}' ({entry.footprint_mb:.0f} MB) into pool")
+            self._stats['loads'] += 1
+        pending.set_result(engine)
+
+    def _report_progress(self, name: str, progress: Dict[str, Any]) -> None:
+        if self._on_progress is not None:
+            self._on_progress({'model': name, **progress})
+
+    def get(self, name: Optional[str] = None) -> LLMEngine:
+        """Route to a loaded engine by name, or to the default model."""
+        with self._lock:
+            if name is None:
+                name = self._default_name()
+                if name is None:
+                    raise ModelError(
+                        message="Model not initialized",
+                        code=ErrorCodes.MODEL_NOT_READY,
+                        status_code=503
+                    )
+
+            if name not in self._engines:
+                raise ModelError(
+                    message=f"Model '{name}' is not loaded",
+                    code=ErrorCodes.MODEL_NOT_FOUND,
+                    details={"model": name, "loaded": list(self._engines)},
+                    status_code=404
+                )
+
+            self._touch(name)
+            return self._engines[name].engine
+
+    def unload(self, name: Optional[str] = None) -> List[str]:
+        """Shut down one model, or every model when no name is given."""
+        with self._lock:
+            names = [name] if name is not None else list(self._engines)
+            removed = [(n, self._engines.pop(n)) for n in names if n in self._engines]
+
+        for model_name, entry in removed:
+            entry.engine.shutdown()
+            logger.info(f"Unloaded model '{model_name}' from pool")
+        return [model_name for model_name, _ in removed]
+
+    def shutdown(self) -> None:
+        """Shut down all loaded models."""
+        self.unload()
+
+    @property
+    def default_model(self) -> Optional[str]:
+        """Name of the model used when a request does not pick one."""
+        with self._lock:
+            return self._default_name()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get status for the default model plus every pooled model."""
+        with self._lock:
+            entries = list(self._engines.items())
+            reserved = sum(entry.footprint_mb for _, entry in entries)
+            stats = dict(self._stats)
+        default = self.default_model
+
+        models = {}
+        for name, entry in entries:
+            models[name] = {
+                **entry.engine.get_status(),
+                "footprint_mb": entry.footprint_mb,
+                "loaded_at": entry.loaded_at,
+                "last_used": entry.last_used
+            }
+
+        if default in models:
+            status = dict(models[default])
+        else:
+            status = {
+                'status': ModelStatus.STOPPED,
+                'ready': False,
+                'model_path': None,
+                'settings': None
+            }
+
+        status['default_model'] = default
+        status['models'] = models
+        status['pool'] = {
+            **stats,
+            'loaded': len(models),
+            'memory_budget_mb': self.memory_budget_mb,
+            'reserved_mb': reserved,
+            'rss_mb': self._rss_mb()
+        }
+        return status
+
+    def _default_name(self) -> Optional[str]:
+        """Last loaded model, else the most recently used. Caller holds the lock."""
+        if self._default in self._engines:
+            return self._default
+        return next(reversed(self._engines), None)
+
+    def _touch(self, name: str) -> None:
+        """Mark a model as most recently used. Caller holds the lock."""
+        self._engines.move_to_end(name)
+        self._engines[name].last_used = time.time()
+
+    def _evict_for(self, needed_mb: float) -> List[Tuple[str, PoolEntry]]:
+        """Pop least recently used engines until ``needed_mb`` fits.
+
+        Caller holds the lock and shuts the returned engines down.
+        """
+        evicted = []
+        reserved = sum(entry.footprint_mb for entry in self._engines.values())
+        while self._engines and reserved + needed_mb > self.memory_budget_mb:
+            name, entry = self._engines.popitem(last=False)
+            reserved -= entry.footprint_mb
+            evicted.append((name, entry))
+            self._stats['evictions'] += 1
+
+        if reserved + needed_mb > self.memory_budget_mb:
+            logger.warning(
+                f"Model needs {needed_mb:.0f} MB, exceeding the "
+                f"{self.memory_budget_mb:.0f} MB pool budget"
+            )
+        return evicted
+
+    @staticmethod
+    def _file_size_mb(model_path: str) -> float:
+        try:
+            return os.path.getsize(model_path) / 1024 / 1024
+        except OSError:
+            return 0.0
+
+    @staticmethod
+    def _rss_mb() -> float:
+        return psutil.Process().memory_info().rss / 1024 / 1024
+
+# Create singleton instance
+model_pool = ModelPool()
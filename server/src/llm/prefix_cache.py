@@ -0,0 +1,155 @@
+# server/src/llm/prefix_cache.py
+from typing import Any, Dict, Optional, Sequence, Tuple
+from collections import OrderedDict
+import threading
+import numpy as np
+from llama_cpp import Llama
+from llama_cpp.llama import BaseLlamaCache, LlamaState
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class PrefixCache(BaseLlamaCache):
+    """LRU of llama.cpp states keyed by token prefix, bounded by memory.
+
+    Installed with ``Llama.set_cache``: before evaluating a prompt, llama.cpp
+    asks for the saved state sharing the longest token prefix with it,
+    restores that state and evaluates only the remaining suffix; after a
+    completion it stores the new state. Multi-turn chats therefore only pay
+    for the latest turn. Matches shorter than ``min_prefix_tokens`` count as
+    misses, since restoring a large state costs more than re-evaluating a
+    handful of tokens.
+
+    llama-cpp-python sizes each state's ``scores`` (n_ctx x n_vocab floats)
+    and ``input_ids`` for the whole context, which dwarfs the KV state of a
+    short prompt. Entries are stored trimmed to their tokens, arrays
+    included in the byte budget, and padded back out when restored.
+    """
+
+    def __init__(self, capacity_bytes: int = 1 << 30, min_prefix_tokens: int = 32):
+        super().__init__(capacity_bytes)
+        self.capacity_bytes = capacity_bytes
+        self.min_prefix_tokens = min_prefix_tokens
+        # Trimmed states with the context length they were saved at
+        self._states: "OrderedDict[Tuple[int, ...], Tuple[LlamaState, int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'tokens_reused': 0
+        }
+
+    @property
+    def cache_size(self) -> int:
+        """Total bytes of saved states."""
+        return self._size
+
+    def __getitem__(self, key: Sequence[int]) -> LlamaState:
+        key = tuple(key)
+        with self._lock:
+            match, length = self._longest_prefix(key)
+            if match is None:
+                self._stats['misses'] += 1
+                raise KeyError("No cached prefix")
+
+            self._states.move_to_end(match)
+            self._stats['hits'] += 1
+            self._stats['tokens_reused'] += length
+            state, n_ctx = self._states[match]
+        logger.debug(f"Prefix cache hit: reusing {length}/{len(key)} tokens")
+        return pad_state(state, n_ctx)
+
+    def __contains__(self, key: Sequence[int]) -> bool:
+        with self._lock:
+            return self._longest_prefix(tuple(key))[0] is not None
+
+    def __setitem__(self, key: Sequence[int], value: LlamaState) -> None:
+        key = tuple(key)
+        state = trim_state(value)
+        with self._lock:
+            if key in self._states:
+                self._size -= state_nbytes(self._states.pop(key)[0])
+            self._states[key] = (state, len(value.input_ids))
+            self._size += state_nbytes(state)
+
+            while self._size > self.capacity_bytes and len(self._states) > 1:
+                _, (evicted, _) = self._states.popitem(last=False)
+                self._size -= state_nbytes(evicted)
+                self._stats['evictions'] += 1
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def snapshot(self, model: Llama, prompt: str) -> LlamaState:
+        """Evaluate a prompt prefix (e.g. a system prompt) and save its state.
+
+        Must run on the thread that owns ``model``.
+        """
+        tokens = model.tokenize(prompt.encode('utf-8'))
+        model.reset()
+        model.eval(tokens)
+        state = model.save_state()
+        self[tokens] = state
+        logger.info(f"Cached prefix state for {len(tokens)} tokens")
+        return state
+
+    def clear(self) -> None:
+        """Drop all saved states."""
+        with self._lock:
+            self._states.clear()
+            self._size = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit rate, reuse and size statistics."""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'entries': len(self._states),
+                'size_bytes': self._size,
+                'capacity_bytes': self.capacity_bytes,
+                'hit_rate': self._stats['hits'] / lookups if lookups else 0.0
+            }
+
+    def _longest_prefix(self, key: Tuple[int, ...]) -> Tuple[Optional[Tuple[int, ...]], int]:
+        """Find the saved key sharing the longest prefix with ``key``."""
+        best_key, best_length = None, 0
+        for candidate in self._states:
+            length = Llama.longest_token_prefix(candidate, key)
+            if length > best_length:
+                best_key, best_length = candidate, length
+        if best_length < min(self.min_prefix_tokens, len(key)):
+            return None, 0
+        return best_key, best_length
+
+def trim_state(state: LlamaState) -> LlamaState:
+    """Copy of a state without the ``scores`` and ``input_ids`` rows past ``n_tokens``."""
+    n_tokens = state.n_tokens
+    return LlamaState(
+        input_ids=state.input_ids[:n_tokens].copy(),
+        scores=state.scores[:n_tokens].copy(),
+        n_tokens=n_tokens,
+        llama_state=state.llama_state,
+        llama_state_size=state.llama_state_size
+    )
+
+def pad_state(state: LlamaState, n_ctx: int) -> LlamaState:
+    """Zero-fill a trimmed state back to ``n_ctx`` rows, as ``Llama.load_state`` expects."""
+    n_tokens = state.n_tokens
+    input_ids = np.zeros(max(n_ctx, n_tokens), dtype=state.input_ids.dtype)
+    input_ids[:n_tokens] = state.input_ids[:n_tokens]
+    scores = np.zeros((len(input_ids), *state.scores.shape[1:]), dtype=state.scores.dtype)
+    scores[:n_tokens] = state.scores[:n_tokens]
+    return LlamaState(
+        input_ids=input_ids,
+        scores=scores,
+        n_tokens=n_tokens,
+        llama_state=state.llama_state,
+        llama_state_size=state.llama_state_size
+    )
+
+def state_nbytes(state: LlamaState) -> int:
+    """Memory held by a state: the llama.cpp state plus its token and logit arrays."""
+    return state.llama_state_size + state.input_ids.nbytes + state.scores.nbytes
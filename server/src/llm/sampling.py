@@ -0,0 +1,61 @@
+# server/src/llm/sampling.py
+from typing import Any, Dict, Sequence
+from collections import Counter
+import numpy as np
+
+# Llama's default last_n_tokens_size: how far back repetition penalties look
+LAST_N_TOKENS = 64
+
+def token_distribution(
+    logits: np.ndarray,
+    params: Dict[str, Any],
+    history: Sequence[int] = ()
+) -> np.ndarray:
+    """Turn raw logits into the sampling distribution for one position.
+
+    Mirrors ``Llama.sample`` with ``create_completion``'s defaults: repeat,
+    frequency and presence penalties over the last ``LAST_N_TOKENS`` of
+    ``history`` (prompt and generated tokens), then top-k and top-p on the
+    untempered distribution, then temperature. A temperature of 0 yields a
+    one-hot distribution on the penalized argmax, so greedy decoding goes
+    through the same code path.
+    """
+    logits = np.array(logits, dtype=np.float64)
+
+    repeat_penalty = params.get('repeat_penalty', 1.1)
+    frequency_penalty = params.get('frequency_penalty', 0.0)
+    presence_penalty = params.get('presence_penalty', 0.0)
+    window = list(history[-LAST_N_TOKENS:])
+    if window and (repeat_penalty != 1.0 or frequency_penalty or presence_penalty):
+        for token, count in Counter(window).items():
+            if logits[token] <= 0:
+                logits[token] *= repeat_penalty
+            else:
+                logits[token] /= repeat_penalty
+            logits[token] -= count * frequency_penalty + presence_penalty
+
+    temperature = params.get('temperature', 0.8)
+    if temperature <= 0:
+        probs = np.zeros_like(logits)
+        probs[int(np.argmax(logits))] = 1.0
+        return probs
+
+    top_k = params.get('top_k', 40)
+    if 0 < top_k < len(logits):
+        logits[np.argsort(-logits)[top_k:]] = -np.inf
+
+    top_p = params.get('top_p', 0.95)
+    if top_p < 1.0:
+        probs = np.exp(logits - logits.max())
+        probs /= probs.sum()
+        order = np.argsort(-probs)
+        cumulative = np.cumsum(probs[order])
+        logits[order[int(np.searchsorted(cumulative, top_p)) + 1:]] = -np.inf
+
+    logits /= temperature
+    probs = np.exp(logits - logits.max())
+    return probs / probs.sum()
+
+def sample(probs: np.ndarray, rng: np.random.Generator) -> int:
+    """Draw a token id from a distribution."""
+    return int(rng.choice(len(probs), p=probs))
@@ -0,0 +1,134 @@
+# server/src/llm/scheduler.py
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from concurrent.futures import Future
+import heapq
+import itertools
+import queue
+import threading
+import time
+from ..core.exceptions import SchedulerError
+from ..core.constants import ErrorCodes, RequestPriority
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Lower rank is served first; FIFO order within the same rank
+PRIORITY_RANK = {
+    RequestPriority.HIGH: 0,
+    RequestPriority.NORMAL: 1,
+    RequestPriority.LOW: 2,
+}
+
+class ScheduledJob(NamedTuple):
+    """A unit of work waiting for the inference thread."""
+    future: Future
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any]
+    deadline: Optional[float] = None
+    enqueued_at: float = 0.0
+
+class RequestQueue:
+    """Bounded priority queue of inference jobs with per-request deadlines.
+
+    ``put`` rejects new work once ``max_size`` jobs are waiting, so callers
+    get immediate backpressure instead of an ever-growing backlog. ``get``
+    drops jobs whose deadline passed while they were queued and fails their
+    futures, so the worker never spends time on requests nobody awaits.
+
+    Jobs only need ``future``, ``deadline`` and ``enqueued_at`` attributes,
+    so the batching scheduler queues its own request type here too.
+    """
+
+    def __init__(self, max_size: int = 16):
+        self.max_size = max_size
+        self._heap: List[Tuple[int, int, Optional[ScheduledJob]]] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._stats = {
+            'admitted': 0,
+            'rejected': 0,
+            'expired': 0,
+            'total_wait': 0.0,
+            'started': 0
+        }
+
+    def put(
+        self,
+        job: Optional[ScheduledJob],
+        priority: RequestPriority = RequestPriority.NORMAL,
+        force: bool = False
+    ) -> None:
+        """Admit a job, raising SchedulerError when the queue is full."""
+        with self._cond:
+            if not force and len(self._heap) >= self.max_size:
+                self._stats['rejected'] += 1
+                raise SchedulerError(
+                    message="Request queue is full",
+                    code=ErrorCodes.QUEUE_FULL,
+                    details={"queue_size": len(self._heap), "max_size": self.max_size},
+                    status_code=429
+                )
+            heapq.heappush(self._heap, (PRIORITY_RANK[priority], next(self._counter), job))
+            if job is not None:
+                self._stats['admitted'] += 1
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[ScheduledJob]:
+        """Block until the next live job is available.
+
+        With a ``timeout``, raises ``queue.Empty`` if nothing arrives in time.
+        """
+        wait_until = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            while True:
+                while not self._heap:
+                    if wait_until is None:
+                        self._cond.wait()
+                        continue
+                    remaining = wait_until - time.monotonic()
+                    if remaining <= 0:
+                        raise queue.Empty
+                    self._cond.wait(remaining)
+                _, _, job = heapq.heappop(self._heap)
+                if job is None:
+                    return None
+
+                now = time.monotonic()
+                if job.deadline is not None and now > job.deadline:
+                    self._stats['expired'] += 1
+                    self._expire(job, now)
+                    continue
+
+                self._stats['started'] += 1
+                self._stats['total_wait'] += now - job.enqueued_at
+                return job
+
+    def _expire(self, job: ScheduledJob, now: float) -> None:
+        """Fail a job whose deadline passed while it was waiting."""
+        waited = now - job.enqueued_at
+        logger.warning(f"Dropping request after {waited:.2f}s in queue (deadline exceeded)")
+        if job.future.set_running_or_notify_cancel():
+            job.future.set_exception(SchedulerError(
+                message="Request deadline exceeded while queued",
+                code=ErrorCodes.DEADLINE_EXCEEDED,
+                details={"waited": waited},
+                status_code=503
+            ))
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and admission counters."""
+        with self._cond:
+            started = self._stats['started']
+            return {
+                'size': len(self._heap),
+                'max_size': self.max_size,
+                'admitted': self._stats['admitted'],
+                'rejected': self._stats['rejected'],
+                'expired': self._stats['expired'],
+                'average_wait': self._stats['total_wait'] / started if started else 0.0
+            }
@@ -0,0 +1,107 @@
+# server/src/llm/semantic_cache.py
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+import threading
+import numpy as np
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class SemanticCache:
+    """Vector index mapping prompt embeddings to response cache keys.
+
+    The index holds only unit-normalized embeddings and the exact cache key
+    each response was stored under, so the response itself, and its expiry,
+    stays in the cache service. A lookup returns the key of the most similar
+    earlier prompt when its cosine similarity reaches ``threshold``.
+
+    Entries carry a scope, the generation settings other than the prompt,
+    and only match within it. Oldest entries are dropped past
+    ``max_entries``.
+    """
+
+    def __init__(self, dimensions: int, threshold: float = 0.95, max_entries: int = 10000):
+        self.dimensions = dimensions
+        self.threshold = threshold
+        self.max_entries = max_entries
+        # Rows grow by doubling up to max_entries; freed rows are reused
+        self._vectors = np.zeros((min(64, max_entries), dimensions), dtype=np.float32)
+        self._free: List[int] = list(range(len(self._vectors) - 1, -1, -1))
+        # Cache key -> (row, scope), oldest first
+        self._entries: "OrderedDict[str, Tuple[int, Hashable]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0
+        }
+
+    def lookup(self, embedding: Sequence[float], scope: Hashable) -> Optional[str]:
+        """Return the cache key of the closest prompt in scope, if close enough."""
+        query = self._normalize(embedding)
+        with self._lock:
+            rows = [(row, key) for key, (row, entry_scope) in self._entries.items() if entry_scope == scope]
+            if rows:
+                indices = np.fromiter((row for row, _ in rows), dtype=np.intp, count=len(rows))
+                scores = self._vectors[indices] @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._stats['hits'] += 1
+                    return rows[best][1]
+            self._stats['misses'] += 1
+            return None
+
+    def add(self, embedding: Sequence[float], scope: Hashable, key: str) -> None:
+        """Index a prompt embedding under the key its response was cached as."""
+        vector = self._normalize(embedding)
+        with self._lock:
+            if key in self._entries:
+                row, _ = self._entries.pop(key)
+            else:
+                if not self._free and len(self._vectors) < self.max_entries:
+                    self._grow()
+                if not self._free:
+                    _, (row, _) = self._entries.popitem(last=False)
+                    self._free.append(row)
+                    self._stats['evictions'] += 1
+                row = self._free.pop()
+            self._vectors[row] = vector
+            self._entries[key] = (row, scope)
+
+    def remove(self, key: str) -> None:
+        """Drop an entry, e.g. once its response has expired."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._free.append(entry[0])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._free = list(range(len(self._vectors) - 1, -1, -1))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['threshold'] = self.threshold
+        return stats
+
+    def _grow(self) -> None:
+        """Double the row capacity. Caller holds the lock."""
+        size = len(self._vectors)
+        new_size = min(size * 2, self.max_entries)
+        vectors = np.zeros((new_size, self.dimensions), dtype=np.float32)
+        vectors[:size] = self._vectors
+        self._vectors = vectors
+        self._free.extend(range(new_size - 1, size - 1, -1))
+
+    def _normalize(self, embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        if vector.shape != (self.dimensions,):
+            raise ValueError(f"Expected a {self.dimensions}-dimensional embedding, got shape {vector.shape}")
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
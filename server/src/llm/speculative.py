@@ -0,0 +1,290 @@
+# server/src/llm/speculative.py
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import threading
+import numpy as np
+import llama_cpp
+from llama_cpp import Llama
+from ..core.exceptions import ModelError
+from ..core.constants import ErrorCodes
+from ..utils.logger import setup_logger
+from .batching import model_context, batch_init, batch_add, decode_batch
+from .sampling import sample, token_distribution
+
+logger = setup_logger(__name__)
+
+def verify_proposals(
+    proposals: List[int],
+    draft_dists: List[np.ndarray],
+    target_dists: List[np.ndarray],
+    rng: np.random.Generator
+) -> Tuple[int, int]:
+    """Apply the speculative sampling acceptance rule.
+
+    ``target_dists`` holds one more distribution than there are proposals,
+    for the bonus token. Returns the number of accepted proposals and the
+    token that follows them.
+    """
+    for i, proposal in enumerate(proposals):
+        p, q = target_dists[i], draft_dists[i]
+        if rng.random() < min(1.0, p[proposal] / q[proposal]):
+            continue
+        residual = np.maximum(p - q, 0.0)
+        total = residual.sum()
+        return i, sample(residual / total if total > 0 else p, rng)
+    return len(proposals), sample(target_dists[len(proposals)], rng)
+
+class SpeculativeDecoder:
+    """Speculative decoding: a small draft model proposes, the target verifies.
+
+    Each round the draft model samples ``n_draft`` tokens one at a time,
+    then the target model scores all of them in a single batched decode.
+    Draft token ``x`` is accepted with probability ``min(1, p(x) / q(x))``
+    where ``p`` and ``q`` are the target and draft distributions; on the
+    first rejection a replacement is drawn from the normalized residual
+    ``max(0, p - q)``, and when every proposal is accepted one bonus token
+    is drawn from the target. The emitted tokens are distributed exactly
+    as if sampled from the target model alone, with the same penalties,
+    top-k, top-p and temperature, while costing one target pass per round.
+
+    Both models must share a vocabulary. All methods run on the engine's
+    inference thread, which owns both contexts.
+    """
+
+    def __init__(self, target: Llama, draft: Llama, n_draft: int = 4):
+        if not hasattr(llama_cpp, 'llama_decode'):
+            raise ModelError(
+                message="Speculative decoding requires a llama-cpp-python build with the batch decode API",
+                code=ErrorCodes.MODEL_LOAD_FAILED
+            )
+        if target.n_vocab() != draft.n_vocab():
+            raise ModelError(
+                message="Draft model vocabulary does not match the target model",
+                code=ErrorCodes.MODEL_LOAD_FAILED,
+                details={"target_vocab": target.n_vocab(), "draft_vocab": draft.n_vocab()}
+            )
+
+        self.target = target
+        self.draft = draft
+        self.n_draft = n_draft
+        self._rng = np.random.default_rng()
+        self._lock = threading.Lock()
+        self._metrics = {
+            'completions': 0,
+            'rounds': 0,
+            'drafted': 0,
+            'accepted': 0,
+            'tokens_generated': 0
+        }
+
+    def create_completion(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = 16,
+        temperature: float = 0.8,
+        top_p: float = 0.95,
+        top_k: int = 40,
+        frequency_penalty: float = 0.0,
+        presence_penalty: float = 0.0,
+        repeat_penalty: float = 1.1,
+        stop: Optional[List[str]] = None,
+        stream: bool = False,
+        **kwargs: Any
+    ):
+        """Drop-in replacement for ``Llama.create_completion``."""
+        params = {
+            'temperature': temperature,
+            'top_p': top_p,
+            'top_k': top_k,
+            'frequency_penalty': frequency_penalty,
+            'presence_penalty': presence_penalty,
+            'repeat_penalty': repeat_penalty,
+            'stop': stop
+        }
+        chunks = self._generate(prompt, max_tokens, params)
+        if stream:
+            return chunks
+
+        text = []
+        finish_reason = None
+        usage = {}
+        for chunk in chunks:
+            choice = chunk['choices'][0]
+            text.append(choice['text'])
+            finish_reason = choice['finish_reason'] or finish_reason
+            usage = chunk.get('usage', usage)
+        return {
+            'choices': [{'text': ''.join(text), 'finish_reason': finish_reason}],
+            'usage': usage
+        }
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get acceptance-rate and throughput metrics."""
+        with self._lock:
+            metrics = dict(self._metrics)
+        rounds = metrics['rounds']
+        metrics['n_draft'] = self.n_draft
+        metrics['acceptance_rate'] = metrics['accepted'] / metrics['drafted'] if metrics['drafted'] else 0.0
+        metrics['tokens_per_target_pass'] = metrics['tokens_generated'] / rounds if rounds else 0.0
+        return metrics
+
+    def _generate(self, prompt: str, max_tokens: Optional[int], params: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Yield create_completion-shaped chunks for one prompt."""
+        target, draft = self.target, self.draft
+        tokens = target.tokenize(prompt.encode('utf-8'))
+        budget = min(target.n_ctx(), draft.n_ctx()) - len(tokens) - self.n_draft - 1
+        if budget <= 0:
+            raise ModelError(
+                message="Prompt does not fit in the context window",
+                code=ErrorCodes.MODEL_RESPONSE_FAILED,
+                details={"prompt_tokens": len(tokens)}
+            )
+        max_tokens = min(max_tokens, budget) if max_tokens and max_tokens > 0 else budget
+
+        target_ctx, draft_ctx = model_context(target), model_context(draft)
+        target_batch = batch_init(max(target.n_batch, self.n_draft + 1))
+        draft_batch = batch_init(max(draft.n_batch, 2))
+        self._reset()
+
+        generated: List[int] = []
+        text = ""
+        finish_reason = None
+        try:
+            # Everything but the last prompt token goes into both KV caches;
+            # the last one is decoded with the first round so its logits are fresh
+            self._prefill(target_ctx, target_batch, target.n_batch, tokens[:-1])
+            self._prefill(draft_ctx, draft_batch, draft.n_batch, tokens[:-1])
+            committed = list(tokens)
+            n_past_target = n_past_draft = len(tokens) - 1
+
+            while finish_reason is None:
+                proposals, accepted, token = self._round(
+                    target_ctx, target_batch, draft_ctx, draft_batch,
+                    committed, n_past_target, n_past_draft,
+                    min(self.n_draft, max_tokens - len(generated)),
+                    params
+                )
+
+                # Roll both caches back to the last verified token
+                n_past_draft = len(committed) + min(accepted, len(proposals) - 1)
+                n_past_target = len(committed) + accepted
+                llama_cpp.llama_kv_cache_seq_rm(target_ctx, 0, n_past_target, -1)
+                llama_cpp.llama_kv_cache_seq_rm(draft_ctx, 0, n_past_draft, -1)
+
+                for new_token in proposals[:accepted] + [token]:
+                    committed.append(new_token)
+                    if new_token == target.token_eos():
+                        finish_reason = 'stop'
+                        break
+                    generated.append(new_token)
+                    new_text = target.detokenize(generated).decode('utf-8', errors='ignore')
+                    for stop in params.get('stop') or []:
+                        index = new_text.find(stop)
+                        if index != -1:
+                            new_text = new_text[:index]
+                            finish_reason = 'stop'
+                            break
+                    if len(new_text) > len(text):
+                        yield {'choices': [{'text': new_text[len(text):], 'finish_reason': None}]}
+                        text = new_text
+                    if finish_reason is None and len(generated) >= max_tokens:
+                        finish_reason = 'length'
+                    if finish_reason is not None:
+                        break
+
+            with self._lock:
+                self._metrics['completions'] += 1
+            yield {
+                'choices': [{'text': '', 'finish_reason': finish_reason}],
+                'usage': {
+                    'prompt_tokens': len(tokens),
+                    'completion_tokens': len(generated),
+                    'total_tokens': len(tokens) + len(generated)
+                }
+            }
+        finally:
+            llama_cpp.llama_batch_free(target_batch)
+            llama_cpp.llama_batch_free(draft_batch)
+            self._reset()
+
+    def _round(
+        self,
+        target_ctx,
+        target_batch,
+        draft_ctx,
+        draft_batch,
+        committed: List[int],
+        n_past_target: int,
+        n_past_draft: int,
+        n_draft: int,
+        params: Dict[str, Any]
+    ) -> Tuple[List[int], int, int]:
+        """Draft ``n_draft`` tokens and verify them with one target pass.
+
+        Returns the proposals, how many were accepted, and the token drawn
+        from the target after the accepted ones.
+        """
+        # Draft: catch up on committed tokens it has not seen, then propose
+        proposals: List[int] = []
+        draft_dists: List[np.ndarray] = []
+        feed = committed[n_past_draft:]
+        for _ in range(n_draft):
+            logits = self._decode(draft_ctx, draft_batch, feed, n_past_draft, self.draft.n_vocab())[-1]
+            n_past_draft += len(feed)
+            q = token_distribution(logits, params, committed + proposals)
+            proposals.append(sample(q, self._rng))
+            draft_dists.append(q)
+            feed = proposals[-1:]
+
+        # Verify: the target scores the last committed token and every proposal at once
+        rows = self._decode(
+            target_ctx, target_batch, committed[-1:] + proposals, n_past_target,
+            self.target.n_vocab(), all_logits=True
+        )
+
+        target_dists = [
+            token_distribution(rows[i], params, committed + proposals[:i])
+            for i in range(len(proposals) + 1)
+        ]
+        accepted, token = verify_proposals(proposals, draft_dists, target_dists, self._rng)
+
+        with self._lock:
+            self._metrics['rounds'] += 1
+            self._metrics['drafted'] += len(proposals)
+            self._metrics['accepted'] += accepted
+            self._metrics['tokens_generated'] += accepted + 1
+        return proposals, accepted, token
+
+    def _prefill(self, ctx, batch, n_batch: int, tokens: List[int]) -> None:
+        """Evaluate tokens into the KV cache without computing logits."""
+        for start in range(0, len(tokens), n_batch):
+            batch.n_tokens = 0
+            for pos in range(start, min(start + n_batch, len(tokens))):
+                batch_add(batch, tokens[pos], pos, 0, False)
+            decode_batch(ctx, batch)
+
+    def _decode(
+        self,
+        ctx,
+        batch,
+        tokens: List[int],
+        n_past: int,
+        n_vocab: int,
+        all_logits: bool = False
+    ) -> List[np.ndarray]:
+        """Decode tokens at ``n_past`` and return copies of their logits."""
+        batch.n_tokens = 0
+        for offset, token in enumerate(tokens):
+            batch_add(batch, token, n_past + offset, 0, all_logits or offset == len(tokens) - 1)
+        decode_batch(ctx, batch)
+
+        indices = range(len(tokens)) if all_logits else [len(tokens) - 1]
+        return [
+            np.ctypeslib.as_array(llama_cpp.llama_get_logits_ith(ctx, i), shape=(n_vocab,)).copy()
+            for i in indices
+        ]
+
+    def _reset(self) -> None:
+        """Clear both KV caches so the high-level API starts from scratch."""
+        for model in (self.target, self.draft):
+            llama_cpp.llama_kv_cache_seq_rm(model_context(model), -1, -1, -1)
+            model.reset()
@@ -0,0 +1,92 @@
+# server/src/llm/state_store.py
+from typing import Iterator, Optional
+import hashlib
+import os
+import numpy as np
+from llama_cpp.llama import LlamaState
+from ..utils.logger import setup_logger
+from .prefix_cache import pad_state, trim_state
+
+logger = setup_logger(__name__)
+
+class StateStore:
+    """On-disk snapshots of evaluated prompt states.
+
+    Snapshots live under ``<directory>/<model hash>-ctx<n_ctx>/`` with one
+    ``<prompt hash>.npz`` file per prompt, so a restarted engine can reload
+    them without re-evaluating the prompts. States only restore into the
+    same model weights and context size, hence both are part of the path.
+    Only the rows for the prompt's tokens are written, compressed, and the
+    arrays are padded back to the full context on load.
+    """
+
+    # Bytes read from each end of the model file when fingerprinting it
+    HASH_CHUNK_SIZE = 16 * 1024 * 1024
+
+    def __init__(self, directory: str, model_path: str, n_ctx: int):
+        self.directory = os.path.join(directory, f"{model_hash(model_path)}-ctx{n_ctx}")
+        os.makedirs(self.directory, exist_ok=True)
+
+    def save(self, prompt: str, state: LlamaState) -> str:
+        """Write a prompt's state, replacing any previous snapshot."""
+        path = self._path(prompt)
+        tmp_path = f"{path}.tmp"
+        trimmed = trim_state(state)
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                input_ids=trimmed.input_ids,
+                scores=trimmed.scores,
+                n_tokens=np.int64(state.n_tokens),
+                n_ctx=np.int64(len(state.input_ids)),
+                llama_state=np.frombuffer(state.llama_state, dtype=np.uint8)
+            )
+        # Atomic rename so a crash never leaves a truncated snapshot behind
+        os.replace(tmp_path, path)
+        logger.info(f"Saved prompt state to {path}")
+        return path
+
+    def load(self, path: str) -> Optional[LlamaState]:
+        """Read one snapshot, returning None if it is unreadable."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                llama_state = data['llama_state'].tobytes()
+                # Snapshots written before trimming hold the full arrays
+                n_ctx = int(data['n_ctx']) if 'n_ctx' in data.files else len(data['input_ids'])
+                return pad_state(LlamaState(
+                    input_ids=data['input_ids'],
+                    scores=data['scores'],
+                    n_tokens=int(data['n_tokens']),
+                    llama_state=llama_state,
+                    llama_state_size=len(llama_state)
+                ), n_ctx)
+        except Exception as e:
+            logger.warning(f"Skipping unreadable prompt state {path}: {str(e)}")
+            return None
+
+    def load_all(self) -> Iterator[LlamaState]:
+        """Yield every readable snapshot for this model."""
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith('.npz'):
+                state = self.load(os.path.join(self.directory, name))
+                if state is not None:
+                    yield state
+
+    def _path(self, prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{digest}.npz")
+
+def model_hash(model_path: str, chunk_size: int = StateStore.HASH_CHUNK_SIZE) -> str:
+    """Fingerprint a model file from its size and leading/trailing bytes.
+
+    Hashing a multi-gigabyte GGUF in full would stall startup; the header,
+    tail and size identify a given file well enough to key snapshots.
+    """
+    size = os.path.getsize(model_path)
+    digest = hashlib.sha256(str(size).encode())
+    with open(model_path, 'rb') as f:
+        digest.update(f.read(chunk_size))
+        if size > chunk_size:
+            f.seek(max(chunk_size, size - chunk_size))
+            digest.update(f.read(chunk_size))
+    return digest.hexdigest()[:32]
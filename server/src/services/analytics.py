@@ -1,10 +1,14 @@
 # server/src/services/analytics.py
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 import sqlite3
 import json
+import asyncio
+import threading
 from datetime import datetime, timedelta
 import statistics
+import psutil
 from ..utils.logger import setup_logger
+from ..data.database.async_db import get_database
 
 logger = setup_logger(__name__)
 
@@ -13,12 +17,14 @@ class AnalyticsService:
     
     def __init__(self, db_path: str = "analytics.db"):
         self.db_path = db_path
+        self.db = get_database(db_path)
+        self.pool = self.db.pool
         self._init_db()
         
     def _init_db(self):
         """Initialize analytics database."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.transaction() as conn:
                 # Request metrics
                 conn.execute("""
                     CREATE TABLE IF NOT EXISTS request_metrics (
@@ -68,27 +74,26 @@ class AnalyticsService:
     ):
         """Record metrics for a single request."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
-                    """
-                    INSERT INTO request_metrics (
-                        timestamp, prompt_length, response_length, generation_time,
-                        tokens_used, temperature, success, error_type, memory_usage
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        datetime.now().isoformat(),
-                        prompt_length,
-                        response_length,
-                        generation_time,
-                        tokens_used,
-                        temperature,
-                        success,
-                        error_type,
-                        memory_usage
-                    )
+            await self.db.execute(
+                """
+                INSERT INTO request_metrics (
+                    timestamp, prompt_length, response_length, generation_time,
+                    tokens_used, temperature, success, error_type, memory_usage
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    datetime.now().isoformat(),
+                    prompt_length,
+                    response_length,
+                    generation_time,
+                    tokens_used,
+                    temperature,
+                    success,
+                    error_type,
+                    memory_usage
                 )
-                
+            )
+            
         except sqlite3.Error as e:
             logger.error(f"Failed to record request metrics: {str(e)}")
             raise
@@ -102,23 +107,22 @@ class AnalyticsService:
     ):
         """Record system performance metrics."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
-                    """
-                    INSERT INTO performance_metrics (
-                        timestamp, cpu_usage, memory_usage, 
-                        active_threads, queue_size
-                    ) VALUES (?, ?, ?, ?, ?)
-                    """,
-                    (
-                        datetime.now().isoformat(),
-                        cpu_usage,
-                        memory_usage,
-                        active_threads,
-                        queue_size
-                    )
+            await self.db.execute(
+                """
+                INSERT INTO performance_metrics (
+                    timestamp, cpu_usage, memory_usage, 
+                    active_threads, queue_size
+                ) VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    datetime.now().isoformat(),
+                    cpu_usage,
+                    memory_usage,
+                    active_threads,
+                    queue_size
                 )
-                
+            )
+            
         except sqlite3.Error as e:
             logger.error(f"Failed to record performance metrics: {str(e)}")
             raise
@@ -139,7 +143,7 @@ class AnalyticsService:
             delta = time_ranges.get(time_range, timedelta(hours=1))
             start_time = (datetime.now() - delta).isoformat()
             
-            with sqlite3.connect(self.db_path) as conn:
+            def query(conn: sqlite3.Connection) -> Dict[str, Any]:
                 cursor = conn.execute(
                     """
                     SELECT 
@@ -180,6 +184,9 @@ class AnalyticsService:
                 metrics['error_distribution'] = dict(cursor.fetchall())
                 
                 return metrics
+
+            # Both queries share one reader connection
+            return await self.db.read(query)
                 
         except sqlite3.Error as e:
             logger.error(f"Failed to get request metrics: {str(e)}")
@@ -201,44 +208,82 @@ class AnalyticsService:
             delta = time_ranges.get(time_range, timedelta(hours=1))
             start_time = (datetime.now() - delta).isoformat()
             
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute(
-                    """
-                    SELECT 
-                        timestamp,
-                        cpu_usage,
-                        memory_usage,
-                        active_threads,
-                        queue_size
-                    FROM performance_metrics
-                    WHERE timestamp > ?
-                    ORDER BY timestamp ASC
-                    """,
-                    (start_time,)
-                )
-                
-                rows = cursor.fetchall()
-                
-                return {
-                    'timeline': [{
-                        'timestamp': row[0],
-                        'cpu_usage': row[1],
-                        'memory_usage': row[2],
-                        'active_threads': row[3],
-                        'queue_size': row[4]
-                    } for row in rows],
-                    'summary': {
-                        'avg_cpu_usage': statistics.mean(row[1] for row in rows),
-                        'avg_memory_usage': statistics.mean(row[2] for row in rows),
-                        'max_cpu_usage': max(row[1] for row in rows),
-                        'max_memory_usage': max(row[2] for row in rows),
-                        'avg_queue_size': statistics.mean(row[4] for row in rows)
-                    }
+            rows = await self.db.fetchall(
+                """
+                SELECT 
+                    timestamp,
+                    cpu_usage,
+                    memory_usage,
+                    active_threads,
+                    queue_size
+                FROM performance_metrics
+                WHERE timestamp > ?
+                ORDER BY timestamp ASC
+                """,
+                (start_time,)
+            )
+            
+            return {
+                'timeline': [{
+                    'timestamp': row[0],
+                    'cpu_usage': row[1],
+                    'memory_usage': row[2],
+                    'active_threads': row[3],
+                    'queue_size': row[4]
+                } for row in rows],
+                'summary': {
+                    'avg_cpu_usage': statistics.mean(row[1] for row in rows),
+                    'avg_memory_usage': statistics.mean(row[2] for row in rows),
+                    'max_cpu_usage': max(row[1] for row in rows),
+                    'max_memory_usage': max(row[2] for row in rows),
+                    'avg_queue_size': statistics.mean(row[4] for row in rows)
                 }
-                
+            }
+            
         except sqlite3.Error as e:
             logger.error(f"Failed to get performance metrics: {str(e)}")
             raise
 
+class PerformanceSampler:
+    """Periodically record system performance metrics in the background."""
+
+    def __init__(
+        self,
+        service: AnalyticsService,
+        queue_size: Callable[[], int],
+        interval: float = 5.0
+    ):
+        self.service = service
+        self.queue_size = queue_size
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="performance-sampler", daemon=True)
+
+    def start(self) -> None:
+        """Start sampling."""
+        if not self._thread.is_alive():
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling after the current interval."""
+        self._stopped.set()
+
+    def sample(self) -> None:
+        """Record one performance sample."""
+        process = psutil.Process()
+        asyncio.run(self.service.record_performance(
+            cpu_usage=psutil.cpu_percent(),
+            memory_usage=process.memory_info().rss / 1024 / 1024,  # MB
+            active_threads=process.num_threads(),
+            queue_size=self.queue_size()
+        ))
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Failed to sample performance metrics: {str(e)}")
+
 # Create singleton instance
 analytics_service = AnalyticsService()
\ No newline at end of file
@@ -0,0 +1,94 @@
+# server/src/services/cache_codec.py
+"""Binary encoding for cached values.
+
+Every encoded value starts with one header byte: the low bits tag the
+serializer that produced it and the high bit marks zlib compression.
+Decoding dispatches on the tag, so entries written with one serializer
+stay readable after switching to another.
+"""
+from typing import Any, Callable, Dict, Tuple
+import pickle
+import zlib
+from ..core.exceptions import CacheError, ConfigurationError
+from ..core.constants import ErrorCodes
+
+try:
+    import msgpack
+except ImportError:  # Optional: pickle is used unless msgpack is configured
+    msgpack = None
+
+COMPRESSED = 0x80
+
+def _pickle_dumps(value: Any) -> bytes:
+    return pickle.dumps(value, protocol=5)
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, use_bin_type=True)
+
+def _msgpack_loads(raw: bytes) -> Any:
+    return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+
+# name -> (tag, dumps, loads). Pickle round-trips any Python value exactly;
+# msgpack is smaller and faster for JSON-like data but returns tuples as lists.
+SERIALIZERS: Dict[str, Tuple[int, Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    'pickle': (1, _pickle_dumps, pickle.loads),
+    'msgpack': (2, _msgpack_dumps, _msgpack_loads)
+}
+
+class CacheCodec:
+    """Encode values with a tagged serializer, compressing large payloads.
+
+    Payloads of at least ``compress_threshold`` bytes are zlib-compressed
+    when that makes them smaller; 0 disables compression.
+    """
+
+    def __init__(self, serializer: str = 'pickle', compress_threshold: int = 4096, compress_level: int = 6):
+        if serializer not in SERIALIZERS:
+            raise ConfigurationError(
+                message=f"Unknown cache serializer: {serializer}",
+                code=ErrorCodes.CONFIG_INVALID,
+                details={"serializers": list(SERIALIZERS)}
+            )
+        if serializer == 'msgpack' and msgpack is None:
+            raise ConfigurationError(
+                message="The msgpack cache serializer requires the msgpack package",
+                code=ErrorCodes.CONFIG_MISSING
+            )
+        self.serializer = serializer
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self._tag, self._dumps, _ = SERIALIZERS[serializer]
+
+    def encode(self, value: Any) -> bytes:
+        payload = self._dumps(value)
+        header = self._tag
+        if self.compress_threshold and len(payload) >= self.compress_threshold:
+            compressed = zlib.compress(payload, self.compress_level)
+            if len(compressed) < len(payload):
+                payload = compressed
+                header |= COMPRESSED
+        return bytes([header]) + payload
+
+    def decode(self, raw: bytes) -> Any:
+        if not raw:
+            raise CacheError(message="Empty cache entry", code=ErrorCodes.CACHE_DECODE_FAILED)
+        header = raw[0]
+        tag = header & ~COMPRESSED
+        for name, (serializer_tag, _, loads) in SERIALIZERS.items():
+            if serializer_tag == tag:
+                break
+        else:
+            raise CacheError(
+                message=f"Unknown cache entry format: {header:#04x}",
+                code=ErrorCodes.CACHE_DECODE_FAILED
+            )
+        if name == 'msgpack' and msgpack is None:
+            raise CacheError(
+                message="Cache entry was written with msgpack, which is not installed",
+                code=ErrorCodes.CACHE_DECODE_FAILED
+            )
+
+        payload = memoryview(raw)[1:]
+        if header & COMPRESSED:
+            payload = zlib.decompress(payload)
+        return loads(payload)
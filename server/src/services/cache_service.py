@@ -1,32 +1,237 @@
 # server/src/services/cache_service.py
-from typing import Any, Optional, Dict
-from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import asyncio
 import diskcache
+import hashlib
 import json
+import os
+import threading
+import time
+from ..core.exceptions import CacheError, ConfigurationError
+from ..core.constants import ErrorCodes
+from ..utils.async_utils import SingleFlight
+from .cache_codec import CacheCodec
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
-class CacheService:
-    """Service for handling caching operations."""
-    
-    def __init__(self, cache_dir: str = ".cache"):
-        self.cache = diskcache.Cache(cache_dir)
-        logger.info(f"Cache initialized at {cache_dir}")
+_MISSING = object()
+
+class MemoryCache:
+    """In-process LRU cache bounded by entry count and total bytes.
+
+    Entries keep their deadline (``time.time()`` based, like diskcache's
+    expire times) and are dropped when read after it. Values are held as
+    live objects, so callers must not mutate what they get back.
+    """
+
+    def __init__(self, max_items: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        # key -> (value, size in bytes, deadline or None), least recent first
+        self._entries: "OrderedDict[str, Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0
+        }
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return ``(found, value)``; a cached ``None`` is still found."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, _, deadline = entry
+                if deadline is None or deadline > time.time():
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return True, value
+                self._remove(key)
+                self._stats['expirations'] += 1
+            self._stats['misses'] += 1
+            return False, None
+
+    def set(self, key: str, value: Any, size: int, deadline: Optional[float] = None) -> bool:
+        """Store a value, evicting least recently used entries to fit.
+
+        Values larger than the whole byte budget are not kept.
+        """
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                return False
+            while self._entries and (len(self._entries) >= self.max_items or self._bytes + size > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+            self._entries[key] = (value, size, deadline)
+            self._bytes += size
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                'entries': len(self._entries),
+                'size_bytes': self._bytes,
+                'max_items': self.max_items,
+                'max_bytes': self.max_bytes
+            }
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry if present. Caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+@dataclass
+class NamespaceConfig:
+    """Limits for one cache namespace.
+
+    ``size_limit`` bounds the disk tier in bytes; diskcache culls entries
+    past it according to ``eviction_policy`` (one of
+    ``diskcache.EVICTION_POLICY``). The memory tier is always LRU.
+    Values are stored with ``serializer`` (see ``cache_codec.SERIALIZERS``)
+    and zlib-compressed from ``compress_threshold`` bytes.
+    """
+    size_limit: int = 1 << 30
+    eviction_policy: str = 'least-recently-stored'
+    memory_items: int = 1024
+    memory_bytes: int = 64 * 1024 * 1024
+    serializer: str = 'pickle'
+    compress_threshold: int = 4096
+
+# Each workload gets its own namespace so one cannot evict another's entries
+DEFAULT_NAMESPACES = {
+    'llm': NamespaceConfig(
+        size_limit=512 * 1024 * 1024,
+        eviction_policy='least-recently-used',
+        memory_items=1024,
+        memory_bytes=32 * 1024 * 1024
+    ),
+    'http': NamespaceConfig(
+        size_limit=128 * 1024 * 1024,
+        eviction_policy='least-recently-stored',
+        memory_items=512,
+        memory_bytes=16 * 1024 * 1024
+    ),
+    'search': NamespaceConfig(
+        size_limit=128 * 1024 * 1024,
+        eviction_policy='least-frequently-used',
+        memory_items=512,
+        memory_bytes=16 * 1024 * 1024
+    )
+}
+
+class CacheNamespace:
+    """Two-tier cache: an in-process LRU (L1) in front of diskcache (L2).
+
+    Writes go through to both tiers. L2 hits are promoted into L1 with
+    their remaining time to live, and entries evicted from L1 remain
+    available from L2. Values are encoded once on write with the
+    namespace's codec; the encoded size is what L1 charges against its
+    byte budget.
+
+    L1 is served inline; disk reads and writes, including pickling, run on
+    a small thread pool so they never block the event loop. Flask gives
+    each async view its own loop, so results come back through thread-safe
+    futures.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        directory: str,
+        config: NamespaceConfig,
+        io: ThreadPoolExecutor
+    ):
+        if config.eviction_policy not in diskcache.EVICTION_POLICY:
+            raise ConfigurationError(
+                message=f"Unknown cache eviction policy: {config.eviction_policy}",
+                code=ErrorCodes.CONFIG_INVALID,
+                details={"namespace": name, "policies": list(diskcache.EVICTION_POLICY)}
+            )
+        self.name = name
+        self.config = config
+        self.cache = diskcache.Cache(
+            directory,
+            size_limit=config.size_limit,
+            eviction_policy=config.eviction_policy
+        )
+        self.memory = MemoryCache(config.memory_items, config.memory_bytes)
+        self.codec = CacheCodec(config.serializer, config.compress_threshold)
+        self._io = io
+        # Misses being computed by get_or_set, shared by concurrent callers
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0
+        }
+        logger.info(f"Cache namespace '{name}' initialized at {directory}")
+
+    @staticmethod
+    def make_key(prefix: str, **parts: Any) -> str:
+        """Build a fixed-size cache key from a canonical encoding of ``parts``.
+
+        Parts are JSON-encoded with sorted keys, so keyword order never
+        changes the key, then hashed with BLAKE2b. Keys stay short no matter
+        how large the prompt or request body is.
+        """
+        canonical = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+        digest = hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+        return f"{prefix}:{digest}"
         
     async def get(self, key: str) -> Optional[Any]:
         """Get a value from cache."""
         try:
-            value = self.cache.get(key)
-            if value is not None:
-                logger.debug(f"Cache hit for key: {key}")
-                return json.loads(value) if isinstance(value, str) else value
-            logger.debug(f"Cache miss for key: {key}")
-            return None
+            found, value = await self._lookup(key)
+            return value if found else None
         except Exception as e:
             logger.error(f"Cache get error for key {key}: {str(e)}")
             return None
 
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values at once; missing keys are left out.
+
+        Keys not in memory are read from disk in a single transaction.
+        """
+        found: Dict[str, Any] = {}
+        missing = []
+        for key in keys:
+            hit, value = self.memory.get(key)
+            if hit:
+                found[key] = value
+            else:
+                missing.append(key)
+
+        if missing:
+            try:
+                entries = await self._run(self._disk_get_many, missing)
+            except Exception as e:
+                logger.error(f"Cache get_many error: {str(e)}")
+                return found
+            self._count('hits', len(entries))
+            self._count('misses', len(missing) - len(entries))
+            for key, (value, size, deadline) in entries.items():
+                self.memory.set(key, value, size, deadline)
+                found[key] = value
+        return found
+
     async def set(
         self, 
         key: str, 
@@ -34,41 +239,208 @@ class CacheService:
         expire: Optional[int] = None
     ) -> bool:
         """Set a value in cache with optional expiration in seconds."""
+        return await self.set_many({key: value}, expire)
+
+    async def set_many(self, items: Dict[str, Any], expire: Optional[int] = None) -> bool:
+        """Set several values in one disk transaction."""
         try:
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value)
-            self.cache.set(key, value, expire=expire)
-            logger.debug(f"Cache set for key: {key}")
+            deadline = time.time() + expire if expire is not None else None
+            sizes = await self._run(self._disk_set_many, items, expire)
+            for key, value in items.items():
+                self.memory.set(key, value, sizes[key], deadline)
+            logger.debug(f"Cache set for keys: {list(items)}")
             return True
         except Exception as e:
-            logger.error(f"Cache set error for key {key}: {str(e)}")
+            for key in items:
+                self.memory.delete(key)
+            logger.error(f"Cache set error for keys {list(items)}: {str(e)}")
             return False
 
     async def delete(self, key: str) -> bool:
         """Delete a value from cache."""
+        return await self.delete_many([key]) is not None
+
+    async def delete_many(self, keys: Iterable[str]) -> Optional[int]:
+        """Delete several values in one disk transaction.
+
+        Returns how many were on disk, or None on error.
+        """
+        keys = list(keys)
         try:
-            self.cache.delete(key)
-            logger.debug(f"Cache delete for key: {key}")
-            return True
+            for key in keys:
+                self.memory.delete(key)
+            deleted = await self._run(self._disk_delete_many, keys)
+            logger.debug(f"Cache delete for keys: {keys}")
+            return deleted
         except Exception as e:
-            logger.error(f"Cache delete error for key {key}: {str(e)}")
-            return False
+            logger.error(f"Cache delete error for keys {keys}: {str(e)}")
+            return None
+
+    async def get_or_set(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        expire: Optional[int] = None
+    ) -> Any:
+        """Return the cached value, computing and storing it on a miss.
+
+        Concurrent misses on the same key, from any thread or event loop,
+        share one call to ``compute``; if it raises, every waiter gets the
+        exception and nothing is cached.
+        """
+        found, value = await self._lookup(key)
+        if found:
+            return value
+
+        async def compute_and_set() -> Any:
+            value = await compute()
+            await self.set(key, value, expire=expire)
+            return value
+
+        return await self._flight.run(key, compute_and_set)
 
     async def clear(self) -> bool:
         """Clear all cached values."""
         try:
-            self.cache.clear()
+            self.memory.clear()
+            await self._run(self.cache.clear)
             logger.info("Cache cleared")
             return True
         except Exception as e:
             logger.error(f"Cache clear error: {str(e)}")
             return False
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and sizes for each tier."""
+        with self._lock:
+            disk = dict(self._stats)
+        disk['entries'] = len(self.cache)
+        disk['size_bytes'] = self.cache.volume()
+        disk['size_limit'] = self.config.size_limit
+        disk['eviction_policy'] = self.config.eviction_policy
+        memory = self.memory.get_stats()
+
+        # Every lookup consults memory first, so its counters see them all
+        lookups = memory['hits'] + memory['misses']
+        return {
+            'hit_rate': (memory['hits'] + disk['hits']) / lookups if lookups else 0.0,
+            'memory': memory,
+            'disk': disk,
+            'coalesced': self._flight.get_stats()['followers']
+        }
+
+    def close(self) -> None:
+        """Close the disk cache."""
+        self.cache.close()
+
+    async def _lookup(self, key: str) -> Tuple[bool, Any]:
+        """Memory, then disk; disk hits are promoted into memory."""
+        found, value = self.memory.get(key)
+        if found:
+            logger.debug(f"Memory cache hit for key: {key}")
+            return True, value
+
+        entries = await self._run(self._disk_get_many, [key])
+        if key not in entries:
+            self._count('misses')
+            logger.debug(f"Cache miss for key: {key}")
+            return False, None
+
+        self._count('hits')
+        value, size, deadline = entries[key]
+        self.memory.set(key, value, size, deadline)
+        logger.debug(f"Disk cache hit for key: {key}")
+        return True, value
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.wrap_future(self._io.submit(fn, *args))
+
+    def _disk_get_many(self, keys: List[str]) -> Dict[str, Tuple[Any, int, Optional[float]]]:
+        """Read and decode entries as ``(value, size, deadline)``. Runs on the I/O pool."""
+        with self.cache.transact():
+            rows = {key: self.cache.get(key, default=_MISSING, expire_time=True) for key in keys}
+
+        entries = {}
+        for key, (raw, deadline) in rows.items():
+            if raw is _MISSING:
+                continue
+            try:
+                entries[key] = (self.codec.decode(raw), len(raw), deadline)
+            except Exception as e:
+                # Written in an older format or corrupted: treat it as a miss
+                logger.warning(f"Dropping undecodable cache entry {key}: {str(e)}")
+                self.cache.delete(key)
+        return entries
+
+    def _disk_set_many(self, items: Dict[str, Any], expire: Optional[int]) -> Dict[str, int]:
+        """Encode and write entries, returning their sizes. Runs on the I/O pool."""
+        encoded = {key: self.codec.encode(value) for key, value in items.items()}
+        with self.cache.transact():
+            for key, raw in encoded.items():
+                self.cache.set(key, raw, expire=expire)
+        return {key: len(raw) for key, raw in encoded.items()}
+
+    def _disk_delete_many(self, keys: List[str]) -> int:
+        with self.cache.transact():
+            return sum(1 for key in keys if self.cache.delete(key))
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[counter] += amount
+
+class CacheService(CacheNamespace):
+    """Cache entry point: the default namespace plus named ones.
+
+    The service itself is the default namespace, stored directly in
+    ``cache_dir``; named namespaces live in subdirectories with their own
+    limits and statistics, and share one disk I/O thread pool.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = ".cache",
+        namespaces: Optional[Dict[str, NamespaceConfig]] = None,
+        io_workers: int = 4
+    ):
+        io = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="cache-io")
+        super().__init__('default', cache_dir, NamespaceConfig(), io)
+        self.namespaces: Dict[str, CacheNamespace] = {
+            name: CacheNamespace(name, os.path.join(cache_dir, name), config, io)
+            for name, config in (DEFAULT_NAMESPACES if namespaces is None else namespaces).items()
+        }
+
+    def namespace(self, name: str) -> CacheNamespace:
+        """Get a namespace by name; ``default`` is the service itself."""
+        if name == self.name:
+            return self
+        if name not in self.namespaces:
+            raise CacheError(
+                message=f"Unknown cache namespace: {name}",
+                code=ErrorCodes.CACHE_NAMESPACE_UNKNOWN,
+                details={"namespaces": [self.name, *self.namespaces]},
+                status_code=404
+            )
+        return self.namespaces[name]
+
+    def get_all_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get statistics for every namespace."""
+        return {
+            self.name: self.get_stats(),
+            **{name: namespace.get_stats() for name, namespace in self.namespaces.items()}
+        }
+
+    def close(self) -> None:
+        """Wait for pending disk operations and close every namespace."""
+        self._io.shutdown(wait=True)
+        for namespace in self.namespaces.values():
+            namespace.close()
+        super().close()
+
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.cache.close()
+        self.close()
 
 # Create singleton instance
 cache_service = CacheService()
\ No newline at end of file
@@ -6,27 +6,29 @@ except ImportError:
 
 from flask import request
 from datetime import datetime
+import time
 from typing import Callable, Dict, Any, Optional
-from ..core.exceptions import APIError
+from ..core.exceptions import APIError, ModelError, SchedulerError
 from ..core.constants import ModelStatus, ErrorCodes
 from ..utils.logger import setup_logger
-from ..llm.engine import LLMEngine
+from ..llm.model_pool import ModelPool
+from ..api.schemas import ChatRequest
+from ..utils.async_utils import iterate_sync
 
 logger = setup_logger(__name__)
 
 # Initialize SocketIO instance
 socketio = SocketIO()
-llm_engine: Optional[LLMEngine] = None
 
 class WebSocketManager:
     def __init__(self):
         self.connected_clients: Dict[str, Dict[str, Any]] = {}
-        self._llm_engine: Optional[LLMEngine] = None
+        self._model_pool: Optional[ModelPool] = None
         self._event_handlers: Dict[str, Callable] = {}
         
-    def set_engine(self, engine: Optional[LLMEngine]) -> None:
-        """Set the LLM engine instance."""
-        self._llm_engine = engine
+    def set_model_pool(self, pool: Optional[ModelPool]) -> None:
+        """Set the model pool that chat and status events are served from."""
+        self._model_pool = pool
 
     def _register_handler(self, event: str, handler: Callable) -> None:
         """Register an event handler with Socket.IO."""
@@ -65,8 +67,8 @@ class WebSocketManager:
         # Register status request handler
         def on_status_request(data: Dict[str, Any] = None) -> None:
             try:
-                if self._llm_engine:
-                    status = self._llm_engine.get_status()
+                if self._model_pool:
+                    status = self._model_pool.get_status()
                     emit('model_status_update', status)
                 else:
                     emit('model_status_update', {'status': ModelStatus.STOPPED})
@@ -78,6 +80,46 @@ class WebSocketManager:
                 })
         self._register_handler('model_status_request', on_status_request)
 
+        # Register streaming chat handler
+        def on_chat_message(data: Dict[str, Any] = None) -> None:
+            try:
+                if not self._model_pool:
+                    emit('error', {
+                        'message': 'Model not initialized',
+                        'code': ErrorCodes.MODEL_NOT_READY
+                    })
+                    return
+
+                chat = ChatRequest(**(data or {}))
+                engine = self._model_pool.get(chat.model)
+                if not engine.is_ready:
+                    emit('error', {
+                        'message': 'Model not ready',
+                        'code': ErrorCodes.MODEL_NOT_READY
+                    })
+                    return
+
+                args = {'priority': chat.priority, 'timeout': chat.timeout}
+                if chat.settings:
+                    args['max_tokens'] = chat.settings.max_tokens
+                    args['temperature'] = chat.settings.temperature
+
+                start_time = time.time()
+                stream = engine.stream_chunks(chat.message, **args)
+                for text in iterate_sync(stream):
+                    emit('chat_token', {'text': text})
+                emit('chat_complete', {'generation_time': time.time() - start_time})
+            except (SchedulerError, ModelError) as e:
+                logger.warning(f"Chat request rejected: {e.message}")
+                emit('error', {'message': e.message, 'code': e.code})
+            except Exception as e:
+                logger.error(f"Chat stream error: {str(e)}")
+                emit('error', {
+                    'message': 'Failed to generate response',
+                    'code': ErrorCodes.MODEL_RESPONSE_FAILED
+                })
+        self._register_handler('chat_message', on_chat_message)
+
         logger.info("WebSocket event handlers registered")
 
     def broadcast_status(self, status: Dict[str, Any]) -> None:
@@ -93,6 +135,14 @@ class WebSocketManager:
                 details={"error": str(e)}
             )
 
+    def broadcast_load_progress(self, progress: Dict[str, Any]) -> None:
+        """Broadcast model loading progress to all connected clients."""
+        try:
+            socketio.emit('model_load_progress', progress)
+            logger.debug(f"Load progress broadcast: {progress}")
+        except Exception as e:
+            logger.error(f"Load progress broadcast error: {str(e)}")
+
     @property
     def connected_count(self) -> int:
         """Get the number of connected clients."""
@@ -0,0 +1,184 @@
+# server/src/utils/async_utils.py
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+def iterate_sync(agen: AsyncGenerator[T, None]) -> Iterator[T]:
+    """Drive an async generator from synchronous code.
+
+    Flask streaming responses and Socket.IO handlers are plain generators
+    and functions, so they cannot ``async for`` over a token stream. This
+    runs the generator on a private event loop, one item at a time.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        try:
+            loop.run_until_complete(agen.aclose())
+        finally:
+            loop.close()
+
+class _Broadcast:
+    """Chunks of one shared stream, replayed to every subscriber."""
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.waiters: List[Future] = []
+        self.subscribers = 0
+        self.producer: Optional[Future] = None
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into one.
+
+    The first caller for a key (the leader) does the work; callers that
+    arrive while it is in flight (followers) share its result, or replay
+    and then tail its stream. Coordination uses threading primitives and
+    ``concurrent.futures.Future`` because Flask runs every async view on
+    its own event loop and thread.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {
+            'leaders': 0,
+            'followers': 0
+        }
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await ``fn()``, or the in-flight call with the same key."""
+        with self._lock:
+            pending = self._calls.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._calls[key] = Future()
+            self._stats['leaders' if leader else 'followers'] += 1
+
+        if not leader:
+            return await asyncio.wrap_future(pending)
+
+        try:
+            result = await fn()
+            pending.set_result(result)
+            return result
+        except BaseException as e:
+            # Cancellation belongs to the leader's request, not its followers
+            if not isinstance(e, Exception):
+                e = RuntimeError("Coalesced call was abandoned by its leader")
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def stream(self, key: str, fn: Callable[[], AsyncIterator[T]]) -> AsyncGenerator[T, None]:
+        """Iterate ``fn()``, or tap the in-flight stream with the same key.
+
+        The stream is produced on this flight's own event loop thread, so it
+        does not depend on the caller that started it: every caller replays
+        the chunks produced so far, then tails the rest. A caller that
+        disconnects only detaches itself; the producer is cancelled once no
+        caller is left. Errors raised by ``fn()`` reach every caller.
+        """
+        with self._lock:
+            broadcast = self._streams.get(key)
+            leader = broadcast is None
+            if leader:
+                broadcast = self._streams[key] = _Broadcast()
+                broadcast.producer = asyncio.run_coroutine_threadsafe(
+                    self._produce(key, broadcast, fn),
+                    self._producer_loop()
+                )
+            broadcast.subscribers += 1
+            self._stats['leaders' if leader else 'followers'] += 1
+
+        async for chunk in self._follow(key, broadcast):
+            yield chunk
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                'in_flight': len(self._calls) + len(self._streams)
+            }
+
+    def _producer_loop(self) -> asyncio.AbstractEventLoop:
+        """The event loop shared streams run on, started on first use; call with the lock held."""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, name="single-flight", daemon=True).start()
+        return self._loop
+
+    async def _produce(self, key: str, broadcast: _Broadcast, fn: Callable[[], AsyncIterator[T]]) -> None:
+        """Run ``fn()`` to completion, publishing each chunk."""
+        error: Optional[BaseException] = RuntimeError("Coalesced stream was abandoned")
+        iterator = fn()
+        try:
+            async for chunk in iterator:
+                self._publish(broadcast, chunk)
+            error = None
+        except Exception as e:
+            error = e
+        finally:
+            aclose = getattr(iterator, 'aclose', None)
+            if aclose:
+                await aclose()
+            with self._lock:
+                if self._streams.get(key) is broadcast:
+                    del self._streams[key]
+            self._publish(broadcast, done=True, error=error)
+
+    async def _follow(self, key: str, broadcast: _Broadcast) -> AsyncGenerator[T, None]:
+        index = 0
+        try:
+            while True:
+                with self._lock:
+                    if index < len(broadcast.chunks):
+                        chunks = broadcast.chunks[index:]
+                        waiter = None
+                    elif broadcast.done:
+                        if broadcast.error is not None:
+                            raise broadcast.error
+                        return
+                    else:
+                        chunks = []
+                        waiter = Future()
+                        broadcast.waiters.append(waiter)
+
+                if waiter is not None:
+                    await asyncio.wrap_future(waiter)
+                for chunk in chunks:
+                    index += 1
+                    yield chunk
+        finally:
+            with self._lock:
+                broadcast.subscribers -= 1
+                abandoned = broadcast.subscribers == 0 and not broadcast.done
+                # Later callers must not join a stream that is being cancelled
+                if abandoned and self._streams.get(key) is broadcast:
+                    del self._streams[key]
+            if abandoned:
+                broadcast.producer.cancel()
+
+    def _publish(self, broadcast: _Broadcast, *chunk: Any, done: bool = False, error: Optional[BaseException] = None) -> None:
+        """Append a chunk or mark the stream finished, then wake followers."""
+        with self._lock:
+            broadcast.chunks.extend(chunk)
+            if done:
+                broadcast.done = True
+                broadcast.error = error
+            waiters, broadcast.waiters = broadcast.waiters, []
+        for waiter in waiters:
+            waiter.set_result(None)
@@ -1,13 +1,12 @@
 # server/src/utils/decorators.py
 from functools import wraps
 from typing import Optional, Callable
-import hashlib
-import json
 from flask import request
 from ..services.cache_service import cache_service
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
+http_cache = cache_service.namespace('http')
 
 def cache_response(expire: Optional[int] = 300):
     """Cache API response decorator.
@@ -19,27 +18,21 @@ def cache_response(expire: Optional[int] = 300):
         @wraps(func)
         async def wrapper(*args, **kwargs):
             # Generate cache key from function name and request data
-            key_parts = [
-                func.__name__,
-                request.path,
-                request.method,
-                str(request.args),
-                request.get_data().decode('utf-8')
-            ]
-            cache_key = hashlib.md5(
-                json.dumps(key_parts, sort_keys=True).encode('utf-8')
-            ).hexdigest()
+            cache_key = http_cache.make_key(
+                'http',
+                function=func.__name__,
+                path=request.path,
+                method=request.method,
+                args=sorted(request.args.items(multi=True)),
+                body=request.get_data().decode('utf-8')
+            )
 
-            # Try to get from cache
-            cached_response = await cache_service.get(cache_key)
-            if cached_response is not None:
-                logger.debug(f"Returning cached response for {func.__name__}")
-                return cached_response
-
-            # Execute function and cache result
-            response = await func(*args, **kwargs)
-            await cache_service.set(cache_key, response, expire=expire)
-            return response
+            # Concurrent misses for the same request share one call
+            return await http_cache.get_or_set(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                expire=expire
+            )
 
         return wrapper
     return decorator
\ No newline at end of file
@@ -0,0 +1,56 @@
+# server/tests/test_async_db.py
+import asyncio
+import threading
+import pytest
+from src.data.database.async_db import AsyncDatabase, get_database
+from src.data.database.pool import ConnectionPool
+
+@pytest.fixture
+def db(tmp_path):
+    """Create a file database with one table."""
+    database = AsyncDatabase(ConnectionPool(str(tmp_path / "test.db")))
+    with database.pool.transaction() as conn:
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, x INTEGER)")
+    yield database
+    database.close()
+    database.pool.close()
+
+async def test_statements_run_on_database_threads(db):
+    """Test awaitable statements and that they leave the calling thread."""
+    result = await db.execute("INSERT INTO t (x) VALUES (?)", (1,))
+    assert result.lastrowid == 1 and result.rowcount == 1
+    assert await db.executemany("INSERT INTO t (x) VALUES (?)", [(2,), (3,)]) == 2
+
+    assert await db.fetchone("SELECT COUNT(*) FROM t") == (3,)
+    rows = await asyncio.gather(*[db.fetchall("SELECT x FROM t ORDER BY x") for _ in range(4)])
+    assert all(r == [(1,), (2,), (3,)] for r in rows)
+
+    caller = threading.get_ident()
+    assert await db.read(lambda conn: threading.get_ident()) != caller
+    name = await db.write(lambda conn: threading.current_thread().name)
+    assert name.startswith("db-write")
+
+async def test_transaction_commits_or_rolls_back(db):
+    """Test that a transaction is atomic and invisible until it commits."""
+    async with db.transaction() as tx:
+        await tx.execute("INSERT INTO t (x) VALUES (1)")
+        assert await tx.fetchone("SELECT COUNT(*) FROM t") == (1,)
+        # Readers see the last committed state
+        assert await db.fetchone("SELECT COUNT(*) FROM t") == (0,)
+    assert await db.fetchone("SELECT COUNT(*) FROM t") == (1,)
+
+    with pytest.raises(ValueError):
+        async with db.transaction() as tx:
+            await tx.executemany("INSERT INTO t (x) VALUES (?)", [(2,), (3,)])
+            raise ValueError("abort")
+    assert await db.fetchone("SELECT COUNT(*) FROM t") == (1,)
+
+    # The writer thread is free again
+    await db.execute("INSERT INTO t (x) VALUES (4)")
+    assert await db.fetchone("SELECT COUNT(*) FROM t") == (2,)
+
+def test_get_database_shares_files_only(tmp_path):
+    """Test the registry shares file databases but never :memory:."""
+    path = str(tmp_path / "shared.db")
+    assert get_database(path) is get_database(path)
+    assert get_database(":memory:") is not get_database(":memory:")
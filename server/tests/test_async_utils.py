@@ -0,0 +1,71 @@
+# server/tests/test_async_utils.py
+import asyncio
+import pytest
+from src.utils.async_utils import SingleFlight
+
+async def test_single_flight_shares_result():
+    """Test that concurrent calls with one key run once."""
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    results = await asyncio.gather(*[flight.run("key", work) for _ in range(3)])
+    assert results == ["done"] * 3
+    assert len(calls) == 1
+    assert flight.get_stats() == {'leaders': 1, 'followers': 2, 'in_flight': 0}
+
+async def test_single_flight_stream_replays_and_follows():
+    """Test that a late follower receives earlier chunks, then the rest."""
+    flight = SingleFlight()
+
+    async def tokens():
+        for token in ["a", "b", "c"]:
+            await asyncio.sleep(0.02)
+            yield token
+
+    async def collect(delay):
+        await asyncio.sleep(delay)
+        return [chunk async for chunk in flight.stream("key", tokens)]
+
+    leader, follower = await asyncio.gather(collect(0), collect(0.03))
+    assert leader == follower == ["a", "b", "c"]
+    assert flight.get_stats()['followers'] == 1
+
+async def test_single_flight_stream_propagates_errors():
+    """Test that followers see the leader's failure."""
+    flight = SingleFlight()
+
+    async def failing():
+        yield "a"
+        await asyncio.sleep(0.02)
+        raise ValueError("boom")
+
+    async def collect(delay):
+        await asyncio.sleep(delay)
+        return [chunk async for chunk in flight.stream("key", failing)]
+
+    results = await asyncio.gather(collect(0), collect(0.01), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+
+async def test_single_flight_stream_stops_when_everyone_leaves():
+    """Test that the shared producer is cancelled once its last caller disconnects."""
+    flight = SingleFlight()
+    produced = []
+
+    async def tokens():
+        for token in range(100):
+            await asyncio.sleep(0.01)
+            produced.append(token)
+            yield token
+
+    stream = flight.stream("key", tokens)
+    assert await stream.__anext__() == 0
+    await stream.aclose()
+
+    await asyncio.sleep(0.1)
+    assert len(produced) < 5
+    assert flight.get_stats()['in_flight'] == 0
@@ -0,0 +1,42 @@
+import json
+import pytest
+from src.llm.autotune import cpu_signature, load_profile, profile_path, select_best
+
+def _result(n_ctx, n_batch, n_threads, prompt, decode):
+    return {
+        'n_ctx': n_ctx,
+        'n_batch': n_batch,
+        'n_threads': n_threads,
+        'prompt_tokens_per_sec': prompt,
+        'decode_tokens_per_sec': decode
+    }
+
+def test_select_best_splits_prompt_and_decode():
+    """Test that prompt and decode settings are chosen independently."""
+    results = [
+        _result(2048, 256, 4, prompt=100.0, decode=12.0),
+        _result(2048, 512, 8, prompt=180.0, decode=10.0),
+        _result(4096, 512, 4, prompt=170.0, decode=11.8),
+    ]
+
+    assert select_best(results) == {
+        'n_ctx': 4096,  # Within tolerance of the fastest decode
+        'n_batch': 512,
+        'n_threads': 4,
+        'n_threads_batch': 8
+    }
+
+def test_load_profile_checks_cpu(tmp_path):
+    """Test that profiles only apply on the CPU they were measured on."""
+    model_path = tmp_path / "model.gguf"
+    model_path.write_bytes(b"GGUF")
+    path = profile_path(str(model_path), str(tmp_path))
+    runtime = {'n_threads': 6, 'n_batch': 256}
+
+    with open(path, 'w') as f:
+        json.dump({'cpu': cpu_signature(), 'runtime': runtime}, f)
+    assert load_profile(str(model_path), str(tmp_path)) == runtime
+
+    with open(path, 'w') as f:
+        json.dump({'cpu': {**cpu_signature(), 'physical_cores': -1}, 'runtime': runtime}, f)
+    assert load_profile(str(model_path), str(tmp_path)) == {}
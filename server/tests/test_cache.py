@@ -1,14 +1,17 @@
 # server/tests/test_cache.py
 import pytest
-from src.services.cache_service import CacheService
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from src.services.cache_service import CacheService, MemoryCache
+from src.core.exceptions import CacheError
 import time
 
 @pytest.fixture
-def cache_service():
-    """Create a test cache service."""
-    service = CacheService(cache_dir=".test_cache")
+def cache_service(tmp_path):
+    """Create a test cache service in a fresh directory."""
+    service = CacheService(cache_dir=str(tmp_path / "cache"))
     yield service
-    service.clear()  # Clean up after tests
+    service.close()
 
 async def test_cache_basic_operations(cache_service):
     """Test basic cache operations."""
@@ -44,4 +47,94 @@ async def test_cache_complex_data(cache_service):
     
     await cache_service.set("complex_key", data)
     value = await cache_service.get("complex_key")
-    assert value == data
\ No newline at end of file
+    assert value == data
+
+def test_make_key_is_canonical_and_bounded():
+    """Test that keys ignore keyword order and stay fixed-size."""
+    key = CacheService.make_key("llm_response", prompt="x" * 10000, top_p=0.9, temperature=0.0)
+    same = CacheService.make_key("llm_response", temperature=0.0, top_p=0.9, prompt="x" * 10000)
+    assert key == same
+    assert key.startswith("llm_response:")
+    assert len(key) == len("llm_response:") + 32
+
+    assert key != CacheService.make_key("llm_response", prompt="x" * 10000, top_p=0.8, temperature=0.0)
+
+async def test_cache_tiers(cache_service):
+    """Test write-through, promotion from disk and per-tier counters."""
+    await cache_service.set("tier_key", {"answer": 42}, expire=60)
+    assert await cache_service.get("tier_key") == {"answer": 42}
+    assert cache_service.get_stats()['memory']['hits'] == 1
+
+    # Evicted from memory, still on disk, promoted on the next read
+    cache_service.memory.clear()
+    assert await cache_service.get("tier_key") == {"answer": 42}
+    assert await cache_service.get("tier_key") == {"answer": 42}
+
+    stats = cache_service.get_stats()
+    assert stats['disk']['hits'] == 1
+    assert stats['memory']['hits'] == 2
+
+def test_memory_cache_limits():
+    """Test LRU eviction by entry count and bytes, and expiry."""
+    memory = MemoryCache(max_items=2, max_bytes=100)
+    memory.set("a", 1, 10)
+    memory.set("b", 2, 10)
+    memory.get("a")
+    memory.set("c", 3, 10)
+    assert memory.get("b") == (False, None)
+    assert memory.get("a") == (True, 1)
+
+    memory.set("big", 4, 95)
+    assert memory.get_stats()['entries'] == 1
+    assert memory.set("huge", 5, 101) is False
+
+    memory.set("old", 6, 1, deadline=time.time() - 1)
+    assert memory.get("old") == (False, None)
+
+async def test_cache_bulk_operations(cache_service):
+    """Test get_many/set_many/delete_many."""
+    assert await cache_service.set_many({"bulk_a": 1, "bulk_b": [2]}, expire=60)
+    cache_service.memory.clear()
+
+    assert await cache_service.get_many(["bulk_a", "bulk_b", "bulk_c"]) == {"bulk_a": 1, "bulk_b": [2]}
+    assert await cache_service.delete_many(["bulk_a", "bulk_b", "bulk_c"]) == 2
+    assert await cache_service.get_many(["bulk_a", "bulk_b"]) == {}
+
+def test_get_or_set_coalesces_concurrent_misses(cache_service):
+    """Test that concurrent misses from separate event loops compute once."""
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return "computed"
+
+    def request():
+        return asyncio.run(cache_service.get_or_set("stampede_key", compute, expire=60))
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: request(), range(4)))
+
+    assert results == ["computed"] * 4
+    assert len(calls) == 1
+    assert cache_service.get_stats()['coalesced'] == 3
+
+async def test_cache_namespaces(cache_service):
+    """Test that namespaces are isolated and purged independently."""
+    llm = cache_service.namespace("llm")
+    http = cache_service.namespace("http")
+    await llm.set("shared_key", "llm value")
+    await http.set("shared_key", "http value")
+
+    assert await http.clear()
+    assert await llm.get("shared_key") == "llm value"
+    assert await http.get("shared_key") is None
+
+    stats = cache_service.get_all_stats()
+    assert set(stats) == {"default", "llm", "http", "search"}
+    assert stats["llm"]["disk"]["eviction_policy"] == "least-recently-used"
+    assert stats["llm"]["hit_rate"] == 1.0
+
+    with pytest.raises(CacheError):
+        cache_service.namespace("missing")
+    await llm.clear()
@@ -0,0 +1,33 @@
+# server/tests/test_cache_codec.py
+import pytest
+from src.services.cache_codec import CacheCodec, COMPRESSED
+from src.core.exceptions import CacheError
+
+def test_codec_round_trips_exactly():
+    """Test that values decode to equal values of the same types."""
+    codec = CacheCodec()
+    value = {"response": "hi", "tokens": (1, 2), "raw": b"\x00\x01", "nested": [{"a": None}]}
+    assert codec.decode(codec.encode(value)) == value
+    assert codec.decode(codec.encode("plain string")) == "plain string"
+
+def test_codec_compresses_large_values():
+    """Test that only payloads past the threshold are compressed."""
+    codec = CacheCodec(compress_threshold=1024)
+    small = codec.encode("x" * 10)
+    large = codec.encode("x" * 100000)
+
+    assert not small[0] & COMPRESSED
+    assert large[0] & COMPRESSED
+    assert len(large) < 1000
+    assert codec.decode(large) == "x" * 100000
+
+    with pytest.raises(CacheError):
+        codec.decode(b"\x7f" + large[1:])
+
+def test_codec_msgpack():
+    """Test the optional msgpack serializer and reading across serializers."""
+    pytest.importorskip("msgpack")
+    codec = CacheCodec(serializer="msgpack")
+    value = {"response": "hi", "tokens_used": 3}
+    assert codec.decode(codec.encode(value)) == value
+    assert CacheCodec().decode(codec.encode(value)) == value
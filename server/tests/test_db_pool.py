@@ -0,0 +1,66 @@
+# server/tests/test_db_pool.py
+import sqlite3
+import threading
+import pytest
+from src.data.database.pool import ConnectionPool, get_pool
+from src.core.exceptions import DatabaseError
+
+def test_file_pool_uses_wal_and_per_thread_connections(tmp_path):
+    """Test pragmas and connection reuse for a file database."""
+    pool = ConnectionPool(str(tmp_path / "test.db"))
+    with pool.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        main_conn = conn
+    with pool.connection() as conn:
+        assert conn is main_conn
+
+    other = []
+    def use_pool():
+        with pool.transaction() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            other.append(conn)
+    thread = threading.Thread(target=use_pool)
+    thread.start()
+    thread.join()
+    assert other[0] is not main_conn
+
+    pool.close()
+    with pytest.raises(DatabaseError):
+        with pool.connection():
+            pass
+
+def test_connections_close_when_threads_exit(tmp_path):
+    """Test that short-lived threads do not leave connections behind."""
+    pool = ConnectionPool(str(tmp_path / "test.db"))
+    with pool.connection() as conn:
+        conn.execute("SELECT 1")
+
+    connections = []
+    def use_pool():
+        with pool.connection() as conn:
+            conn.execute("SELECT 1")
+            connections.append(conn)
+    for _ in range(20):
+        thread = threading.Thread(target=use_pool)
+        thread.start()
+        thread.join()
+
+    stats = pool.get_stats()
+    assert stats['connections'] == 1
+    assert stats['threads'] == [threading.current_thread().name]
+    with pytest.raises(sqlite3.ProgrammingError):
+        connections[0].execute("SELECT 1")
+    pool.close()
+
+def test_memory_pool_shares_one_database():
+    """Test that :memory: pools keep one database and are never shared."""
+    pool = get_pool(":memory:")
+    with pool.transaction() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+
+    assert get_pool(":memory:") is not pool
+    pool.close()
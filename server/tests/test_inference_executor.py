@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import time
+import pytest
+from src.llm.executor import InferenceExecutor
+
+@pytest.fixture
+def executor():
+    """Create a test inference executor."""
+    executor = InferenceExecutor(name="test-inference")
+    yield executor
+    executor.shutdown()
+
+async def test_run_on_worker_thread(executor):
+    """Test that jobs run on the dedicated worker thread."""
+    thread_name = await executor.run(lambda: threading.current_thread().name)
+    assert thread_name == "test-inference"
+
+async def test_run_propagates_errors(executor):
+    """Test that job exceptions reach the awaiting coroutine."""
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await executor.run(fail)
+
+async def test_event_loop_stays_responsive(executor):
+    """Test that a blocking job does not stall other coroutines."""
+    ticks = []
+
+    async def heartbeat():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(executor.run(time.sleep, 0.2), heartbeat())
+    assert len(ticks) == 5
+    assert ticks[-1] - ticks[0] < 0.2
+
+async def test_stream_yields_items(executor):
+    """Test streaming a generator from the worker thread."""
+    def produce():
+        for i in range(3):
+            yield i
+
+    items = [item async for item in executor.stream(produce)]
+    assert items == [0, 1, 2]
+
+async def test_stream_stops_early(executor):
+    """Test that an abandoned stream stops its producer."""
+    produced = []
+
+    def produce():
+        for i in range(1000):
+            produced.append(i)
+            time.sleep(0.001)
+            yield i
+
+    stream = executor.stream(produce)
+    async for item in stream:
+        if item == 2:
+            break
+    await stream.aclose()
+
+    # The worker becomes free again once the producer notices
+    assert await executor.run(lambda: "free") == "free"
+    assert len(produced) < 1000
@@ -13,7 +13,7 @@ async def llm_engine():
 async def test_response_caching(llm_engine):
     """Test that responses are properly cached."""
     # Clear cache first
-    await cache_service.clear()
+    await cache_service.namespace("llm").clear()
     
     # First request
     prompt = "Test prompt for caching"
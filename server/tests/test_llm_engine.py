@@ -1,9 +1,49 @@
 # server/tests/test_llm_engine.py
+import asyncio
+import os
+import time
 import pytest
 from src.llm.engine import LLMEngine
 from src.core.constants import ModelStatus
 from src.core.exceptions import ModelError
 
+MODEL_PATH = os.getenv("MODEL_PATH")
+requires_model = pytest.mark.skipif(
+    not MODEL_PATH or not os.path.isfile(MODEL_PATH),
+    reason="MODEL_PATH does not point to a GGUF model"
+)
+
+class FakeModel:
+    """Llama stand-in that counts completions and takes a while to stream."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def n_ctx(self):
+        return 2048
+
+    def create_completion(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        words = ["Hello", " there", " friend"]
+        if stream:
+            return self._stream(words)
+        time.sleep(0.1)
+        return {'choices': [{'text': ''.join(words), 'finish_reason': 'stop'}], 'usage': {'total_tokens': 3}}
+
+    def _stream(self, words):
+        for word in words:
+            time.sleep(0.05)
+            yield {'choices': [{'text': word, 'finish_reason': None}]}
+
+@pytest.fixture
+def fake_engine():
+    """Create a ready engine around a fake model."""
+    engine = LLMEngine('fake-model')
+    engine.model = FakeModel()
+    engine.status = ModelStatus.READY
+    yield engine
+    engine.shutdown()
+
 async def test_llm_engine_initialization():
     """Test LLM engine initialization."""
     engine = LLMEngine('test-model')
@@ -35,4 +75,60 @@ async def test_generate_response():
     # Test error handling
     engine.status = ModelStatus.ERROR
     with pytest.raises(ModelError):
-        await engine.generate_response("Should fail")
\ No newline at end of file
+        await engine.generate_response("Should fail")
+
+@requires_model
+async def test_batched_generation():
+    """Test concurrent requests sharing decode steps in batching mode."""
+    engine = LLMEngine(MODEL_PATH, batching=True, max_batch_size=4)
+    await engine.initialize()
+
+    responses = await asyncio.gather(*[
+        engine.generate_response(f"Prompt {i}", max_tokens=16, use_cache=False)
+        for i in range(4)
+    ])
+    assert all(isinstance(r["tokens_used"], int) for r in responses)
+
+    metrics = engine.get_status()["batching"]
+    assert metrics["completed"] == 4
+    assert metrics["average_batch_size"] > 1
+
+@requires_model
+async def test_batched_greedy_matches_create_completion():
+    """Test that the batcher's own sampler decodes like create_completion."""
+    plain = LLMEngine(MODEL_PATH)
+    batched = LLMEngine(MODEL_PATH, batching=True, max_batch_size=2)
+    await asyncio.gather(plain.initialize(), batched.initialize())
+
+    # A repetitive prompt makes the default repeat_penalty matter
+    prompt = "one two one two one two one two"
+    expected = await plain.generate_response(prompt, max_tokens=32, temperature=0.0, use_cache=False)
+    actual = await batched.generate_response(prompt, max_tokens=32, temperature=0.0, use_cache=False)
+    assert actual["response"] == expected["response"]
+
+async def test_identical_requests_coalesced(fake_engine):
+    """Test that identical in-flight requests share one generation."""
+    responses = await asyncio.gather(*[
+        fake_engine.generate_response("Same prompt", max_tokens=16, use_cache=False)
+        for _ in range(4)
+    ])
+    assert all(r == responses[0] for r in responses)
+    assert fake_engine.model.calls == 1
+    assert fake_engine.get_status()["coalescing"]["followers"] == 3
+
+async def test_coalesced_stream_outlives_its_leader(fake_engine):
+    """Test that a follower still gets the whole stream after the leader disconnects."""
+    async def disconnect_early():
+        stream = fake_engine.generate_stream("Same prompt", max_tokens=16)
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    async def follow():
+        await asyncio.sleep(0.01)
+        return "".join([text async for text in fake_engine.generate_stream("Same prompt", max_tokens=16)])
+
+    first, followed = await asyncio.gather(disconnect_early(), follow())
+    assert first == "Hello"
+    assert followed == "Hello there friend"
+    assert fake_engine.model.calls == 1
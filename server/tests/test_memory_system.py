@@ -1,9 +1,12 @@
 # server/tests/test_memory_system.py
+import asyncio
 import pytest
+import sqlite3
 from datetime import datetime, timedelta
-from src.data.memory_manager import MemoryManager
+from src.data.memory_manager import MemoryManager, MemorySweeper, SCHEMA_VERSION, to_epoch_ms
 from src.data.search_index import SearchIndex
 from src.core.constants import MemoryTypes
+from src.core.exceptions import MemoryError
 
 @pytest.fixture
 async def memory_manager():
@@ -92,3 +95,242 @@ async def test_memory_stats(memory_manager, sample_memories):
     connections = await memory_manager.get_connection_stats()
     assert isinstance(connections, list)
 
+
+async def test_store_many_indexes_in_one_transaction(tmp_path):
+    """Test bulk storage with search rows, and rollback on a bad item."""
+    db_path = str(tmp_path / "bulk.db")
+    index = SearchIndex(db_path)
+    manager = MemoryManager(db_path, search_index=index)
+
+    items = (
+        {"content": f"bulk memory {i}", "type": "FACT", "metadata": {"n": i}}
+        for i in range(2500)
+    )
+    assert await manager.store_many(items, batch_size=1000) == 2500
+
+    memories = await manager.retrieve(limit=5000)
+    assert sorted(m['id'] for m in memories) == list(range(1, 2501))
+    results = await index.search("bulk", limit=5000)
+    assert sorted(r['memory_id'] for r in results) == list(range(1, 2501))
+    assert (await index.get_stats())['total_documents'] == 2500
+
+    bad = [{"content": "ok", "type": "FACT"}, {"content": "missing type"}]
+    with pytest.raises(MemoryError):
+        await manager.store_many(bad)
+    assert len(await manager.retrieve(limit=5000)) == 2500
+
+    # Ids continue after the bulk insert
+    assert await manager.store("single", MemoryTypes.FACT) == 2501
+
+@pytest.mark.parametrize("memory_type,min_importance,index", [
+    (None, 0, "idx_memories_time"),
+    (MemoryTypes.FACT, 0, "idx_memories_type_time"),
+    (None, 3, "idx_memories_important"),
+    (MemoryTypes.FACT, 3, "idx_memories_type_time"),
+])
+def test_retrieve_query_plans(memory_type, min_importance, index):
+    """Test that every retrieve() shape seeks an index and needs no sort."""
+    manager = MemoryManager(db_path=":memory:")
+    query, params = manager._retrieve_query(memory_type, 10, min_importance)
+    with manager.pool.connection() as conn:
+        plan = " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params))
+    assert f"USING INDEX {index}" in plan
+    assert "TEMP B-TREE" not in plan
+
+    # A page cursor seeks into the same index
+    query, params = manager._retrieve_query(memory_type, 10, min_importance, (1000, 5))
+    with manager.pool.connection() as conn:
+        plan = " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params))
+    assert f"SEARCH memories USING INDEX {index}" in plan
+    assert "TEMP B-TREE" not in plan
+
+async def test_migrates_text_timestamps(tmp_path):
+    """Test the ISO-8601 TEXT schema is migrated to epoch milliseconds."""
+    db_path = str(tmp_path / "legacy.db")
+    created = datetime(2024, 5, 1, 12, 30)
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE memories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT NOT NULL,
+            content TEXT NOT NULL,
+            metadata TEXT,
+            created_at TEXT NOT NULL,
+            expires_at TEXT,
+            importance INTEGER DEFAULT 0
+        )
+    """)
+    conn.execute("CREATE INDEX idx_type_time ON memories(type, created_at)")
+    conn.executemany(
+        "INSERT INTO memories (type, content, metadata, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+        [
+            ("FACT", '"kept"', "{}", created.isoformat(), None),
+            ("FACT", '"expired"', "{}", created.isoformat(), (created + timedelta(days=1)).isoformat()),
+            ("FACT", '"deleted"', "{}", created.isoformat(), None),
+        ]
+    )
+    conn.execute("DELETE FROM memories WHERE id = 3")
+    conn.commit()
+    conn.close()
+
+    manager = MemoryManager(db_path)
+    with manager.pool.connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert conn.execute("SELECT created_at, expires_at FROM memories ORDER BY id").fetchall() == [
+            (to_epoch_ms(created), None),
+            (to_epoch_ms(created), to_epoch_ms(created + timedelta(days=1))),
+        ]
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert "idx_type_time" not in indexes
+
+    memories = await manager.retrieve()
+    assert [m['content'] for m in memories] == ["kept"]
+    assert memories[0]['created_at'] == created.isoformat()
+    # Ids are not reused after the table is rebuilt
+    assert await manager.store("new", MemoryTypes.FACT) == 4
+
+async def test_migrates_search_index_rowids(tmp_path):
+    """Test legacy auto-rowid index rows are rekeyed by memory id."""
+    db_path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE VIRTUAL TABLE memory_index USING fts5(memory_id, content, metadata, tokenize='porter')")
+    conn.executemany(
+        "INSERT INTO memory_index (memory_id, content, metadata) VALUES (?, ?, ?)",
+        [("7", "seven", "{}"), ("1", "one", "{}"), ("7", "seven again", "{}")]
+    )
+    conn.commit()
+    conn.close()
+
+    index = SearchIndex(db_path)
+    with index.pool.connection() as conn:
+        assert conn.execute("SELECT rowid, memory_id, content FROM memory_index ORDER BY rowid").fetchall() == [
+            (1, "1", "one"), (7, "7", "seven again")
+        ]
+        # Removing memory 1 no longer hits whichever row happened to get rowid 1
+        with conn:
+            index.remove_documents(conn, [1])
+            index.add_documents(conn, [(2, "two", {})])
+        assert conn.execute("SELECT memory_id FROM memory_index ORDER BY rowid").fetchall() == [("2",), ("7",)]
+
+    # Already migrated indexes are left alone
+    SearchIndex(db_path)
+    assert len(await index.search("seven")) == 1
+
+def test_sweeper_expires_evicts_and_vacuums(tmp_path):
+    """Test a sweep removes expired then unimportant memories and shrinks the file."""
+    db_path = str(tmp_path / "sweep.db")
+    index = SearchIndex(db_path)
+    manager = MemoryManager(db_path, search_index=index, ttl_seconds=3600)
+    past = datetime.now() - timedelta(minutes=1)
+    items = (
+        {"content": "x" * 2000, "type": "FACT", "expires_at": past.isoformat()} if i < 300
+        else {"content": f"keep {i}", "type": "FACT", "importance": 5 if i % 2 else 0}
+        for i in range(400)
+    )
+    asyncio.run(manager.store_many(items))
+
+    sweeper = MemorySweeper(manager, max_entries=60, vacuum_threshold=10, batch_size=32)
+    result = sweeper.sweep()
+    assert result['expired'] == 300
+    assert result['evicted'] == 40
+    assert result['released_pages'] > 0
+
+    memories = asyncio.run(manager.retrieve(limit=100))
+    assert len(memories) == 60
+    # All 50 important memories survive; the newest unimportant fill the rest
+    assert sum(m['importance'] == 5 for m in memories) == 50
+    assert min(m['id'] for m in memories if m['importance'] == 0) == 381
+    # Default expiry applies to memories stored without one
+    assert all(m['expires_at'] is not None for m in memories)
+
+    results = asyncio.run(index.search("keep", limit=100))
+    assert sorted(r['memory_id'] for r in results) == sorted(m['id'] for m in memories)
+    assert sweeper.sweep() == {'expired': 0, 'evicted': 0, 'released_pages': 0}
+
+async def test_incremental_vacuum_is_an_explicit_step(tmp_path):
+    """Test that opening an older file never vacuums it; conversion is on request."""
+    db_path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE unrelated (x INTEGER)")
+    conn.commit()
+    conn.close()
+
+    def auto_vacuum(path):
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        finally:
+            conn.close()
+
+    manager = MemoryManager(db_path)
+    assert auto_vacuum(db_path) == 0
+
+    assert await manager.enable_incremental_vacuum() is True
+    assert auto_vacuum(db_path) == 2
+    assert await manager.enable_incremental_vacuum() is False
+
+    # New files start out incremental
+    MemoryManager(str(tmp_path / "fresh.db"))
+    assert auto_vacuum(str(tmp_path / "fresh.db")) == 2
+
+async def test_keyset_pages_and_iteration(memory_manager):
+    """Test cursor pages cover every memory once, even with equal timestamps."""
+    # Bulk stores share one created_at, so pages split on id alone
+    await memory_manager.store_many(
+        {"content": f"m{i}", "type": "FACT" if i % 2 else "CONTEXT"} for i in range(25)
+    )
+
+    seen, cursor = [], None
+    while True:
+        page = await memory_manager.retrieve_page(limit=10, cursor=cursor)
+        seen.extend(m['id'] for m in page['memories'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert seen == list(range(25, 0, -1))
+
+    streamed = [m async for m in memory_manager.iter_memories(MemoryTypes.FACT, batch_size=4)]
+    assert [m['id'] for m in streamed] == list(range(24, 0, -2))
+    assert streamed[0]['content'] == "m23"
+
+    rest = memory_manager.iter_memories(MemoryTypes.FACT, cursor=streamed[5]['cursor'], decode=False)
+    raw = [m async for m in rest]
+    assert [m['id'] for m in raw] == list(range(12, 0, -2))
+    assert raw[0]['content'] == '"m11"'
+
+    with pytest.raises(MemoryError):
+        await memory_manager.retrieve_page(cursor="not-a-cursor")
+
+async def test_rollups_track_every_write_path(tmp_path):
+    """Test stats rollups stay exact through stores, deletes and a backfill."""
+    db_path = str(tmp_path / "stats.db")
+    manager = MemoryManager(db_path)
+    await manager.store_many({"content": i, "type": "FACT"} for i in range(30))
+    await manager.store("hello", MemoryTypes.CONVERSATION)
+    await manager.store("old", MemoryTypes.CONTEXT, expires_at=datetime.now() - timedelta(seconds=1))
+    await manager.delete(1)
+    await manager.clear(MemoryTypes.CONVERSATION)
+    await manager.delete_expired()
+
+    assert await manager.get_type_distribution() == [{'name': 'FACT', 'value': 29}]
+    stats = await manager.get_stats()
+    assert stats['total_memories'] == 29
+    assert stats['memory_usage'] > 0
+    assert stats['active_connections'] >= 1
+
+    # Activity counts every memory stored in the current hour, deleted or not
+    hourly = await manager.get_activity_data('1d')
+    assert len(hourly) == 24 and hourly[-1]['memories'] == 32
+    daily = await manager.get_activity_data('7d')
+    assert len(daily) == 7 and daily[-1]['memories'] == 32
+    with pytest.raises(MemoryError):
+        await manager.get_activity_data('1y')
+
+    # Databases from before the rollups are backfilled on open
+    with manager.pool.transaction() as conn:
+        conn.execute("DROP TABLE memory_type_counts")
+        conn.execute("DROP TABLE memory_activity")
+        conn.execute("PRAGMA user_version = 2")
+    manager._init_db()
+    assert (await manager.get_stats())['total_memories'] == 29
+    assert (await manager.get_activity_data('all'))[-1]['memories'] == 29
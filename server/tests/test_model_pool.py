@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+from src.llm import model_pool as model_pool_module
+from src.llm.model_pool import ModelPool
+from src.core.constants import ErrorCodes, ModelStatus
+from src.core.exceptions import ModelError
+
+class FakeEngine:
+    """Engine stand-in that tracks initialization and shutdown."""
+    instances = []
+
+    def __init__(self, model_path, **kwargs):
+        self.model_path = model_path
+        self.status = ModelStatus.INITIALIZING
+        self.initialized = 0
+        FakeEngine.instances.append(self)
+
+    async def initialize(self):
+        await asyncio.sleep(0.01)
+        self.initialized += 1
+        self.status = ModelStatus.READY
+
+    def shutdown(self):
+        self.status = ModelStatus.STOPPED
+
+    def get_status(self):
+        return {'status': self.status, 'ready': True, 'model_path': self.model_path, 'settings': None}
+
+@pytest.fixture
+def models(tmp_path, monkeypatch):
+    """Create two 1 MB model files and patch the engine class."""
+    FakeEngine.instances = []
+    monkeypatch.setattr(model_pool_module, 'LLMEngine', FakeEngine)
+    paths = []
+    for name in ('alpha', 'beta'):
+        path = tmp_path / f"{name}.gguf"
+        path.write_bytes(b"\0" * 1024 * 1024)
+        paths.append(str(path))
+    return paths
+
+async def test_routes_by_model_name(models):
+    """Test that loaded models are reused and routed by name."""
+    pool = ModelPool(memory_budget_mb=1024)
+    alpha = await pool.load(models[0])
+    beta = await pool.load(models[1])
+
+    assert pool.get() is beta  # Last started model is the default
+    assert pool.get('alpha') is alpha
+    assert await pool.load(models[0]) is alpha
+    assert len(FakeEngine.instances) == 2
+    with pytest.raises(ModelError) as exc_info:
+        pool.get('gamma')
+    assert exc_info.value.code == ErrorCodes.MODEL_NOT_FOUND
+    assert exc_info.value.status_code == 404
+
+    status = pool.get_status()
+    assert set(status['models']) == {'alpha', 'beta'}
+    assert status['default_model'] == 'alpha'
+
+async def test_evicts_least_recently_used(models):
+    """Test that loading past the budget evicts the LRU model."""
+    pool = ModelPool(memory_budget_mb=1.5)
+    alpha = await pool.load(models[0])
+    await pool.load(models[1])
+
+    assert alpha.status == ModelStatus.STOPPED
+    assert list(pool.get_status()['models']) == ['beta']
+    assert pool.get_status()['pool']['evictions'] == 1
+
+async def test_concurrent_loads_are_coalesced(models):
+    """Test that simultaneous loads of one model initialize it once."""
+    pool = ModelPool(memory_budget_mb=1024)
+    first, second = await asyncio.gather(pool.load(models[0]), pool.load(models[0]))
+
+    assert first is second
+    assert len(FakeEngine.instances) == 1
+    assert first.initialized == 1
+
+async def test_start_loads_in_background(models):
+    """Test that start returns at once and the model becomes ready later."""
+    pool = ModelPool(memory_budget_mb=1024)
+    engine = pool.start(models[0])
+
+    assert engine.status == ModelStatus.INITIALIZING
+    assert pool.get_status()['models']['alpha']['status'] == ModelStatus.INITIALIZING
+    assert await pool.load(models[0]) is engine
+    assert engine.status == ModelStatus.READY
+    assert engine.initialized == 1
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from llama_cpp.llama import LlamaState
+from src.llm.prefix_cache import PrefixCache
+
+def _state(size, n_tokens=0, n_ctx=64, n_vocab=32):
+    """A state shaped like llama-cpp-python's, sized for the whole context."""
+    input_ids = np.zeros(n_ctx, dtype=np.intc)
+    input_ids[:n_tokens] = np.arange(1, n_tokens + 1)
+    scores = np.zeros((n_ctx, n_vocab), dtype=np.single)
+    scores[:n_tokens] = 1.0
+    return LlamaState(
+        input_ids=input_ids,
+        scores=scores,
+        n_tokens=n_tokens,
+        llama_state=bytes([size % 256]),
+        llama_state_size=size
+    )
+
+def test_longest_prefix_is_restored():
+    """Test that lookup returns the state sharing the longest prefix."""
+    cache = PrefixCache(capacity_bytes=1000, min_prefix_tokens=2)
+    system = _state(10)
+    turn = _state(11)
+    cache[[1, 2, 3]] = system
+    cache[[1, 2, 3, 4, 5]] = turn
+
+    assert cache[[1, 2, 3, 4, 5, 6, 7]].llama_state == turn.llama_state
+    assert cache[[1, 2, 3, 9]].llama_state == system.llama_state
+    stats = cache.get_stats()
+    assert stats['hits'] == 2
+    assert stats['tokens_reused'] == 8
+
+def test_short_prefix_is_a_miss():
+    """Test that matches below the minimum prefix length are not restored."""
+    cache = PrefixCache(capacity_bytes=1000, min_prefix_tokens=3)
+    cache[[1, 2, 3, 4]] = _state(10)
+
+    with pytest.raises(KeyError):
+        cache[[1, 2, 9, 9]]
+    assert [1, 2, 9, 9] not in cache
+    assert cache.get_stats()['misses'] == 1
+
+def test_evicts_least_recently_used_over_budget():
+    """Test that the byte budget evicts the least recently used state."""
+    cache = PrefixCache(capacity_bytes=25, min_prefix_tokens=1)
+    cache[[1]] = _state(10)
+    cache[[2]] = _state(10)
+    cache[[1, 5]]  # touch [1]
+    cache[[3]] = _state(10)
+
+    assert [2] not in cache
+    assert [1] in cache and [3] in cache
+    assert cache.cache_size == 20
+    assert cache.get_stats()['evictions'] == 1
+
+def test_budget_counts_token_and_logit_arrays():
+    """Test that entries are trimmed to their tokens and charged for their arrays."""
+    n_ctx, n_vocab = 512, 1000
+    per_entry = 100 + 40 * 4 + 40 * n_vocab * 4  # KV state, input_ids, scores
+    cache = PrefixCache(capacity_bytes=2 * per_entry, min_prefix_tokens=1)
+    for first in (1, 2, 3):
+        cache[[first]] = _state(100, n_tokens=40, n_ctx=n_ctx, n_vocab=n_vocab)
+
+    # Three entries do not fit in two entries' worth of bytes
+    assert cache.cache_size == 2 * per_entry
+    assert cache.get_stats()['evictions'] == 1
+    assert [1] not in cache
+
+    # Restored states are padded back to the full context for Llama.load_state
+    restored = cache[[3]]
+    assert restored.scores.shape == (n_ctx, n_vocab)
+    assert restored.input_ids.shape == (n_ctx,)
+    assert restored.input_ids[:40].tolist() == list(range(1, 41))
+    assert restored.scores[:40].all() and not restored.scores[40:].any()
@@ -0,0 +1,73 @@
+import queue
+import time
+import pytest
+from concurrent.futures import Future
+from src.llm.scheduler import RequestQueue, ScheduledJob
+from src.core.constants import ErrorCodes, RequestPriority
+from src.core.exceptions import SchedulerError
+
+def _job(name, timeout=None):
+    now = time.monotonic()
+    return ScheduledJob(
+        future=Future(),
+        fn=lambda: name,
+        args=(),
+        kwargs={},
+        deadline=now + timeout if timeout is not None else None,
+        enqueued_at=now
+    )
+
+def test_priority_then_fifo_order():
+    """Test that higher priority jobs run first, FIFO within a priority."""
+    queue = RequestQueue(max_size=10)
+    queue.put(_job("low"), priority=RequestPriority.LOW)
+    queue.put(_job("normal-1"))
+    queue.put(_job("high"), priority=RequestPriority.HIGH)
+    queue.put(_job("normal-2"))
+
+    order = [queue.get().fn() for _ in range(4)]
+    assert order == ["high", "normal-1", "normal-2", "low"]
+
+def test_rejects_when_full():
+    """Test that a full queue applies backpressure with a 429 error."""
+    queue = RequestQueue(max_size=2)
+    queue.put(_job("a"))
+    queue.put(_job("b"))
+
+    with pytest.raises(SchedulerError) as exc_info:
+        queue.put(_job("c"))
+
+    assert exc_info.value.code == ErrorCodes.QUEUE_FULL
+    assert exc_info.value.status_code == 429
+    assert queue.get_stats()['rejected'] == 1
+
+def test_expired_jobs_are_dropped():
+    """Test that jobs past their deadline are failed instead of run."""
+    queue = RequestQueue(max_size=10)
+    stale = _job("stale", timeout=0.01)
+    queue.put(stale)
+    queue.put(_job("fresh"))
+    time.sleep(0.02)
+
+    assert queue.get().fn() == "fresh"
+    with pytest.raises(SchedulerError) as exc_info:
+        stale.future.result(timeout=0)
+    assert exc_info.value.code == ErrorCodes.DEADLINE_EXCEEDED
+    assert queue.get_stats()['expired'] == 1
+
+def test_stats_report_depth():
+    """Test that queue depth is reported."""
+    queue = RequestQueue(max_size=4)
+    queue.put(_job("a"))
+    queue.put(_job("b"))
+
+    stats = queue.get_stats()
+    assert stats['size'] == 2
+    assert stats['max_size'] == 4
+    assert len(queue) == 2
+
+def test_get_times_out_when_empty():
+    """Test that a bounded wait on an empty queue raises queue.Empty."""
+    queue_ = RequestQueue(max_size=4)
+    with pytest.raises(queue.Empty):
+        queue_.get(timeout=0.01)
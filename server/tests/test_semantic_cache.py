@@ -0,0 +1,31 @@
+from src.llm.semantic_cache import SemanticCache
+
+def test_lookup_respects_threshold_and_scope():
+    cache = SemanticCache(dimensions=3, threshold=0.9)
+    cache.add([1.0, 0.0, 0.0], "max_tokens=64", "key-a")
+
+    assert cache.lookup([0.95, 0.1, 0.0], "max_tokens=64") == "key-a"
+    assert cache.lookup([0.95, 0.1, 0.0], "max_tokens=128") is None
+    assert cache.lookup([0.0, 1.0, 0.0], "max_tokens=64") is None
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+
+def one_hot(i, size=150):
+    vector = [0.0] * size
+    vector[i] = 1.0
+    return vector
+
+def test_oldest_entries_evicted_past_capacity():
+    cache = SemanticCache(dimensions=150, threshold=0.99, max_entries=100)
+    for i in range(150):
+        cache.add(one_hot(i), "scope", f"key-{i}")
+
+    assert cache.get_stats()['entries'] == 100
+    assert cache.get_stats()['evictions'] == 50
+    assert cache.lookup(one_hot(0), "scope") is None
+    assert cache.lookup(one_hot(149), "scope") == "key-149"
+
+    cache.remove("key-149")
+    assert cache.lookup(one_hot(149), "scope") is None
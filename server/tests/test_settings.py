@@ -0,0 +1,32 @@
+from src.config.settings import MemoryConfig, ModelConfig, physical_cores
+
+def test_runtime_defaults_use_physical_cores():
+    """Test that thread counts default to physical cores."""
+    model_config = ModelConfig()
+    assert model_config.n_threads == physical_cores()
+    assert model_config.n_threads_batch == physical_cores()
+    assert model_config.n_ctx == 2048
+
+def test_runtime_from_env(monkeypatch):
+    """Test that runtime knobs can be tuned through the environment."""
+    monkeypatch.setenv("MODEL_N_CTX", "4096")
+    monkeypatch.setenv("MODEL_N_BATCH", "256")
+    monkeypatch.setenv("MODEL_N_THREADS", "6")
+    monkeypatch.setenv("MODEL_N_THREADS_BATCH", "12")
+    monkeypatch.setenv("MODEL_USE_MMAP", "false")
+
+    model_config = ModelConfig.from_env()
+    assert (model_config.n_ctx, model_config.n_batch) == (4096, 256)
+    assert (model_config.n_threads, model_config.n_threads_batch) == (6, 12)
+    assert model_config.use_mmap is False
+
+def test_memory_retention_is_opt_in(monkeypatch):
+    """Test that memories never expire or get evicted unless configured."""
+    memory_config = MemoryConfig.from_env()
+    assert memory_config.ttl_seconds is None
+    assert memory_config.max_entries is None
+
+    monkeypatch.setenv("MEMORY_TTL_SECONDS", "86400")
+    monkeypatch.setenv("MEMORY_MAX_ENTRIES", "10000")
+    memory_config = MemoryConfig.from_env()
+    assert (memory_config.ttl_seconds, memory_config.max_entries) == (86400, 10000)
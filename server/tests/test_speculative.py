@@ -0,0 +1,41 @@
+import numpy as np
+from src.llm.sampling import token_distribution
+from src.llm.speculative import verify_proposals
+
+def test_token_distribution_greedy_and_top_p():
+    logits = np.array([1.0, 3.0, 2.0, 0.0])
+
+    greedy = token_distribution(logits, {'temperature': 0.0})
+    assert greedy.tolist() == [0.0, 1.0, 0.0, 0.0]
+
+    probs = token_distribution(logits, {'temperature': 1.0, 'top_p': 0.8})
+    assert probs[0] == 0.0 and probs[3] == 0.0
+    assert np.isclose(probs.sum(), 1.0)
+
+def test_token_distribution_applies_completion_defaults():
+    """Test create_completion's default repeat_penalty and top_k."""
+    logits = np.array([2.0, 2.1, -1.0] + [0.0] * 60)
+
+    # Token 1 was seen recently, so the 1.1 repeat penalty flips the argmax
+    assert np.argmax(token_distribution(logits, {'temperature': 0.0}, [5, 1])) == 0
+    assert np.argmax(token_distribution(logits, {'temperature': 0.0, 'repeat_penalty': 1.0}, [5, 1])) == 1
+    # Only the last 64 tokens count
+    assert np.argmax(token_distribution(logits, {'temperature': 0.0}, [1] + [5] * 64)) == 1
+
+    probs = token_distribution(logits, {'temperature': 1.0, 'top_p': 1.0})
+    assert np.count_nonzero(probs) == 40
+    assert np.count_nonzero(token_distribution(logits, {'temperature': 1.0, 'top_p': 1.0, 'top_k': 0})) == 63
+
+def test_verify_proposals_matches_target_distribution():
+    rng = np.random.default_rng(0)
+    p = np.array([0.5, 0.3, 0.2])
+    q = np.array([0.2, 0.2, 0.6])
+
+    counts = np.zeros(3)
+    trials = 20000
+    for _ in range(trials):
+        proposal = int(rng.choice(3, p=q))
+        accepted, token = verify_proposals([proposal], [q], [p, p], rng)
+        counts[proposal if accepted else token] += 1
+
+    assert np.allclose(counts / trials, p, atol=0.015)
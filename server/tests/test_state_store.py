@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from llama_cpp.llama import LlamaState
+from src.llm.state_store import StateStore, model_hash
+
+@pytest.fixture
+def model_file(tmp_path):
+    """Create a stand-in model file."""
+    path = tmp_path / "model.gguf"
+    path.write_bytes(b"GGUF" + bytes(range(256)) * 64)
+    return str(path)
+
+def _state(tokens, n_ctx=16):
+    """A state shaped like llama-cpp-python's, sized for the whole context."""
+    input_ids = np.zeros(n_ctx, dtype=np.intc)
+    input_ids[:len(tokens)] = tokens
+    scores = np.zeros((n_ctx, 4), dtype=np.single)
+    scores[:len(tokens)] = 0.5
+    return LlamaState(
+        input_ids=input_ids,
+        scores=scores,
+        n_tokens=len(tokens),
+        llama_state=b"\x01\x02\x03",
+        llama_state_size=3
+    )
+
+def test_round_trip(tmp_path, model_file):
+    """Test that saved states reload from a fresh store."""
+    StateStore(str(tmp_path / "states"), model_file, 2048).save("system", _state([1, 2, 3]))
+
+    restored = list(StateStore(str(tmp_path / "states"), model_file, 2048).load_all())
+    assert len(restored) == 1
+    assert restored[0].input_ids[:3].tolist() == [1, 2, 3]
+    assert restored[0].n_tokens == 3
+    assert restored[0].llama_state == b"\x01\x02\x03"
+
+def test_saves_only_used_rows(tmp_path, model_file):
+    """Test that snapshots hold the prompt's rows and reload at full context size."""
+    store = StateStore(str(tmp_path / "states"), model_file, 4096)
+    path = store.save("system", _state([1, 2, 3], n_ctx=4096))
+
+    with np.load(path) as data:
+        assert data['scores'].shape == (3, 4)
+        assert data['input_ids'].shape == (3,)
+
+    restored = store.load(path)
+    assert restored.scores.shape == (4096, 4)
+    assert restored.input_ids.shape == (4096,)
+    assert restored.scores[:3].tolist() == [[0.5] * 4] * 3
+    assert not restored.scores[3:].any()
+
+def test_keyed_by_model_and_context(tmp_path, model_file):
+    """Test that snapshots are not shared across models or context sizes."""
+    StateStore(str(tmp_path / "states"), model_file, 2048).save("system", _state([1, 2]))
+
+    assert list(StateStore(str(tmp_path / "states"), model_file, 4096).load_all()) == []
+
+    original = model_hash(model_file)
+    with open(model_file, 'ab') as f:
+        f.write(b"changed")
+    assert model_hash(model_file) != original
+    assert list(StateStore(str(tmp_path / "states"), model_file, 2048).load_all()) == []
@@ -0,0 +1,38 @@
+import asyncio
+import pytest
+from src.data.token_processor import TokenProcessor
+from src.core.exceptions import TokenizationError
+
+async def _tokens(items, delay=0.0):
+    for item in items:
+        if delay:
+            await asyncio.sleep(delay)
+        yield item
+
+async def test_stream_batches_by_size():
+    """Test that tokens are grouped into fixed-size batches."""
+    processor = TokenProcessor(batch_size=2)
+    batches = [b async for b in processor.process_stream(_tokens(["a", "b", "c"]), max_tokens=10)]
+    assert batches == [["a", "b"], ["c"]]
+
+async def test_stream_preserves_whitespace():
+    """Test that streamed text keeps its spacing when stripping is disabled."""
+    processor = TokenProcessor(batch_size=8, strip_tokens=False)
+    pieces = [" Hello", ",", " world", "\n"]
+    batches = [b async for b in processor.process_stream(_tokens(pieces), max_tokens=10)]
+    assert "".join(sum(batches, [])) == " Hello, world\n"
+
+async def test_stream_flushes_after_delay():
+    """Test that a partial batch is flushed once max_delay has passed."""
+    processor = TokenProcessor(batch_size=100, max_delay=0.01, strip_tokens=False)
+    batches = [
+        b async for b in processor.process_stream(_tokens(["a", "b", "c"], delay=0.02), max_tokens=10)
+    ]
+    assert len(batches) > 1
+
+async def test_stream_token_limit():
+    """Test that exceeding max_tokens raises a TokenizationError."""
+    processor = TokenProcessor(batch_size=2)
+    with pytest.raises(TokenizationError):
+        async for _ in processor.process_stream(_tokens(["a", "b", "c"]), max_tokens=2):
+            pass